@@ -79,6 +79,11 @@ def get_arguments() -> argparse.Namespace:
     parser.add_argument(
         "--open-ui", action="store_true", help="Open the webinterface in a browser"
     )
+    parser.add_argument(
+        "--lazy-platforms",
+        action="store_true",
+        help="Import integration platforms when they are first used",
+    )
     parser.add_argument(
         "--skip-pip",
         action="store_true",
@@ -305,6 +310,7 @@ def main() -> int:
         log_no_color=args.log_no_color,
         skip_pip=args.skip_pip,
         safe_mode=args.safe_mode,
+        lazy_platforms=args.lazy_platforms,
         debug=args.debug,
         open_ui=args.open_ui,
     )
@@ -89,6 +89,7 @@ async def async_setup_hass(
     )
 
     hass.config.skip_pip = runtime_config.skip_pip
+    hass.config.lazy_platforms = runtime_config.lazy_platforms
     if runtime_config.skip_pip:
         _LOGGER.warning(
             "Skipping pip installation of required modules. This may cause issues"
@@ -147,6 +148,7 @@ async def async_setup_hass(
 
         hass = core.HomeAssistant()
         hass.config.skip_pip = old_config.skip_pip
+        hass.config.lazy_platforms = old_config.lazy_platforms
         hass.config.internal_url = old_config.internal_url
         hass.config.external_url = old_config.external_url
         hass.config.config_dir = old_config.config_dir
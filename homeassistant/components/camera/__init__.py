@@ -53,6 +53,7 @@ from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.network import get_url
 from homeassistant.loader import bind_hass
 
+from .broker import FrameBroker
 from .const import DATA_CAMERA_PREFS, DOMAIN
 from .prefs import CameraPreferences
 
@@ -156,7 +157,7 @@ async def async_get_image(hass, entity_id, timeout=10):
 
     with suppress(asyncio.CancelledError, asyncio.TimeoutError):
         async with async_timeout.timeout(timeout):
-            image = await camera.async_camera_image()
+            image = await camera.frame_broker.async_get_image()
 
             if image:
                 return Image(camera.content_type, image)
@@ -189,19 +190,6 @@ async def async_get_still_stream(request, image_cb, content_type, interval):
     response.content_type = CONTENT_TYPE_MULTIPART.format("--frameboundary")
     await response.prepare(request)
 
-    async def write_to_mjpeg_stream(img_bytes):
-        """Write image to stream."""
-        await response.write(
-            bytes(
-                "--frameboundary\r\n"
-                "Content-Type: {}\r\n"
-                "Content-Length: {}\r\n\r\n".format(content_type, len(img_bytes)),
-                "utf-8",
-            )
-            + img_bytes
-            + b"\r\n"
-        )
-
     last_image = None
 
     while True:
@@ -210,12 +198,12 @@ async def async_get_still_stream(request, image_cb, content_type, interval):
             break
 
         if img_bytes != last_image:
-            await write_to_mjpeg_stream(img_bytes)
+            await _async_write_mjpeg_frame(response, content_type, img_bytes)
 
             # Chrome seems to always ignore first picture,
             # print it twice.
             if last_image is None:
-                await write_to_mjpeg_stream(img_bytes)
+                await _async_write_mjpeg_frame(response, content_type, img_bytes)
             last_image = img_bytes
 
         await asyncio.sleep(interval)
@@ -223,6 +211,49 @@ async def async_get_still_stream(request, image_cb, content_type, interval):
     return response
 
 
+async def async_get_shared_still_stream(request, broker, content_type, interval):
+    """Generate an HTTP MJPEG stream from camera images shared by a broker.
+
+    All clients streaming a camera at the same interval share the fetched
+    images. A client that is slower than the camera skips images.
+
+    This method must be run in the event loop.
+    """
+    response = web.StreamResponse()
+    response.content_type = CONTENT_TYPE_MULTIPART.format("--frameboundary")
+    await response.prepare(request)
+
+    subscriber = broker.async_subscribe(interval)
+    try:
+        img_bytes = await subscriber.get()
+        if img_bytes:
+            # Chrome seems to always ignore first picture,
+            # print it twice.
+            await _async_write_mjpeg_frame(response, content_type, img_bytes)
+
+        while img_bytes:
+            await _async_write_mjpeg_frame(response, content_type, img_bytes)
+            img_bytes = await subscriber.get()
+    finally:
+        broker.async_unsubscribe(interval, subscriber)
+
+    return response
+
+
+async def _async_write_mjpeg_frame(response, content_type, img_bytes):
+    """Write an image to an MJPEG stream."""
+    await response.write(
+        bytes(
+            "--frameboundary\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Length: {}\r\n\r\n".format(content_type, len(img_bytes)),
+            "utf-8",
+        )
+        + img_bytes
+        + b"\r\n"
+    )
+
+
 def _get_camera_from_entity_id(hass, entity_id):
     """Get camera component from entity_id."""
     component = hass.data.get(DOMAIN)
@@ -274,7 +305,13 @@ async def async_setup(hass, config):
             if not source:
                 continue
 
-            request_stream(hass, source, keepalive=True, options=camera.stream_options)
+            request_stream(
+                hass,
+                source,
+                keepalive=True,
+                options=camera.stream_options,
+                lookback=camera_prefs.lookback,
+            )
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, preload_stream)
 
@@ -334,6 +371,7 @@ class Camera(Entity):
         self.content_type = DEFAULT_CONTENT_TYPE
         self.access_tokens: collections.deque = collections.deque([], 2)
         self.async_update_token()
+        self._frame_broker = None
 
     @property
     def should_poll(self):
@@ -375,6 +413,18 @@ class Camera(Entity):
         """Return the interval between frames of the mjpeg stream."""
         return 0.5
 
+    @property
+    def frame_cache_ttl(self):
+        """Return for how many seconds an image is shared between requests."""
+        return self.hass.data[DATA_CAMERA_PREFS].get(self.entity_id).frame_cache_ttl
+
+    @property
+    def frame_broker(self):
+        """Return the broker sharing the images of the camera."""
+        if self._frame_broker is None:
+            self._frame_broker = FrameBroker(self)
+        return self._frame_broker
+
     async def stream_source(self):
         """Return the source of the stream."""
         return None
@@ -389,8 +439,8 @@ class Camera(Entity):
 
     async def handle_async_still_stream(self, request, interval):
         """Generate an HTTP MJPEG stream from camera images."""
-        return await async_get_still_stream(
-            request, self.async_camera_image, self.content_type, interval
+        return await async_get_shared_still_stream(
+            request, self.frame_broker, self.content_type, interval
         )
 
     async def handle_async_mjpeg_stream(self, request):
@@ -516,7 +566,7 @@ class CameraImageView(CameraView):
         """Serve camera image."""
         with suppress(asyncio.CancelledError, asyncio.TimeoutError):
             async with async_timeout.timeout(10):
-                image = await camera.async_camera_image()
+                image = await camera.frame_broker.async_get_image()
 
             if image:
                 return web.Response(body=image, content_type=camera.content_type)
@@ -631,6 +681,8 @@ async def websocket_get_prefs(hass, connection, msg):
         vol.Required("type"): "camera/update_prefs",
         vol.Required("entity_id"): cv.entity_id,
         vol.Optional("preload_stream"): bool,
+        vol.Optional("frame_cache_ttl"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("lookback"): vol.All(vol.Coerce(int), vol.Range(min=0)),
     }
 )
 async def websocket_update_prefs(hass, connection, msg):
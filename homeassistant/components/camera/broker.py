@@ -0,0 +1,170 @@
+"""Share the frames of a camera between concurrent clients."""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from . import Camera
+
+# mypy: allow-untyped-calls
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FrameSubscriber:
+    """Newest frame of a stream not yet sent to a client.
+
+    A frame published before the previous one was taken replaces it, so a
+    slow client skips frames instead of holding back the stream.
+    """
+
+    __slots__ = ("_frame", "_event", "dropped")
+
+    def __init__(self) -> None:
+        """Initialize the subscriber."""
+        self._frame: Optional[bytes] = None
+        self._event = asyncio.Event()
+        self.dropped = 0
+
+    @callback
+    def put(self, frame: Optional[bytes]) -> None:
+        """Publish a frame, None signals the end of the stream."""
+        if self._event.is_set() and self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._event.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next frame, None if the stream ended."""
+        await self._event.wait()
+        self._event.clear()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class _FrameStream:
+    """Frames of a camera at one interval, fetched once for all subscribers."""
+
+    def __init__(self, broker: "FrameBroker", interval: float) -> None:
+        """Initialize the stream."""
+        self._broker = broker
+        self._interval = interval
+        self._subscribers: Set[FrameSubscriber] = set()
+        self._last_frame: Optional[bytes] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @callback
+    def async_subscribe(self, subscriber: FrameSubscriber) -> None:
+        """Add a subscriber, starting the stream if needed."""
+        self._subscribers.add(subscriber)
+        if self._last_frame is not None:
+            subscriber.put(self._last_frame)
+        if self._task is None:
+            self._task = self._broker.hass.async_create_task(self._async_run())
+
+    @callback
+    def async_unsubscribe(self, subscriber: FrameSubscriber) -> None:
+        """Remove a subscriber, stopping the stream after the last one."""
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._last_frame = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Return if the stream has subscribers."""
+        return bool(self._subscribers)
+
+    async def _async_run(self) -> None:
+        """Fetch frames and publish the changed ones to all subscribers."""
+        try:
+            while True:
+                frame = await self._broker.async_get_image()
+                if not frame:
+                    break
+                if frame != self._last_frame:
+                    self._last_frame = frame
+                    for subscriber in self._subscribers:
+                        subscriber.put(frame)
+                await asyncio.sleep(self._interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error streaming frames of %s", self._broker.entity_id)
+
+        self._task = None
+        self._last_frame = None
+        for subscriber in self._subscribers:
+            subscriber.put(None)
+
+
+class FrameBroker:
+    """Fetch the frames of a camera once for all of its clients.
+
+    Concurrent still image requests share a single fetch and the fetched
+    image is reused for the ``frame_cache_ttl`` of the camera. MJPEG clients
+    at the same interval subscribe to a single stream of frames.
+    """
+
+    def __init__(self, camera: "Camera") -> None:
+        """Initialize the broker."""
+        self._camera = camera
+        self.hass = camera.hass
+        self._image: Optional[bytes] = None
+        self._image_time = 0.0
+        self._fetch: Optional["asyncio.Future[Any]"] = None
+        self._streams: Dict[float, _FrameStream] = {}
+
+    @property
+    def entity_id(self) -> str:
+        """Return the entity id of the camera."""
+        return self._camera.entity_id
+
+    async def async_get_image(self) -> Optional[bytes]:
+        """Return an image of the camera, shared with concurrent requests."""
+        if (
+            self._image is not None
+            and time.monotonic() - self._image_time < self._camera.frame_cache_ttl
+        ):
+            return self._image
+
+        if self._fetch is None:
+            self._fetch = self.hass.async_create_task(self._async_fetch_image())
+        # A request timing out must not cancel the fetch of the others
+        return await asyncio.shield(self._fetch)
+
+    async def _async_fetch_image(self) -> Optional[bytes]:
+        """Fetch an image from the camera."""
+        try:
+            image = await self._camera.async_camera_image()
+        finally:
+            self._fetch = None
+
+        if image:
+            self._image = image
+            self._image_time = time.monotonic()
+        return image
+
+    @callback
+    def async_subscribe(self, interval: float) -> FrameSubscriber:
+        """Subscribe to the frames of the camera at an interval."""
+        stream = self._streams.get(interval)
+        if stream is None:
+            stream = self._streams[interval] = _FrameStream(self, interval)
+        subscriber = FrameSubscriber()
+        stream.async_subscribe(subscriber)
+        return subscriber
+
+    @callback
+    def async_unsubscribe(self, interval: float, subscriber: FrameSubscriber) -> None:
+        """Unsubscribe from the frames of the camera."""
+        stream = self._streams.get(interval)
+        if stream is None:
+            return
+        stream.async_unsubscribe(subscriber)
+        if not stream.has_subscribers:
+            del self._streams[interval]
@@ -1,7 +1,8 @@
 """Provide pre-made queries on top of the recorder component."""
 from collections import defaultdict
 from datetime import datetime as dt, timedelta
-from itertools import groupby
+from functools import partial
+from itertools import chain, groupby
 import json
 import logging
 import time
@@ -15,16 +16,26 @@ import voluptuous as vol
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    STATE_ATTRIBUTES_COLUMN,
+    StateAttributes,
     States,
+    StatesMeta,
+    Statistics,
+    StatisticsShortTerm,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
-from homeassistant.components.recorder.util import execute, session_scope
+from homeassistant.components.recorder.util import (
+    entity_ids_to_metadata_ids,
+    execute,
+    session_scope,
+)
 from homeassistant.const import (
     CONF_DOMAINS,
     CONF_ENTITIES,
     CONF_EXCLUDE,
     CONF_INCLUDE,
+    EVENT_STATE_CHANGED,
     HTTP_BAD_REQUEST,
 )
 from homeassistant.core import Context, State, split_entity_id
@@ -33,9 +44,12 @@ from homeassistant.helpers.entityfilter import (
     CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.helpers.typing import HomeAssistantType
 import homeassistant.util.dt as dt_util
 
+from .recent_states import RecentStates
+
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
 _LOGGER = logging.getLogger(__name__)
@@ -46,6 +60,8 @@ CONF_ORDER = "use_include_order"
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+STATISTICS_RESOLUTIONS = {"5minute": StatisticsShortTerm, "hour": Statistics}
+
 GLOB_TO_SQL_CHARS = {
     42: "%",  # *
     46: "_",  # .
@@ -76,15 +92,30 @@ NEED_ATTRIBUTE_DOMAINS = {
 }
 
 QUERY_STATES = [
-    States.domain,
-    States.entity_id,
+    StatesMeta.domain,
+    StatesMeta.entity_id,
     States.state,
-    States.attributes,
+    STATE_ATTRIBUTES_COLUMN,
     States.last_changed,
     States.last_updated,
 ]
 
 HISTORY_BAKERY = "history_bakery"
+DATA_RECENT_STATES = "history_recent_states"
+
+# Number of rows fetched from the database cursor at a time when streaming
+STREAM_BATCH_SIZE = 1000
+
+
+def _query_states(session):
+    """Query QUERY_STATES with the entity id and shared attributes joined in."""
+    return (
+        session.query(*QUERY_STATES)
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+    )
 
 
 def get_significant_states(hass, *args, **kwargs):
@@ -103,6 +134,7 @@ def _get_significant_states(
     include_start_time_state=True,
     significant_changes_only=True,
     minimal_response=False,
+    max_points=None,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -110,17 +142,134 @@ def _get_significant_states(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    With max_points numeric states are downsampled to about max_points
+    states per entity.
     """
+    if entity_ids is not None:
+        recent = _recent_significant_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            max_points,
+        )
+        if recent is not None:
+            return recent
+
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
+    states = execute(
+        _significant_states_query(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids,
+            filters,
+            significant_changes_only,
+        )
     )
 
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("get_significant_states took %fs", elapsed)
+
+    if max_points is not None:
+        states = _downsample_states(states, start_time, end_time, max_points)
+
+    return _sorted_states_to_json(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+    )
+
+
+def _recent_significant_states(
+    hass,
+    start_time,
+    end_time,
+    entity_ids,
+    include_start_time_state,
+    significant_changes_only,
+    minimal_response,
+    max_points,
+):
+    """Return the significant states from memory when they are recent enough.
+
+    Returns None when the recent states do not cover the period and the
+    database has to be queried.
+    """
+    recent_states = hass.data.get(DATA_RECENT_STATES)
+    if recent_states is None:
+        return None
+
+    states_during_period = recent_states.states_during_period(start_time, entity_ids)
+    if states_during_period is None:
+        return None
+
+    result = {}
+    for entity_id in entity_ids:
+        start_state, states = states_during_period[entity_id]
+        domain = split_entity_id(entity_id)[0]
+        states = [
+            state
+            for state in states
+            if (end_time is None or state.last_updated < end_time)
+            and (
+                not significant_changes_only
+                or domain in SIGNIFICANT_DOMAINS
+                or state.last_changed == state.last_updated
+            )
+        ]
+        if max_points is not None:
+            states = _downsample_states(states, start_time, end_time, max_points)
+
+        ent_results = []
+        if include_start_time_state and start_state is not None:
+            ent_results.append(
+                State(
+                    entity_id,
+                    start_state.state,
+                    start_state.attributes,
+                    start_time,
+                    start_time,
+                    start_state.context,
+                )
+            )
+        ent_results.extend(
+            _iter_entity_states(
+                entity_id,
+                iter(states),
+                minimal_response,
+                ent_results[-1] if ent_results else None,
+                to_state=lambda state: state,
+            )
+        )
+        if ent_results:
+            result[entity_id] = ent_results
+
+    return result
+
+
+def _significant_states_query(
+    hass, session, start_time, end_time, entity_ids, filters, significant_changes_only
+):
+    """Return the query of the significant states sorted by entity_id."""
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
+
     if significant_changes_only:
         baked_query += lambda q: q.filter(
             (
-                States.domain.in_(SIGNIFICANT_DOMAINS)
+                StatesMeta.domain.in_(SIGNIFICANT_DOMAINS)
                 | (States.last_changed == States.last_updated)
             )
             & (States.last_updated > bindparam("start_time"))
@@ -128,48 +277,115 @@ def _get_significant_states(
     else:
         baked_query += lambda q: q.filter(States.last_updated > bindparam("start_time"))
 
+    metadata_ids = None
     if entity_ids is not None:
+        metadata_ids = entity_ids_to_metadata_ids(session, entity_ids)
         baked_query += lambda q: q.filter(
-            States.entity_id.in_(bindparam("entity_ids", expanding=True))
+            States.metadata_id.in_(bindparam("metadata_ids", expanding=True))
         )
     else:
-        baked_query += lambda q: q.filter(~States.domain.in_(IGNORE_DOMAINS))
+        baked_query += lambda q: q.filter(~StatesMeta.domain.in_(IGNORE_DOMAINS))
         if filters:
             filters.bake(baked_query)
 
     if end_time is not None:
         baked_query += lambda q: q.filter(States.last_updated < bindparam("end_time"))
 
-    baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
+    baked_query += lambda q: q.order_by(StatesMeta.entity_id, States.last_updated)
 
-    states = execute(
-        baked_query(session).params(
-            start_time=start_time, end_time=end_time, entity_ids=entity_ids
-        )
+    return baked_query(session).params(
+        start_time=start_time, end_time=end_time, metadata_ids=metadata_ids
     )
 
-    if _LOGGER.isEnabledFor(logging.DEBUG):
-        elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug("get_significant_states took %fs", elapsed)
 
-    return _sorted_states_to_json(
+def _iter_significant_states(
+    hass,
+    session,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    significant_changes_only=True,
+    minimal_response=False,
+    max_points=None,
+):
+    """Yield the entity ids and significant states of each entity.
+
+    Unlike get_significant_states the states are read from the database
+    cursor in batches of STREAM_BATCH_SIZE rows and converted lazily, so
+    memory does not grow with the length of the period.
+    """
+    if entity_ids is not None:
+        recent = _recent_significant_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            max_points,
+        )
+        if recent is not None:
+            yield from recent.items()
+            return
+
+    if entity_ids is not None and len(entity_ids) > 1:
+        # Query the entities one by one to keep the requested order
+        for entity_id in entity_ids:
+            yield from _iter_significant_states(
+                hass,
+                session,
+                start_time,
+                end_time,
+                [entity_id],
+                filters,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                max_points,
+            )
+        return
+
+    start_states = {}
+    if include_start_time_state:
+        run = recorder.run_information_from_instance(hass, start_time)
+        for state in _get_states_with_session(
+            hass, session, start_time, entity_ids, run=run, filters=filters
+        ):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    query = _significant_states_query(
         hass,
         session,
-        states,
         start_time,
+        end_time,
         entity_ids,
         filters,
-        include_start_time_state,
-        minimal_response,
-    )
+        significant_changes_only,
+    ).with_post_criteria(lambda q: q.yield_per(STREAM_BATCH_SIZE))
+    if max_points is not None:
+        query = _downsample_states(query, start_time, end_time, max_points)
+
+    for ent_id, group in groupby(query, lambda state: state.entity_id):
+        start_state = start_states.pop(ent_id, None)
+        states = _iter_entity_states(ent_id, group, minimal_response, start_state)
+        if start_state is not None:
+            states = chain((start_state,), states)
+        yield ent_id, states
+
+    # Entities without changes during the period
+    for ent_id, start_state in start_states.items():
+        yield ent_id, iter((start_state,))
 
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
 
         baked_query += lambda q: q.filter(
             (States.last_changed == States.last_updated)
@@ -181,15 +397,19 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
                 States.last_updated < bindparam("end_time")
             )
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
             entity_id = entity_id.lower()
+            metadata_id = _entity_id_to_metadata_id(session, entity_id)
 
-        baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
+        baked_query += lambda q: q.order_by(States.metadata_id, States.last_updated)
 
         states = execute(
             baked_query(session).params(
-                start_time=start_time, end_time=end_time, entity_id=entity_id
+                start_time=start_time, end_time=end_time, metadata_id=metadata_id
             )
         )
 
@@ -203,24 +423,26 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
         baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
             entity_id = entity_id.lower()
+            metadata_id = _entity_id_to_metadata_id(session, entity_id)
 
         baked_query += lambda q: q.order_by(
-            States.entity_id, States.last_updated.desc()
+            States.metadata_id, States.last_updated.desc()
         )
 
         baked_query += lambda q: q.limit(bindparam("number_of_states"))
 
         states = execute(
             baked_query(session).params(
-                number_of_states=number_of_states, entity_id=entity_id
+                number_of_states=number_of_states, metadata_id=metadata_id
             )
         )
 
@@ -236,6 +458,57 @@ def get_last_state_changes(hass, number_of_states, entity_id):
         )
 
 
+def statistics_during_period(
+    hass, start_time, end_time=None, entity_ids=None, resolution="hour"
+):
+    """Return compiled statistics during UTC period start_time - end_time.
+
+    Statistics are read from the long term statistics tables and are
+    kept when the states they were compiled from are purged.
+    """
+    table = STATISTICS_RESOLUTIONS[resolution]
+    result = defaultdict(list)
+
+    with session_scope(hass=hass) as session:
+        query = (
+            session.query(
+                StatesMeta.entity_id,
+                table.start,
+                table.mean,
+                table.min,
+                table.max,
+            )
+            .join(StatesMeta, table.metadata_id == StatesMeta.metadata_id)
+            .filter(table.start >= start_time)
+        )
+        if end_time is not None:
+            query = query.filter(table.start < end_time)
+        if entity_ids is not None:
+            query = query.filter(
+                table.metadata_id.in_(entity_ids_to_metadata_ids(session, entity_ids))
+            )
+        query = query.order_by(StatesMeta.entity_id, table.start)
+
+        for entity_id, start, mean, min_, max_ in execute(query):
+            result[entity_id].append(
+                {
+                    "entity_id": entity_id,
+                    "start": process_timestamp_to_utc_isoformat(start),
+                    "mean": mean,
+                    "min": min_,
+                    "max": max_,
+                }
+            )
+
+    return dict(result)
+
+
+def _entity_id_to_metadata_id(session, entity_id):
+    """Return the states_meta id of an entity id or None if never recorded."""
+    metadata_ids = entity_ids_to_metadata_ids(session, [entity_id])
+    return metadata_ids[0] if metadata_ids else None
+
+
 def get_states(hass, utc_point_in_time, entity_ids=None, run=None, filters=None):
     """Return the states at a specific point in time."""
     if run is None:
@@ -270,19 +543,25 @@ def _get_states_with_session(
     # We have more than one entity to look at (most commonly we want
     # all entities,) so we need to do a search on all states since the
     # last recorder run started.
-    query = session.query(*QUERY_STATES)
+    query = _query_states(session)
+
+    metadata_ids = None
+    if entity_ids is not None:
+        metadata_ids = entity_ids_to_metadata_ids(session, entity_ids)
 
     most_recent_states_by_date = session.query(
-        States.entity_id.label("max_entity_id"),
+        States.metadata_id.label("max_metadata_id"),
         func.max(States.last_updated).label("max_last_updated"),
     ).filter(
         (States.last_updated >= run.start) & (States.last_updated < utc_point_in_time)
     )
 
-    if entity_ids:
-        most_recent_states_by_date.filter(States.entity_id.in_(entity_ids))
+    if metadata_ids:
+        most_recent_states_by_date = most_recent_states_by_date.filter(
+            States.metadata_id.in_(metadata_ids)
+        )
 
-    most_recent_states_by_date = most_recent_states_by_date.group_by(States.entity_id)
+    most_recent_states_by_date = most_recent_states_by_date.group_by(States.metadata_id)
 
     most_recent_states_by_date = most_recent_states_by_date.subquery()
 
@@ -291,12 +570,12 @@ def _get_states_with_session(
     ).join(
         most_recent_states_by_date,
         and_(
-            States.entity_id == most_recent_states_by_date.c.max_entity_id,
+            States.metadata_id == most_recent_states_by_date.c.max_metadata_id,
             States.last_updated == most_recent_states_by_date.c.max_last_updated,
         ),
     )
 
-    most_recent_state_ids = most_recent_state_ids.group_by(States.entity_id)
+    most_recent_state_ids = most_recent_state_ids.group_by(States.metadata_id)
 
     most_recent_state_ids = most_recent_state_ids.subquery()
 
@@ -305,31 +584,33 @@ def _get_states_with_session(
         States.state_id == most_recent_state_ids.c.max_state_id,
     )
 
-    if entity_ids is not None:
-        query = query.filter(States.entity_id.in_(entity_ids))
+    if metadata_ids is not None:
+        query = query.filter(States.metadata_id.in_(metadata_ids))
     else:
-        query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
+        query = query.filter(~StatesMeta.domain.in_(IGNORE_DOMAINS))
         if filters:
             query = filters.apply(query)
 
+    # Keep the result ordered by entity_id like the states after the start time
+    query = query.order_by(StatesMeta.entity_id)
+
     return [LazyState(row) for row in execute(query)]
 
 
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
     baked_query += lambda q: q.filter(
         States.last_updated < bindparam("utc_point_in_time"),
-        States.entity_id == bindparam("entity_id"),
+        States.metadata_id == bindparam("metadata_id"),
     )
     baked_query += lambda q: q.order_by(States.last_updated.desc())
     baked_query += lambda q: q.limit(1)
 
     query = baked_query(session).params(
-        utc_point_in_time=utc_point_in_time, entity_id=entity_id
+        utc_point_in_time=utc_point_in_time,
+        metadata_id=_entity_id_to_metadata_id(session, entity_id),
     )
 
     return [LazyState(row) for row in execute(query)]
@@ -377,51 +658,139 @@ def _sorted_states_to_json(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
-    # Called in a tight loop so cache the function
-    # here
-    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
-
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
-        domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
-        if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(LazyState(db_state) for db_state in group)
+        ent_results.extend(
+            _iter_entity_states(
+                ent_id,
+                group,
+                minimal_response,
+                ent_results[-1] if ent_results else None,
+            )
+        )
+
+    # Filter out the empty lists if some states had 0 results.
+    return {key: val for key, val in result.items() if val}
+
 
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            ent_results.append(LazyState(next(group)))
+def _downsample_states(states, start_time, end_time, max_points):
+    """Downsample the numeric states of each entity to about max_points.
 
-        prev_state = ent_results[-1]
-        initial_state_count = len(ent_results)
+    The period is split in max_points / 2 buckets and only the minimum
+    and maximum state of each bucket are kept, so peaks stay visible.
+    Non numeric states and the last state of an entity are always kept.
+
+    States must be sorted by entity_id and last_updated.
+    """
+    if end_time is None:
+        end_time = dt_util.utcnow()
+    bucket_size = (end_time - start_time) / max(1, max_points // 2)
+    if not bucket_size:
+        return states
+
+    def downsample_entity(group):
+        """Yield the minimum and maximum state per bucket."""
+        bucket = None
+        low = high = last = None
 
         for db_state in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
-            if db_state.state == prev_state.state:
+            last = db_state
+            try:
+                value = float(db_state.state)
+            except (TypeError, ValueError):
+                value = None
+
+            state_bucket = (
+                None
+                if value is None
+                else (process_timestamp(db_state.last_updated) - start_time)
+                // bucket_size
+            )
+            if state_bucket != bucket or state_bucket is None:
+                if low is not None:
+                    yield from _bucket_states(low, high)
+                bucket = state_bucket
+                low = high = None
+
+            if value is None:
+                yield db_state
                 continue
 
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
-            )
-            prev_state = db_state
+            if low is None or value < low[0]:
+                low = (value, db_state)
+            if high is None or value > high[0]:
+                high = (value, db_state)
 
-        if prev_state and len(ent_results) != initial_state_count:
-            # There was at least one state change
-            # replace the last minimal state with
-            # a full state
-            ent_results[-1] = LazyState(prev_state)
+        if low is not None:
+            yield from _bucket_states(low, high)
+            if last is not low[1] and last is not high[1]:
+                yield last
 
-    # Filter out the empty lists if some states had 0 results.
-    return {key: val for key, val in result.items() if val}
+    return chain.from_iterable(
+        downsample_entity(group)
+        for _, group in groupby(states, lambda state: state.entity_id)
+    )
+
+
+def _bucket_states(low, high):
+    """Return the minimum and maximum state of a bucket in time order."""
+    if low[1] is high[1]:
+        return (low[1],)
+    if low[1].last_updated <= high[1].last_updated:
+        return (low[1], high[1])
+    return (high[1], low[1])
+
+
+def _iter_entity_states(
+    ent_id, group, minimal_response, prev_state=None, to_state=None
+):
+    """Yield the states of an entity from its sorted database rows.
+
+    prev_state is the state of the entity at the start of the period,
+    if any, and is not yielded again. to_state converts a row to the
+    returned state and defaults to LazyState.
+    """
+    if to_state is None:
+        to_state = LazyState
+    domain = split_entity_id(ent_id)[0]
+    if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
+        for db_state in group:
+            yield to_state(db_state)
+        return
+
+    # With minimal response we only provide a native
+    # State for the first and last response. All the states
+    # in-between only provide the "state" and the
+    # "last_changed".
+    if prev_state is None:
+        prev_state = next(group)
+        yield to_state(prev_state)
+
+    # Called in a tight loop so cache the function
+    # here
+    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
+
+    last_state = None
+    for db_state in group:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if db_state.state == prev_state.state:
+            continue
+
+        if last_state is not None:
+            yield {
+                STATE_KEY: last_state.state,
+                LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
+                    last_state.last_changed
+                ),
+            }
+        last_state = prev_state = db_state
+
+    if last_state is not None:
+        # There was at least one state change
+        # the last state is a full state
+        yield to_state(last_state)
 
 
 def get_state(hass, utc_point_in_time, entity_id, run=None):
@@ -438,6 +807,13 @@ async def async_setup(hass, config):
 
     hass.data[HISTORY_BAKERY] = baked.bakery()
 
+    instance = hass.data.get(recorder.DATA_INSTANCE)
+    if instance is not None and EVENT_STATE_CHANGED not in instance.exclude_t:
+        recent_states = hass.data[DATA_RECENT_STATES] = RecentStates(
+            hass, instance.entity_filter
+        )
+        recent_states.async_start()
+
     use_include_order = conf.get(CONF_ORDER)
 
     hass.http.register_view(HistoryPeriodView(filters, use_include_order))
@@ -462,7 +838,7 @@ class HistoryPeriodView(HomeAssistantView):
 
     async def get(
         self, request: web.Request, datetime: Optional[str] = None
-    ) -> web.Response:
+    ) -> web.StreamResponse:
         """Return history over a period of time."""
         datetime_ = None
         if datetime:
@@ -502,8 +878,34 @@ class HistoryPeriodView(HomeAssistantView):
 
         minimal_response = "minimal_response" in request.query
 
+        max_points = None
+        max_points_str = request.query.get("max_points")
+        if max_points_str is not None:
+            try:
+                max_points = int(max_points_str)
+            except ValueError:
+                max_points = 0
+            if max_points < 2:
+                return self.json_message("Invalid max_points", HTTP_BAD_REQUEST)
+
         hass = request.app["hass"]
 
+        resolution = request.query.get("resolution")
+        if resolution is not None:
+            if resolution not in STATISTICS_RESOLUTIONS:
+                return self.json_message("Invalid resolution", HTTP_BAD_REQUEST)
+            return cast(
+                web.Response,
+                await hass.async_add_executor_job(
+                    self._statistics_json,
+                    hass,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    resolution,
+                ),
+            )
+
         if (
             not include_start_time_state
             and entity_ids
@@ -511,6 +913,22 @@ class HistoryPeriodView(HomeAssistantView):
         ):
             return self.json([])
 
+        if not (self.filters and self.use_include_order):
+            return await self.json_stream(
+                request,
+                partial(
+                    self._significant_states_json_fragments,
+                    hass,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    max_points,
+                ),
+            )
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -522,9 +940,54 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                max_points,
             ),
         )
 
+    def _statistics_json(self, hass, start_time, end_time, entity_ids, resolution):
+        """Fetch compiled statistics from the database as json."""
+        result = statistics_during_period(
+            hass, start_time, end_time, entity_ids, resolution
+        )
+        return self.json(list(result.values()))
+
+    def _significant_states_json_fragments(
+        self,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        max_points,
+    ):
+        """Yield the significant states as JSON, one state at a time."""
+        encoder = JSONEncoder(allow_nan=False)
+        with session_scope(hass=hass) as session:
+            yield "["
+            for index, (_, states) in enumerate(
+                _iter_significant_states(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    max_points,
+                )
+            ):
+                yield "[" if index == 0 else ",["
+                for state_index, state in enumerate(states):
+                    if state_index:
+                        yield ","
+                    yield encoder.encode(state)
+                yield "]"
+            yield "]"
+
     def _sorted_significant_states_json(
         self,
         hass,
@@ -534,6 +997,7 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        max_points,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
@@ -549,6 +1013,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                max_points,
             )
 
         result = list(result.values())
@@ -638,17 +1103,17 @@ class Filters:
         """Generate the entity filter query."""
         includes = []
         if self.included_domains:
-            includes.append(States.domain.in_(self.included_domains))
+            includes.append(StatesMeta.domain.in_(self.included_domains))
         if self.included_entities:
-            includes.append(States.entity_id.in_(self.included_entities))
+            includes.append(StatesMeta.entity_id.in_(self.included_entities))
         for glob in self.included_entity_globs:
             includes.append(_glob_to_like(glob))
 
         excludes = []
         if self.excluded_domains:
-            excludes.append(States.domain.in_(self.excluded_domains))
+            excludes.append(StatesMeta.domain.in_(self.excluded_domains))
         if self.excluded_entities:
-            excludes.append(States.entity_id.in_(self.excluded_entities))
+            excludes.append(StatesMeta.entity_id.in_(self.excluded_entities))
         for glob in self.excluded_entity_globs:
             excludes.append(_glob_to_like(glob))
 
@@ -666,7 +1131,7 @@ class Filters:
 
 def _glob_to_like(glob_str):
     """Translate glob to sql."""
-    return States.entity_id.like(glob_str.translate(GLOB_TO_SQL_CHARS))
+    return StatesMeta.entity_id.like(glob_str.translate(GLOB_TO_SQL_CHARS))
 
 
 def _entities_may_have_state_changes_after(
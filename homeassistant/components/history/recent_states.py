@@ -0,0 +1,130 @@
+"""Keep the recent states of each entity in memory."""
+from collections import deque
+from datetime import datetime, timedelta
+import threading
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State, callback
+import homeassistant.util.dt as dt_util
+
+# Number of states kept per entity
+RECENT_STATES_SIZE = 256
+# States older than this are evicted when a new state is added
+RECENT_STATES_MAX_AGE = timedelta(hours=6)
+
+
+class _EntityStates:
+    """The recent states of an entity."""
+
+    __slots__ = ["states", "covered_since"]
+
+    def __init__(self, covered_since: datetime):
+        """Initialize the entity states."""
+        self.states: Deque[State] = deque()
+        # All states of the entity after this time are in states
+        self.covered_since = covered_since
+
+
+class RecentStates:
+    """Ring buffers of the recent states of each recorded entity.
+
+    The buffers are fed by state_changed events in the event loop and
+    answer history queries of recent periods from executor threads without
+    going to the database. A lock keeps both sides consistent.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_filter: Callable[[str], bool],
+        size: int = RECENT_STATES_SIZE,
+        max_age: timedelta = RECENT_STATES_MAX_AGE,
+    ) -> None:
+        """Initialize the recent states."""
+        self.hass = hass
+        self.entity_filter = entity_filter
+        self.size = size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.since: Optional[datetime] = None
+        self._entities: Dict[str, _EntityStates] = {}
+        self._removed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @callback
+    def async_start(self) -> None:
+        """Start tracking the states, starting with the current ones."""
+        since = self.since = dt_util.utcnow()
+        with self._lock:
+            for state in self.hass.states.async_all():
+                if self.entity_filter(state.entity_id):
+                    entity_states = self._entities[state.entity_id] = _EntityStates(
+                        since
+                    )
+                    entity_states.states.append(state)
+
+        self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Add the new state of an entity."""
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+
+        if new_state is None:
+            # The removal is recorded, the database has to answer for it
+            with self._lock:
+                if self._entities.pop(entity_id, None) is not None:
+                    self._removed.add(entity_id)
+            return
+
+        entity_states = self._entities.get(entity_id)
+        if entity_states is None and not self.entity_filter(entity_id):
+            return
+
+        with self._lock:
+            if entity_states is None:
+                assert self.since is not None
+                # New entities had no state since we started tracking
+                entity_states = self._entities[entity_id] = _EntityStates(
+                    new_state.last_updated if entity_id in self._removed else self.since
+                )
+
+            states = entity_states.states
+            states.append(new_state)
+            max_age = new_state.last_updated - self.max_age
+            while len(states) > self.size or states[0].last_updated < max_age:
+                states.popleft()
+                entity_states.covered_since = states[0].last_updated
+
+    def states_during_period(
+        self, start_time: datetime, entity_ids: Iterable[str]
+    ) -> Optional[Dict[str, Tuple[Optional[State], List[State]]]]:
+        """Return the state at start_time and the later states of entities.
+
+        Returns None when the states since start_time of any of the
+        entities are not all in memory. Safe to call from any thread.
+        """
+        snapshots: Dict[str, Tuple[State, ...]] = {}
+        with self._lock:
+            for entity_id in entity_ids:
+                entity_states = self._entities.get(entity_id)
+                if entity_states is None or start_time <= entity_states.covered_since:
+                    self.misses += 1
+                    return None
+                snapshots[entity_id] = tuple(entity_states.states)
+            self.hits += 1
+
+        periods = {}
+        for entity_id, snapshot in snapshots.items():
+            start_state = None
+            states = []
+            for state in snapshot:
+                if state.last_updated < start_time:
+                    start_state = state
+                elif state.last_updated > start_time:
+                    states.append(state)
+            periods[entity_id] = (start_state, states)
+        return periods
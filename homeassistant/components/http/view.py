@@ -2,7 +2,8 @@
 import asyncio
 import json
 import logging
-from typing import Any, Callable, List, Optional
+import threading
+from typing import Any, Callable, Iterable, List, Optional
 
 from aiohttp import web
 from aiohttp.typedefs import LooseHeaders
@@ -22,6 +23,14 @@ from .const import KEY_AUTHENTICATED, KEY_HASS
 
 _LOGGER = logging.getLogger(__name__)
 
+# Size in characters of the chunks written by json_stream
+JSON_STREAM_CHUNK_SIZE = 65536
+# Number of chunks json_stream buffers between the executor and the client
+JSON_STREAM_QUEUE_SIZE = 4
+# Number of JSON documents streamed at once, each holds an executor thread
+JSON_STREAM_MAX_CONCURRENT = 4
+DATA_JSON_STREAMS = "http.json_streams"
+
 
 class HomeAssistantView:
     """Base view for all views."""
@@ -62,6 +71,92 @@ class HomeAssistantView:
         response.enable_compression()
         return response
 
+    @staticmethod
+    async def json_stream(
+        request: web.Request,
+        fragments: Callable[[], Iterable[str]],
+        status_code: int = HTTP_OK,
+    ) -> web.StreamResponse:
+        """Stream a JSON document to the client in chunks.
+
+        fragments is called in the executor and must return an iterable of
+        JSON text that together form the document. Only a few chunks are
+        buffered at a time, so slow clients throttle the producer.
+
+        The response is only started once the first chunk is produced, so
+        errors before that still result in an error response. At most
+        JSON_STREAM_MAX_CONCURRENT documents are produced at once, further
+        requests wait for a free slot.
+        """
+        hass = request.app[KEY_HASS]
+        chunks: asyncio.Queue = asyncio.Queue(JSON_STREAM_QUEUE_SIZE)
+        cancelled = threading.Event()
+
+        def put(chunk: Optional[str]) -> None:
+            """Hand a chunk to the event loop."""
+            asyncio.run_coroutine_threadsafe(chunks.put(chunk), hass.loop).result()
+
+        def produce() -> None:
+            """Join the fragments into chunks."""
+            buffer: List[str] = []
+            size = 0
+            try:
+                for fragment in fragments():
+                    if cancelled.is_set():
+                        return
+                    buffer.append(fragment)
+                    size += len(fragment)
+                    if size >= JSON_STREAM_CHUNK_SIZE:
+                        put("".join(buffer))
+                        buffer = []
+                        size = 0
+                put("".join(buffer))
+            finally:
+                put(None)
+
+        async def drain() -> None:
+            """Stop the producer and wait for it to finish."""
+            cancelled.set()
+            while await chunks.get() is not None:
+                pass
+            await producer
+
+        semaphore = hass.data.get(DATA_JSON_STREAMS)
+        if semaphore is None:
+            semaphore = hass.data[DATA_JSON_STREAMS] = asyncio.Semaphore(
+                JSON_STREAM_MAX_CONCURRENT
+            )
+
+        async with semaphore:
+            producer = hass.async_add_executor_job(produce)
+            # Not None as long as the producer may still be running
+            chunk: Optional[str] = ""
+            try:
+                chunk = await chunks.get()
+                if chunk is None:
+                    # Raise the error of the producer while a regular
+                    # error response can still be sent
+                    await producer
+                    raise HTTPInternalServerError
+
+                response = web.StreamResponse(
+                    status=status_code, headers={"Content-Type": CONTENT_TYPE_JSON}
+                )
+                response.enable_compression()
+                await response.prepare(request)
+                while chunk is not None:
+                    await response.write(chunk.encode("UTF-8"))
+                    chunk = await chunks.get()
+            finally:
+                if chunk is not None:
+                    # Unblock the producer when the request was cancelled or
+                    # writing to the client failed, even if cancelled again
+                    await asyncio.shield(drain())
+            await producer
+
+        await response.write_eof()
+        return response
+
     def json_message(
         self,
         message: str,
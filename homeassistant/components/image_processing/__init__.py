@@ -3,8 +3,10 @@ import asyncio
 from datetime import timedelta
 import logging
 
+from attr import asdict
 import voluptuous as vol
 
+from homeassistant.components import websocket_api
 from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME, CONF_ENTITY_ID, CONF_NAME
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
@@ -14,11 +16,14 @@ from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.util.async_ import run_callback_threadsafe
 
+from .pipeline import ImageProcessingPipeline
+
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "image_processing"
+DATA_PIPELINE = "image_processing_pipeline"
 SCAN_INTERVAL = timedelta(seconds=10)
 
 DEVICE_CLASSES = [
@@ -65,6 +70,7 @@ PLATFORM_SCHEMA_BASE = cv.PLATFORM_SCHEMA_BASE.extend(PLATFORM_SCHEMA.schema)
 
 async def async_setup(hass, config):
     """Set up the image processing."""
+    hass.data[DATA_PIPELINE] = ImageProcessingPipeline(hass)
     component = EntityComponent(_LOGGER, DOMAIN, hass, SCAN_INTERVAL)
 
     await component.async_setup(config)
@@ -85,9 +91,18 @@ async def async_setup(hass, config):
         DOMAIN, SERVICE_SCAN, async_scan_service, schema=make_entity_service_schema({})
     )
 
+    hass.components.websocket_api.async_register_command(websocket_pipeline_stats)
+
     return True
 
 
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "image_processing/stats"})
+def websocket_pipeline_stats(hass, connection, msg):
+    """Get statistics of the image processing pipeline."""
+    connection.send_result(msg["id"], asdict(hass.data[DATA_PIPELINE].stats))
+
+
 class ImageProcessingEntity(Entity):
     """Base entity class for image processing."""
 
@@ -109,18 +124,23 @@ class ImageProcessingEntity(Entity):
 
     async def async_process_image(self, image):
         """Process image."""
-        return await self.hass.async_add_executor_job(self.process_image, image)
+        return await self.hass.data[DATA_PIPELINE].async_add_detection_job(
+            self.process_image, image
+        )
 
     async def async_update(self):
         """Update image and process it.
 
+        The frame is shared with the processors of the same camera and
+        the update is skipped while the previous image is processed.
+
         This method is a coroutine.
         """
-        camera = self.hass.components.camera
+        pipeline = self.hass.data[DATA_PIPELINE]
         image = None
 
         try:
-            image = await camera.async_get_image(
+            image = await pipeline.async_get_frame(
                 self.camera_entity, timeout=self.timeout
             )
 
@@ -129,7 +149,10 @@ class ImageProcessingEntity(Entity):
             return
 
         # process image data
-        await self.async_process_image(image.content)
+        if not await pipeline.async_detect(
+            self, self.async_process_image, image.content
+        ):
+            _LOGGER.debug("Skipped processing busy %s", self.entity_id)
 
 
 class ImageProcessingFaceEntity(ImageProcessingEntity):
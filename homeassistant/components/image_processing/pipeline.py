@@ -0,0 +1,131 @@
+"""Pipeline feeding camera frames to image processing entities."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Set
+
+import attr
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+if TYPE_CHECKING:
+    from . import ImageProcessingEntity
+
+# mypy: allow-untyped-calls
+
+# Frames fetched within a tick are shared by the processors of a camera
+FRAME_TICK = 1.0
+# Detections running at the same time, other processors skip their tick
+MAX_DETECTION_WORKERS = min(4, os.cpu_count() or 1)
+
+
+@attr.s(slots=True)
+class StageStats:
+    """Statistics of a stage of the pipeline."""
+
+    count: int = attr.ib(default=0)
+    # Runs skipped because the stage was busy
+    skipped: int = attr.ib(default=0)
+    # Seconds taken by the last run and the slowest one
+    latency: float = attr.ib(default=0.0)
+    max_latency: float = attr.ib(default=0.0)
+
+    @callback
+    def add(self, start: float) -> None:
+        """Account for a run started at a monotonic time."""
+        self.count += 1
+        self.latency = time.monotonic() - start
+        self.max_latency = max(self.max_latency, self.latency)
+
+
+@attr.s(slots=True)
+class PipelineStats:
+    """Statistics of the image processing pipeline."""
+
+    fetch: StageStats = attr.ib(factory=StageStats)
+    # Frames handed to a processor from a fetch of another processor
+    shared_frames: int = attr.ib(default=0)
+    detect: StageStats = attr.ib(factory=StageStats)
+
+
+class ImageProcessingPipeline:
+    """Fetch camera frames once per tick and run detections on a bounded pool.
+
+    Processors of the same camera polled within a tick share the frame of
+    a single fetch. Detections run on a dedicated executor so they do not
+    hold back the jobs of the shared one. A processor whose previous
+    detection is still running, or finding all workers busy, skips the
+    frame instead of queueing it.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_workers: int = MAX_DETECTION_WORKERS
+    ) -> None:
+        """Initialize the pipeline."""
+        self.hass = hass
+        self.max_workers = max_workers
+        self.stats = PipelineStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ImageProcessing"
+        )
+        self._frames: Dict[str, "asyncio.Future[Any]"] = {}
+        # Entity ids of the processors running a detection
+        self._busy: Set[str] = set()
+
+        @callback
+        def shutdown(_: Event) -> None:
+            """Stop the detection workers."""
+            self._executor.shutdown(wait=False)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, shutdown)
+
+    async def async_get_frame(self, camera_entity: str, timeout: int) -> Any:
+        """Return a frame of a camera, shared by the processors of a tick."""
+        frame = self._frames.get(camera_entity)
+        if frame is not None:
+            self.stats.shared_frames += 1
+        else:
+            frame = self._frames[camera_entity] = self.hass.async_create_task(
+                self._async_fetch_frame(camera_entity, timeout)
+            )
+        # A processor timing out must not cancel the fetch of the others
+        return await asyncio.shield(frame)
+
+    async def _async_fetch_frame(self, camera_entity: str, timeout: int) -> Any:
+        """Fetch a frame, kept for the processors polled within the tick."""
+        start = time.monotonic()
+        try:
+            return await self.hass.components.camera.async_get_image(
+                camera_entity, timeout=timeout
+            )
+        finally:
+            self.stats.fetch.add(start)
+            self.hass.loop.call_later(FRAME_TICK, self._frames.pop, camera_entity)
+
+    async def async_detect(
+        self,
+        entity: "ImageProcessingEntity",
+        detect: Callable[[Any], Awaitable[Any]],
+        image: Any,
+    ) -> bool:
+        """Run the detection of a processor, return False if it was skipped."""
+        if entity.entity_id in self._busy or len(self._busy) >= self.max_workers:
+            self.stats.detect.skipped += 1
+            return False
+
+        self._busy.add(entity.entity_id)
+        start = time.monotonic()
+        try:
+            await detect(image)
+        finally:
+            self._busy.discard(entity.entity_id)
+            self.stats.detect.add(start)
+        return True
+
+    def async_add_detection_job(
+        self, target: Callable[..., Any], *args: Any
+    ) -> "asyncio.Future[Any]":
+        """Run a blocking detection on the pool of the pipeline."""
+        return self.hass.loop.run_in_executor(self._executor, target, *args)
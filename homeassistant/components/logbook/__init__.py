@@ -13,11 +13,18 @@ from homeassistant.components.automation import EVENT_AUTOMATION_TRIGGERED
 from homeassistant.components.history import sqlalchemy_filter_from_include_exclude_conf
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    STATE_ATTRIBUTES_COLUMN,
     Events,
+    EventTypes,
+    StateAttributes,
     States,
+    StatesMeta,
     process_timestamp_to_utc_isoformat,
 )
-from homeassistant.components.recorder.util import session_scope
+from homeassistant.components.recorder.util import (
+    entity_ids_to_metadata_ids,
+    session_scope,
+)
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
 from homeassistant.const import (
     ATTR_DOMAIN,
@@ -42,8 +49,10 @@ from homeassistant.helpers.entityfilter import (
     generate_filter,
 )
 from homeassistant.helpers.integration_platform import (
+    async_ensure_integration_platforms,
     async_process_integration_platforms,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -88,7 +97,7 @@ ALL_EVENT_TYPES = [
 ]
 
 EVENT_COLUMNS = [
-    Events.event_type,
+    EventTypes.event_type,
     Events.event_data,
     Events.time_fired,
     Events.context_id,
@@ -164,7 +173,9 @@ async def async_setup(hass, config):
 
     hass.services.async_register(DOMAIN, "log", log_message, schema=LOG_MESSAGE_SCHEMA)
 
-    await async_process_integration_platforms(hass, DOMAIN, _process_logbook_platform)
+    await async_process_integration_platforms(
+        hass, DOMAIN, _process_logbook_platform, deferrable=True
+    )
 
     return True
 
@@ -233,10 +244,14 @@ class LogbookView(HomeAssistantView):
 
         entity_matches_only = "entity_matches_only" in request.query
 
+        await async_ensure_integration_platforms(hass, DOMAIN)
+
         def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(
+            """Fetch events and generate JSON, one entry at a time."""
+            encoder = JSONEncoder(allow_nan=False)
+            yield "["
+            for index, entry in enumerate(
+                _iter_events(
                     hass,
                     start_day,
                     end_day,
@@ -245,9 +260,13 @@ class LogbookView(HomeAssistantView):
                     self.entities_filter,
                     entity_matches_only,
                 )
-            )
+            ):
+                if index:
+                    yield ","
+                yield encoder.encode(entry)
+            yield "]"
 
-        return await hass.async_add_executor_job(json_events)
+        return await self.json_stream(request, json_events)
 
 
 def humanify(hass, events, entity_attr_cache, context_lookup):
@@ -421,6 +440,29 @@ def _get_events(
     entity_matches_only=False,
 ):
     """Get events for a period of time."""
+    return list(
+        _iter_events(
+            hass,
+            start_day,
+            end_day,
+            entity_ids,
+            filters,
+            entities_filter,
+            entity_matches_only,
+        )
+    )
+
+
+def _iter_events(
+    hass,
+    start_day,
+    end_day,
+    entity_ids=None,
+    filters=None,
+    entities_filter=None,
+    entity_matches_only=False,
+):
+    """Yield the logbook entries of a period of time as they are read."""
 
     entity_attr_cache = EntityAttributeCache(hass)
     context_lookup = {None: None}
@@ -444,7 +486,8 @@ def _get_events(
         old_state = aliased(States, name="old_state")
 
         if entity_ids is not None:
-            query = _generate_events_query_without_states(session)
+            query = _generate_events_query_without_states(session).select_from(Events)
+            query = _join_event_types(query)
             query = _apply_event_time_filter(query, start_day, end_day)
             query = _apply_event_types_filter(
                 hass, query, ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED
@@ -456,27 +499,33 @@ def _get_events(
 
             query = query.union_all(
                 _generate_states_query(
-                    session, start_day, end_day, old_state, entity_ids
+                    session,
+                    start_day,
+                    end_day,
+                    old_state,
+                    entity_ids_to_metadata_ids(session, entity_ids),
                 )
             )
         else:
-            query = _generate_events_query(session)
+            query = _generate_events_query(session).select_from(Events)
+            query = _join_event_types(query)
             query = _apply_event_time_filter(query, start_day, end_day)
             query = _apply_events_types_and_states_filter(
                 hass, query, old_state
             ).filter(
                 (States.last_updated == States.last_changed)
-                | (Events.event_type != EVENT_STATE_CHANGED)
+                | (EventTypes.event_type != EVENT_STATE_CHANGED)
             )
             if filters:
                 query = query.filter(
-                    filters.entity_filter() | (Events.event_type != EVENT_STATE_CHANGED)
+                    filters.entity_filter()
+                    | (EventTypes.event_type != EVENT_STATE_CHANGED)
                 )
 
         query = query.order_by(Events.time_fired)
 
-        return list(
-            humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
+        yield from humanify(
+            hass, yield_events(query), entity_attr_cache, context_lookup
         )
 
 
@@ -484,9 +533,9 @@ def _generate_events_query(session):
     return session.query(
         *EVENT_COLUMNS,
         States.state,
-        States.entity_id,
-        States.domain,
-        States.attributes,
+        StatesMeta.entity_id,
+        StatesMeta.domain,
+        STATE_ATTRIBUTES_COLUMN,
     )
 
 
@@ -500,17 +549,27 @@ def _generate_events_query_without_states(session):
     )
 
 
-def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
+def _join_event_types(query):
+    return query.join(EventTypes, (Events.event_type_id == EventTypes.event_type_id))
+
+
+def _generate_states_query(session, start_day, end_day, old_state, metadata_ids):
     return (
         _generate_events_query(session)
+        .select_from(States)
+        .join(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
         .outerjoin(Events, (States.event_id == Events.event_id))
+        .outerjoin(EventTypes, (Events.event_type_id == EventTypes.event_type_id))
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .filter(_missing_state_matcher(old_state))
         .filter(_continuous_entity_matcher())
         .filter((States.last_updated > start_day) & (States.last_updated < end_day))
         .filter(
             (States.last_updated == States.last_changed)
-            & States.entity_id.in_(entity_ids)
+            & States.metadata_id.in_(metadata_ids)
         )
     )
 
@@ -518,13 +577,18 @@ def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
 def _apply_events_types_and_states_filter(hass, query, old_state):
     events_query = (
         query.outerjoin(States, (Events.event_id == States.event_id))
+        .outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .filter(
-            (Events.event_type != EVENT_STATE_CHANGED)
+            (EventTypes.event_type != EVENT_STATE_CHANGED)
             | _missing_state_matcher(old_state)
         )
         .filter(
-            (Events.event_type != EVENT_STATE_CHANGED) | _continuous_entity_matcher()
+            (EventTypes.event_type != EVENT_STATE_CHANGED)
+            | _continuous_entity_matcher()
         )
     )
     return _apply_event_types_filter(hass, events_query, ALL_EVENT_TYPES)
@@ -547,8 +611,8 @@ def _continuous_entity_matcher():
     # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
     #
     return sqlalchemy.or_(
-        sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS)),
-        sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON)),
+        sqlalchemy.not_(StatesMeta.domain.in_(CONTINUOUS_DOMAINS)),
+        sqlalchemy.not_(STATE_ATTRIBUTES_COLUMN.contains(UNIT_OF_MEASUREMENT_JSON)),
     )
 
 
@@ -560,7 +624,7 @@ def _apply_event_time_filter(events_query, start_day, end_day):
 
 def _apply_event_types_filter(hass, query, event_types):
     return query.filter(
-        Events.event_type.in_(event_types + list(hass.data.get(DOMAIN, {})))
+        EventTypes.event_type.in_(event_types + list(hass.data.get(DOMAIN, {})))
     )
 
 
@@ -1,15 +1,15 @@
 """Support for MQTT message handling."""
 import asyncio
-from functools import lru_cache, partial, wraps
+from collections import deque
+from functools import partial, wraps
 import inspect
 from itertools import groupby
-import json
 import logging
 from operator import attrgetter
 import os
 import ssl
 import time
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 import uuid
 
 import attr
@@ -84,6 +84,7 @@ from .discovery import (
 )
 from .models import Message, MessageCallbackType, PublishPayloadType
 from .subscription import async_subscribe_topics, async_unsubscribe_topics
+from .trie import TopicTrie
 from .util import _VALID_QOS_SCHEMA, valid_publish_topic, valid_subscribe_topic
 
 _LOGGER = logging.getLogger(__name__)
@@ -493,6 +494,7 @@ async def async_setup(hass: HomeAssistantType, config: ConfigType) -> bool:
     websocket_api.async_register_command(hass, websocket_subscribe)
     websocket_api.async_register_command(hass, websocket_remove_device)
     websocket_api.async_register_command(hass, websocket_mqtt_info)
+    websocket_api.async_register_command(hass, websocket_message_queue_stats)
 
     if conf is None:
         # If we have a config entry, setup is done by that config entry.
@@ -632,12 +634,25 @@ class Subscription:
     """Class to hold data about an active subscription."""
 
     topic: str = attr.ib()
-    matcher: Any = attr.ib()
     job: HassJob = attr.ib()
     qos: int = attr.ib(default=0)
     encoding: str = attr.ib(default="utf-8")
 
 
+@attr.s(slots=True)
+class MessageQueueStats:
+    """Statistics of handing received messages to the event loop."""
+
+    messages: int = attr.ib(default=0)
+    batches: int = attr.ib(default=0)
+    # Messages waiting when the last batch was drained
+    queue_depth: int = attr.ib(default=0)
+    max_queue_depth: int = attr.ib(default=0)
+    # Seconds the oldest message of the last batch waited for the event loop
+    latency: float = attr.ib(default=0.0)
+    max_latency: float = attr.ib(default=0.0)
+
+
 class MQTT:
     """Home Assistant MQTT client."""
 
@@ -655,7 +670,7 @@ class MQTT:
         self.hass = hass
         self.config_entry = config_entry
         self.conf = conf
-        self.subscriptions: List[Subscription] = []
+        self.subscriptions = TopicTrie()
         self.connected = False
         self._ha_started = asyncio.Event()
         self._last_subscribe = time.time()
@@ -664,6 +679,11 @@ class MQTT:
 
         self._pending_operations = {}
 
+        # Messages received by the paho thread waiting for the event loop
+        self._message_queue: deque = deque()
+        self._message_drain_scheduled = False
+        self.message_queue_stats = MessageQueueStats()
+
         if self.hass.state == CoreState.running:
             self._ha_started.set()
         else:
@@ -842,11 +862,8 @@ class MQTT:
         if not isinstance(topic, str):
             raise HomeAssistantError("Topic needs to be a string!")
 
-        subscription = Subscription(
-            topic, _matcher_for_topic(topic), HassJob(msg_callback), qos, encoding
-        )
-        self.subscriptions.append(subscription)
-        self._matching_subscriptions.cache_clear()
+        subscription = Subscription(topic, HassJob(msg_callback), qos, encoding)
+        self.subscriptions.add(topic, subscription)
 
         # Only subscribe if currently connected.
         if self.connected:
@@ -856,12 +873,10 @@ class MQTT:
         @callback
         def async_remove() -> None:
             """Remove subscription."""
-            if subscription not in self.subscriptions:
+            if not self.subscriptions.remove(topic, subscription):
                 raise HomeAssistantError("Can't remove subscription twice")
-            self.subscriptions.remove(subscription)
-            self._matching_subscriptions.cache_clear()
 
-            if any(other.topic == topic for other in self.subscriptions):
+            if self.subscriptions.has_topic(topic):
                 # Other subscriptions on topic remaining - don't unsubscribe.
                 return
 
@@ -947,16 +962,41 @@ class MQTT:
             self.hass.loop.create_task(publish_birth_message(birth_message))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Runs in the paho thread. Messages are queued and the event loop is
+        only woken up when no drain of the queue is pending yet.
+        """
+        self._message_queue.append((msg, time.monotonic()))
+        if not self._message_drain_scheduled:
+            self._message_drain_scheduled = True
+            self.hass.loop.call_soon_threadsafe(self._async_drain_message_queue)
+
+    @callback
+    def _async_drain_message_queue(self) -> None:
+        """Handle the messages queued by the paho thread."""
+        # Clear the flag before draining, messages queued from now on
+        # schedule another drain.
+        self._message_drain_scheduled = False
+        queue = self._message_queue
+        depth = len(queue)
+        if not depth:
+            return
+
+        stats = self.message_queue_stats
+        stats.batches += 1
+        stats.messages += depth
+        stats.queue_depth = depth
+        stats.max_queue_depth = max(stats.max_queue_depth, depth)
+        stats.latency = time.monotonic() - queue[0][1]
+        stats.max_latency = max(stats.max_latency, stats.latency)
 
-    @lru_cache(2048)
-    def _matching_subscriptions(self, topic):
-        subscriptions = []
-        for subscription in self.subscriptions:
-            if subscription.matcher(topic):
-                subscriptions.append(subscription)
-        return subscriptions
+        for _ in range(depth):
+            msg, _received = queue.popleft()
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
@@ -967,8 +1007,10 @@ class MQTT:
             msg.payload,
         )
         timestamp = dt_util.utcnow()
+        # Subscribers of the message share the payloads they parse as JSON
+        json_cache: Dict[Any, Any] = {}
 
-        subscriptions = self._matching_subscriptions(msg.topic)
+        subscriptions = self.subscriptions.match(msg.topic)
 
         for subscription in subscriptions:
 
@@ -995,6 +1037,7 @@ class MQTT:
                     msg.retain,
                     subscription.topic,
                     timestamp,
+                    json_cache,
                 ),
             )
 
@@ -1066,16 +1109,6 @@ def _raise_on_error(result_code: int) -> None:
         )
 
 
-def _matcher_for_topic(subscription: str) -> Any:
-    # pylint: disable=import-outside-toplevel
-    from paho.mqtt.matcher import MQTTMatcher
-
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-
-    return lambda topic: next(matcher.iter_match(topic), False)
-
-
 class MqttAttributes(Entity):
     """Mixin used for platforms that support JSON attributes."""
 
@@ -1107,8 +1140,10 @@ class MqttAttributes(Entity):
             try:
                 payload = msg.payload
                 if attr_tpl is not None:
-                    payload = attr_tpl.async_render_with_possible_json_value(payload)
-                json_dict = json.loads(payload)
+                    payload = attr_tpl.async_render_with_possible_json_value(
+                        payload, parse_json=msg.parse_json
+                    )
+                json_dict = msg.parse_json(payload)
                 if isinstance(json_dict, dict):
                     self._attributes = json_dict
                     self.async_write_ha_state()
@@ -1417,6 +1452,15 @@ async def websocket_mqtt_info(hass, connection, msg):
     connection.send_result(msg["id"], mqtt_info)
 
 
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "mqtt/message_queue/stats"})
+def websocket_message_queue_stats(hass, connection, msg):
+    """Get statistics of the queue of received messages."""
+    connection.send_result(
+        msg["id"], attr.asdict(hass.data[DATA_MQTT].message_queue_stats)
+    )
+
+
 @websocket_api.websocket_command(
     {vol.Required("type"): "mqtt/device/remove", vol.Required("device_id"): str}
 )
@@ -1,11 +1,14 @@
 """Modesl used by multiple MQTT modules."""
 import datetime as dt
-from typing import Callable, Optional, Union
+import json
+from typing import Any, Callable, Dict, Optional, Union
 
 import attr
 
 PublishPayloadType = Union[str, bytes, int, float, None]
 
+_INVALID_JSON = object()
+
 
 @attr.s(slots=True, frozen=True)
 class Message:
@@ -17,6 +20,27 @@ class Message:
     retain: bool = attr.ib()
     subscribed_topic: Optional[str] = attr.ib(default=None)
     timestamp: Optional[dt.datetime] = attr.ib(default=None)
+    # Parsed JSON payloads shared by all subscribers of a received message
+    _json_cache: Dict[Any, Any] = attr.ib(factory=dict, eq=False, repr=False)
+
+    def parse_json(self, value: Any) -> Any:
+        """Parse a payload of the message as JSON.
+
+        The result is shared with the other subscribers of the message, so a
+        payload feeding several entities is only decoded once. It must not
+        be modified.
+        """
+        try:
+            result = self._json_cache[value]
+        except KeyError:
+            try:
+                result = json.loads(value)
+            except (ValueError, TypeError):
+                result = _INVALID_JSON
+            self._json_cache[value] = result
+        if result is _INVALID_JSON:
+            raise ValueError(f"Payload is not valid JSON: {value!r}")
+        return result
 
 
 MessageCallbackType = Callable[[Message], None]
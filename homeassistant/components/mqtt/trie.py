@@ -0,0 +1,122 @@
+"""Prefix tree of MQTT subscriptions by topic filter."""
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class _Node:
+    """A topic level of the prefix tree."""
+
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: Dict[str, "_Node"] = {}
+        # Subscriptions on the filter ending at this node and their sequence
+        self.subscriptions: Dict[Any, int] = {}
+
+
+class TopicTrie:
+    """Subscriptions stored in a prefix tree of topic filter levels.
+
+    Matching a topic walks the levels of the topic, following the ``+``
+    and ``#`` wildcards, so its cost depends on the depth of the topic
+    instead of the number of subscriptions. Matches are returned in the
+    order the subscriptions were added.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the prefix tree."""
+        self._root = _Node()
+        self._sequence = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of subscriptions."""
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over all subscriptions in the order they were added."""
+        subscriptions: List[Tuple[Any, int]] = []
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            subscriptions.extend(node.subscriptions.items())
+            nodes.extend(node.children.values())
+        subscriptions.sort(key=itemgetter(1))
+        return (subscription for subscription, _ in subscriptions)
+
+    def add(self, topic: str, subscription: Any) -> None:
+        """Add a subscription on a topic filter."""
+        node = self._root
+        for level in topic.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+        self._sequence += 1
+        node.subscriptions[subscription] = self._sequence
+        self._count += 1
+
+    def remove(self, topic: str, subscription: Any) -> bool:
+        """Remove a subscription, return if it was present."""
+        path = []
+        node = self._root
+        for level in topic.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            path.append((node, level))
+            node = child
+
+        if node.subscriptions.pop(subscription, None) is None:
+            return False
+        self._count -= 1
+
+        # Prune the levels no other filter uses
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.children or child.subscriptions:
+                break
+            del parent.children[level]
+        return True
+
+    def has_topic(self, topic: str) -> bool:
+        """Return if there are subscriptions on a topic filter."""
+        node = self._root
+        for level in topic.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            node = child
+        return bool(node.subscriptions)
+
+    def match(self, topic: str) -> List[Any]:
+        """Return the subscriptions with a filter matching a topic."""
+        levels = topic.split("/")
+        depth = len(levels)
+        # Wildcards on the first level do not match topics starting with $
+        wildcard_root = not topic.startswith("$")
+        matches: List[Tuple[Any, int]] = []
+        nodes = [(self._root, 0)]
+
+        while nodes:
+            node, index = nodes.pop()
+            wildcards = wildcard_root or index > 0
+            if wildcards:
+                multi_level = node.children.get("#")
+                if multi_level is not None:
+                    matches.extend(multi_level.subscriptions.items())
+            if index == depth:
+                matches.extend(node.subscriptions.items())
+                continue
+            child = node.children.get(levels[index])
+            if child is not None:
+                nodes.append((child, index + 1))
+            if wildcards:
+                child = node.children.get("+")
+                if child is not None:
+                    nodes.append((child, index + 1))
+
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(1))
+        return [subscription for subscription, _ in matches]
@@ -1,5 +1,4 @@
 """Offer MQTT listening automation rules."""
-import json
 
 import voluptuous as vol
 
@@ -50,7 +49,7 @@ async def async_attach_trigger(hass, config, action, automation_info):
             }
 
             try:
-                data["payload_json"] = json.loads(mqttmsg.payload)
+                data["payload_json"] = mqttmsg.parse_json(mqttmsg.payload)
             except ValueError:
                 pass
 
@@ -1,6 +1,6 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime
 import logging
@@ -9,12 +9,19 @@ import threading
 import time
 from typing import Any, Callable, List, Optional
 
-from sqlalchemy import create_engine, event as sqlalchemy_event, exc, select
+from sqlalchemy import (
+    create_engine,
+    event as sqlalchemy_event,
+    exc,
+    func,
+    select,
+    text,
+)
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import voluptuous as vol
 
-from homeassistant.components import persistent_notification
+from homeassistant.components import persistent_notification, websocket_api
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     CONF_EXCLUDE,
@@ -34,9 +41,20 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
-from . import migration, purge
+from . import migration, purge, statistics
 from .const import CONF_DB_INTEGRITY_CHECK, DATA_INSTANCE, DOMAIN, SQLITE_URL_PREFIX
-from .models import Base, Events, RecorderRuns, States
+from .models import (
+    EVENT_ROW_COLUMNS,
+    STATE_ROW_COLUMNS,
+    Base,
+    Events,
+    EventTypes,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+    StatisticsShortTerm,
+)
 from .util import session_scope, validate_or_move_away_sqlite_database
 
 _LOGGER = logging.getLogger(__name__)
@@ -61,9 +79,11 @@ DEFAULT_DB_RETRY_WAIT = 3
 DEFAULT_COMMIT_INTERVAL = 1
 KEEPALIVE_TIME = 30
 
-# Controls how often we clean up
-# States and Events objects
-EXPIRE_AFTER_COMMITS = 120
+# Number of distinct attribute sets the recorder
+# remembers the state_attributes id of
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+# Hashes looked up per query, below the SQLite bound parameter limit
+STATE_ATTRIBUTES_HASHES_PER_QUERY = 500
 
 CONF_AUTO_PURGE = "auto_purge"
 CONF_DB_URL = "db_url"
@@ -192,11 +212,20 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.services.async_register(
         DOMAIN, SERVICE_PURGE, async_handle_purge_service, schema=SERVICE_PURGE_SCHEMA
     )
+    hass.components.websocket_api.async_register_command(websocket_purge_progress)
 
     return await instance.async_db_ready
 
 
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "recorder/purge_progress"})
+def websocket_purge_progress(hass, connection, msg):
+    """Return the progress of the running or last completed purge."""
+    connection.send_result(msg["id"], hass.data[DATA_INSTANCE].purge_progress.as_dict())
+
+
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
+StatisticsTask = namedtuple("StatisticsTask", ["start"])
 
 
 class WaitTask:
@@ -241,10 +270,18 @@ class Recorder(threading.Thread):
         self.exclude_t = exclude_t
 
         self._timechanges_seen = 0
-        self._commits_without_expire = 0
         self._keepalive_count = 0
+        # entity_id -> state_id of the last state written for the entity
         self._old_states = {}
-        self._pending_expunge = []
+        # event_type -> event_type_id and entity_id -> metadata_id
+        self._event_type_ids = {}
+        self._metadata_ids = {}
+        # json encoded attributes -> attributes_id of recently written sets
+        self._state_attributes_ids = OrderedDict()
+        # Rows waiting for the next commit, see _write_pending_rows
+        self._pending_events = []
+        self._pending_states = []
+        self.purge_progress = purge.PurgeProgress()
         self.event_session = None
         self.get_session = None
         self._completed_database_setup = False
@@ -252,7 +289,7 @@ class Recorder(threading.Thread):
     @callback
     def async_initialize(self):
         """Initialize the recorder."""
-        self.hass.bus.async_listen(MATCH_ALL, self.event_listener)
+        self.hass.bus.async_listen_batch(MATCH_ALL, self.event_listener)
 
     def do_adhoc_purge(self, **kwargs):
         """Trigger an adhoc purge retaining keep_days worth of data."""
@@ -348,11 +385,26 @@ class Recorder(threading.Thread):
                 async_purge, hour=4, minute=12, second=0
             )
 
+        @callback
+        def async_compile_statistics(now):
+            """Queue the compilation of the last completed 5 minute period."""
+            start = statistics.period_start(
+                dt_util.as_utc(now), StatisticsShortTerm.period
+            )
+            self.queue.put(StatisticsTask(start))
+
+        # Compile short term statistics every 5 minutes
+        self.hass.helpers.event.track_time_change(
+            async_compile_statistics, minute="/5", second=10
+        )
+
         self.event_session = self.get_session()
         self.event_session.expire_on_commit = False
         # Use a session for the event read loop
         # with a commit every time the event time
         # has changed. This reduces the disk io.
+        # Events and states are queued as plain tuples
+        # and written in bulk on every commit.
         while True:
             event = self.queue.get()
             if event is None:
@@ -364,72 +416,76 @@ class Recorder(threading.Thread):
                 if not purge.purge_old_data(self, event.keep_days, event.repack):
                     self.queue.put(PurgeTask(event.keep_days, event.repack))
                 continue
+            if isinstance(event, StatisticsTask):
+                statistics.compile_statistics(self, event.start)
+                continue
             if isinstance(event, WaitTask):
                 self._queue_watch.set()
                 continue
-            if event.event_type == EVENT_TIME_CHANGED:
-                self._keepalive_count += 1
-                if self._keepalive_count >= KEEPALIVE_TIME:
-                    self._keepalive_count = 0
-                    self._send_keep_alive()
-                if self.commit_interval:
-                    self._timechanges_seen += 1
-                    if self._timechanges_seen >= self.commit_interval:
-                        self._timechanges_seen = 0
-                        self._commit_event_session_or_retry()
-                continue
-            if event.event_type in self.exclude_t:
-                continue
+            recorded = False
+            # Events fired together are queued and committed together
+            for batch_event in event if isinstance(event, list) else (event,):
+                recorded |= self._record_event(batch_event)
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
-                    continue
+            # If they do not have a commit interval
+            # than we commit right away
+            if recorded and not self.commit_interval:
+                self._commit_event_session_or_retry()
+
+    def _record_event(self, event) -> bool:
+        """Add the rows of an event to the pending rows.
+
+        Returns if the event is recorded.
+        """
+        if event.event_type == EVENT_TIME_CHANGED:
+            self._keepalive_count += 1
+            if self._keepalive_count >= KEEPALIVE_TIME:
+                self._keepalive_count = 0
+                self._send_keep_alive()
+            if self.commit_interval:
+                self._timechanges_seen += 1
+                if self._timechanges_seen >= self.commit_interval:
+                    self._timechanges_seen = 0
+                    self._commit_event_session_or_retry()
+            return False
+        if event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        if entity_id is not None:
+            if not self.entity_filter(entity_id):
+                return False
 
+        try:
+            if event.event_type == EVENT_STATE_CHANGED:
+                event_row = Events.row_from_event(event, event_data="{}")
+            else:
+                event_row = Events.row_from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Event is not JSON serializable: %s", event)
+            return False
+        except Exception as err:  # pylint: disable=broad-except
+            # Must catch the exception to prevent the loop from collapsing
+            _LOGGER.exception("Error adding event: %s", err)
+            return False
+
+        self._pending_events.append(event_row)
+
+        if event.event_type == EVENT_STATE_CHANGED:
             try:
-                if event.event_type == EVENT_STATE_CHANGED:
-                    dbevent = Events.from_event(event, event_data="{}")
-                else:
-                    dbevent = Events.from_event(event)
-                dbevent.created = event.time_fired
-                self.event_session.add(dbevent)
+                self._pending_states.append(
+                    (len(self._pending_events) - 1, States.row_from_event(event))
+                )
             except (TypeError, ValueError):
-                _LOGGER.warning("Event is not JSON serializable: %s", event)
+                _LOGGER.warning(
+                    "State is not JSON serializable: %s",
+                    event.data.get("new_state"),
+                )
             except Exception as err:  # pylint: disable=broad-except
                 # Must catch the exception to prevent the loop from collapsing
-                _LOGGER.exception("Error adding event: %s", err)
-
-            if dbevent and event.event_type == EVENT_STATE_CHANGED:
-                try:
-                    dbstate = States.from_event(event)
-                    has_new_state = event.data.get("new_state")
-                    if dbstate.entity_id in self._old_states:
-                        old_state = self._old_states.pop(dbstate.entity_id)
-                        if old_state.state_id:
-                            dbstate.old_state_id = old_state.state_id
-                        else:
-                            dbstate.old_state = old_state
-                    if not has_new_state:
-                        dbstate.state = None
-                    dbstate.event = dbevent
-                    dbstate.created = event.time_fired
-                    self.event_session.add(dbstate)
-                    if has_new_state:
-                        self._old_states[dbstate.entity_id] = dbstate
-                        self._pending_expunge.append(dbstate)
-                except (TypeError, ValueError):
-                    _LOGGER.warning(
-                        "State is not JSON serializable: %s",
-                        event.data.get("new_state"),
-                    )
-                except Exception as err:  # pylint: disable=broad-except
-                    # Must catch the exception to prevent the loop from collapsing
-                    _LOGGER.exception("Error adding state change: %s", err)
+                _LOGGER.exception("Error adding state change: %s", err)
 
-            # If they do not have a commit interval
-            # than we commit right away
-            if not self.commit_interval:
-                self._commit_event_session_or_retry()
+        return True
 
     def _send_keep_alive(self):
         try:
@@ -482,6 +538,9 @@ class Recorder(threading.Thread):
         self._reopen_event_session()
 
     def _reopen_event_session(self):
+        self._pending_events = []
+        self._pending_states = []
+
         try:
             self.event_session.rollback()
         except Exception as err:  # pylint: disable=broad-except
@@ -502,34 +561,204 @@ class Recorder(threading.Thread):
             _LOGGER.exception("Error while creating new event session: %s", err)
 
     def _commit_event_session(self):
-        self._commits_without_expire += 1
-
         try:
-            if self._pending_expunge:
-                self.event_session.flush()
-                for dbstate in self._pending_expunge:
-                    # Expunge the state so its not expired
-                    # until we use it later for dbstate.old_state
-                    if dbstate in self.event_session:
-                        self.event_session.expunge(dbstate)
-                self._pending_expunge = []
+            old_states, new_ids = self._write_pending_rows()
             self.event_session.commit()
         except Exception as err:
             _LOGGER.error("Error executing query: %s", err)
             self.event_session.rollback()
             raise
 
-        # Expire is an expensive operation (frequently more expensive
-        # than the flush and commit itself) so we only
-        # do it after EXPIRE_AFTER_COMMITS commits
-        if self._commits_without_expire == EXPIRE_AFTER_COMMITS:
-            self._commits_without_expire = 0
-            self.event_session.expire_all()
+        self._pending_events = []
+        self._pending_states = []
+        for entity_id, state_id in old_states.items():
+            if state_id is None:
+                self._old_states.pop(entity_id, None)
+            else:
+                self._old_states[entity_id] = state_id
+        self._event_type_ids.update(new_ids[EventTypes])
+        self._metadata_ids.update(new_ids[StatesMeta])
+        for shared_attrs, attributes_id in new_ids[StateAttributes].items():
+            self._cache_attributes_id(shared_attrs, attributes_id)
+
+    def _cache_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of an attributes set, evicting the oldest one."""
+        self._state_attributes_ids[shared_attrs] = attributes_id
+        self._state_attributes_ids.move_to_end(shared_attrs)
+        if len(self._state_attributes_ids) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            self._state_attributes_ids.popitem(last=False)
+
+    def clear_state_attributes_cache(self):
+        """Forget the cached attributes ids, after they were purged for example."""
+        self._state_attributes_ids.clear()
+
+    def _find_attributes_ids(self, shared_attrs_set):
+        """Return the ids of attributes sets already in the database.
+
+        Sets which are not cached are looked up by hash with one query
+        per STATE_ATTRIBUTES_HASHES_PER_QUERY sets.
+        """
+        found = {}
+        by_hash = {}
+        for shared_attrs in shared_attrs_set:
+            cached = self._state_attributes_ids.get(shared_attrs)
+            if cached is not None:
+                self._state_attributes_ids.move_to_end(shared_attrs)
+                found[shared_attrs] = cached
+            else:
+                by_hash.setdefault(
+                    StateAttributes.hash_shared_attrs(shared_attrs), set()
+                ).add(shared_attrs)
+
+        hashes = list(by_hash)
+        for start in range(0, len(hashes), STATE_ATTRIBUTES_HASHES_PER_QUERY):
+            for attributes_id, attrs_hash, stored_attrs in self.event_session.query(
+                StateAttributes.attributes_id,
+                StateAttributes.hash,
+                StateAttributes.shared_attrs,
+            ).filter(
+                StateAttributes.hash.in_(
+                    hashes[start : start + STATE_ATTRIBUTES_HASHES_PER_QUERY]
+                )
+            ):
+                # The hash is not unique, make sure the content matches
+                if stored_attrs in by_hash.get(attrs_hash, ()):
+                    found.setdefault(stored_attrs, attributes_id)
+
+        return found
+
+    def _write_pending_rows(self):
+        """Insert the rows queued since the last commit with executemany.
+
+        Primary keys are assigned here instead of by the database so
+        states can reference their event and the previous state of
+        the entity without a round trip per row.
+
+        Event types, entity ids and attribute sets are stored once
+        in their own tables and referenced by id.
+
+        Returns the old state linkage and the new lookup table ids
+        to apply once the commit succeeded.
+        """
+        old_states = {}
+        new_ids = {EventTypes: {}, StatesMeta: {}, StateAttributes: {}}
+        if not self._pending_events:
+            return old_states, new_ids
+
+        session = self.event_session
+        next_ids = {}
+        new_rows = {EventTypes: [], StatesMeta: [], StateAttributes: []}
+
+        def _next_id(model):
+            """Return the next free primary key of a table."""
+            if model not in next_ids:
+                column = model.__table__.primary_key.columns.values()[0]
+                next_ids[model] = session.query(func.max(column)).scalar() or 0
+            next_ids[model] += 1
+            return next_ids[model]
+
+        def _lookup_id(model, cache, key, find, new_row):
+            """Return the id for key, adding a lookup table row if needed."""
+            if key in new_ids[model]:
+                return new_ids[model][key]
+            lookup_id = cache.get(key)
+            if lookup_id is None:
+                lookup_id = find(key)
+            if lookup_id is None:
+                lookup_id = _next_id(model)
+                new_rows[model].append(new_row(lookup_id))
+            new_ids[model][key] = lookup_id
+            return lookup_id
+
+        event_params = []
+        for row in self._pending_events:
+            params = dict(zip(EVENT_ROW_COLUMNS, row))
+            event_type = params.pop("event_type")
+            params["event_type_id"] = _lookup_id(
+                EventTypes,
+                self._event_type_ids,
+                event_type,
+                lambda key: session.query(EventTypes.event_type_id)
+                .filter(EventTypes.event_type == key)
+                .scalar(),
+                # pylint: disable=cell-var-from-loop
+                lambda new_id: {"event_type_id": new_id, "event_type": event_type},
+            )
+            params["event_id"] = _next_id(Events)
+            event_params.append(params)
+
+        attributes_ids = self._find_attributes_ids(
+            {
+                row[STATE_ROW_COLUMNS.index("attributes")]
+                for _, row in self._pending_states
+            }
+        )
+        state_params = []
+        for event_idx, row in self._pending_states:
+            params = dict(zip(STATE_ROW_COLUMNS, row))
+            entity_id = params.pop("entity_id")
+            domain = params.pop("domain")
+            shared_attrs = params.pop("attributes")
+            if entity_id in old_states:
+                params["old_state_id"] = old_states[entity_id]
+            else:
+                params["old_state_id"] = self._old_states.get(entity_id)
+            params["state_id"] = _next_id(States)
+            params["event_id"] = event_params[event_idx]["event_id"]
+            params["metadata_id"] = _lookup_id(
+                StatesMeta,
+                self._metadata_ids,
+                entity_id,
+                lambda key: session.query(StatesMeta.metadata_id)
+                .filter(StatesMeta.entity_id == key)
+                .scalar(),
+                # pylint: disable=cell-var-from-loop
+                lambda new_id: {
+                    "metadata_id": new_id,
+                    "entity_id": entity_id,
+                    "domain": domain,
+                },
+            )
+            params["attributes_id"] = _lookup_id(
+                StateAttributes,
+                {},
+                shared_attrs,
+                attributes_ids.get,
+                # pylint: disable=cell-var-from-loop
+                lambda new_id: {
+                    "attributes_id": new_id,
+                    "hash": StateAttributes.hash_shared_attrs(shared_attrs),
+                    "shared_attrs": shared_attrs,
+                },
+            )
+            state_params.append(params)
+            old_states[entity_id] = (
+                params["state_id"] if params["state"] is not None else None
+            )
+
+        for model, rows in new_rows.items():
+            if rows:
+                session.execute(model.__table__.insert(), rows)
+        session.execute(Events.__table__.insert(), event_params)
+        if state_params:
+            session.execute(States.__table__.insert(), state_params)
+
+        if self.engine.dialect.name == "postgresql":
+            # Keep the sequences in step with the ids assigned above
+            for model, last_id in next_ids.items():
+                table = model.__table__
+                column = table.primary_key.columns.values()[0]
+                session.execute(
+                    text("SELECT setval(pg_get_serial_sequence(:table, :column), :id)"),
+                    {"table": table.name, "column": column.name, "id": last_id},
+                )
+
+        return old_states, new_ids
 
     @callback
-    def event_listener(self, event):
+    def event_listener(self, events):
         """Listen for new events and put them in the process queue."""
-        self.queue.put(event)
+        self.queue.put(events[0] if len(events) == 1 else events)
 
     def block_till_done(self):
         """Block till all events processed.
@@ -563,6 +792,9 @@ class Recorder(threading.Thread):
                 old_isolation = dbapi_connection.isolation_level
                 dbapi_connection.isolation_level = None
                 cursor = dbapi_connection.cursor()
+                # Only takes effect for new databases, existing ones
+                # are switched by the next full VACUUM, see purge
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.close()
                 dbapi_connection.isolation_level = old_isolation
@@ -205,6 +205,48 @@ def _add_columns(engine, table_name, columns_def):
             )
 
 
+def _populate_lookup_ids(engine):
+    """Move event types and entity ids of existing rows to lookup tables."""
+    _LOGGER.warning(
+        "Moving event types and entity ids to lookup tables. Note: this can "
+        "take several minutes on large databases and slow computers. Please "
+        "be patient!"
+    )
+    engine.execute(
+        text(
+            "INSERT INTO event_types (event_type) "
+            "SELECT DISTINCT event_type FROM events "
+            "WHERE event_type IS NOT NULL AND event_type NOT IN "
+            "(SELECT event_type FROM event_types)"
+        )
+    )
+    engine.execute(
+        text(
+            "UPDATE events SET event_type_id = "
+            "(SELECT event_type_id FROM event_types "
+            "WHERE event_types.event_type = events.event_type) "
+            "WHERE event_type_id IS NULL"
+        )
+    )
+    engine.execute(
+        text(
+            "INSERT INTO states_meta (entity_id, domain) "
+            "SELECT entity_id, MAX(domain) FROM states "
+            "WHERE entity_id IS NOT NULL AND entity_id NOT IN "
+            "(SELECT entity_id FROM states_meta) "
+            "GROUP BY entity_id"
+        )
+    )
+    engine.execute(
+        text(
+            "UPDATE states SET metadata_id = "
+            "(SELECT metadata_id FROM states_meta "
+            "WHERE states_meta.entity_id = states.entity_id) "
+            "WHERE metadata_id IS NULL"
+        )
+    )
+
+
 def _apply_update(engine, new_version, old_version):
     """Perform operations to bring schema up to date."""
     if new_version == 1:
@@ -277,6 +319,24 @@ def _apply_update(engine, new_version, old_version):
         _drop_index(engine, "states", "ix_states_entity_id")
         _create_index(engine, "events", "ix_events_event_type_time_fired")
         _drop_index(engine, "events", "ix_events_event_type")
+    elif new_version == 10:
+        # The state_attributes table itself is created by create_all,
+        # existing states keep their inline attributes.
+        _add_columns(engine, "states", ["attributes_id INTEGER"])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 11:
+        # The event_types and states_meta tables are created by create_all,
+        # the string columns are kept for existing rows but no longer indexed
+        _add_columns(engine, "events", ["event_type_id INTEGER"])
+        _add_columns(engine, "states", ["metadata_id INTEGER"])
+        _populate_lookup_ids(engine)
+        _create_index(engine, "events", "ix_events_event_type_id_time_fired")
+        _create_index(engine, "states", "ix_states_metadata_id_last_updated")
+        _drop_index(engine, "events", "ix_events_event_type_time_fired")
+        _drop_index(engine, "states", "ix_states_entity_id_last_updated")
+    elif new_version == 12:
+        # The statistics tables are created by create_all
+        pass
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
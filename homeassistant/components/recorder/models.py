@@ -1,19 +1,24 @@
 """Models for SQLAlchemy."""
+from datetime import timedelta
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
     String,
     Text,
     distinct,
+    func,
 )
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.session import Session
 
@@ -25,18 +30,55 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 9
+SCHEMA_VERSION = 12
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
 TABLE_EVENTS = "events"
+TABLE_EVENT_TYPES = "event_types"
 TABLE_STATES = "states"
+TABLE_STATES_META = "states_meta"
+TABLE_STATE_ATTRIBUTES = "state_attributes"
+TABLE_STATISTICS = "statistics"
+TABLE_STATISTICS_SHORT_TERM = "statistics_short_term"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 
-ALL_TABLES = [TABLE_EVENTS, TABLE_STATES, TABLE_RECORDER_RUNS, TABLE_SCHEMA_CHANGES]
+ALL_TABLES = [
+    TABLE_EVENTS,
+    TABLE_EVENT_TYPES,
+    TABLE_STATES,
+    TABLE_STATES_META,
+    TABLE_STATE_ATTRIBUTES,
+    TABLE_STATISTICS,
+    TABLE_STATISTICS_SHORT_TERM,
+    TABLE_RECORDER_RUNS,
+    TABLE_SCHEMA_CHANGES,
+]
+
+# Column order of the plain tuples built by Events.row_from_event
+# and States.row_from_event for the recorder's executemany writes
+EVENT_ROW_COLUMNS = (
+    "event_type",
+    "event_data",
+    "origin",
+    "time_fired",
+    "created",
+    "context_id",
+    "context_user_id",
+    "context_parent_id",
+)
+STATE_ROW_COLUMNS = (
+    "entity_id",
+    "domain",
+    "state",
+    "attributes",
+    "last_changed",
+    "last_updated",
+    "created",
+)
 
 
 class Events(Base):  # type: ignore
@@ -52,11 +94,14 @@ class Events(Base):  # type: ignore
     context_id = Column(String(36), index=True)
     context_user_id = Column(String(36), index=True)
     context_parent_id = Column(String(36), index=True)
+    event_type_id = Column(Integer, ForeignKey("event_types.event_type_id"))
+    # Loaded with the event, to_native needs it for every row
+    event_type_entry = relationship("EventTypes", uselist=False, lazy="joined")
 
     __table_args__ = (
         # Used for fetching events at a specific time
         # see logbook
-        Index("ix_events_event_type_time_fired", "event_type", "time_fired"),
+        Index("ix_events_event_type_id_time_fired", "event_type_id", "time_fired"),
     )
 
     @staticmethod
@@ -72,6 +117,20 @@ class Events(Base):  # type: ignore
             context_parent_id=event.context.parent_id,
         )
 
+    @staticmethod
+    def row_from_event(event, event_data=None):
+        """Create a plain row tuple ordered as EVENT_ROW_COLUMNS."""
+        return (
+            event.event_type,
+            event_data or json.dumps(event.data, cls=JSONEncoder),
+            str(event.origin.value),
+            event.time_fired,
+            event.time_fired,
+            event.context.id,
+            event.context.user_id,
+            event.context.parent_id,
+        )
+
     def to_native(self, validate_entity_id=True):
         """Convert to a natve HA Event."""
         context = Context(
@@ -79,9 +138,12 @@ class Events(Base):  # type: ignore
             user_id=self.context_user_id,
             parent_id=self.context_parent_id,
         )
+        event_type = self.event_type
+        if event_type is None and self.event_type_entry:
+            event_type = self.event_type_entry.event_type
         try:
             return Event(
-                self.event_type,
+                event_type,
                 json.loads(self.event_data),
                 EventOrigin(self.origin),
                 process_timestamp(self.time_fired),
@@ -107,13 +169,20 @@ class States(Base):  # type: ignore
     last_updated = Column(DateTime(timezone=True), default=dt_util.utcnow, index=True)
     created = Column(DateTime(timezone=True), default=dt_util.utcnow)
     old_state_id = Column(Integer, ForeignKey("states.state_id"))
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
     event = relationship("Events", uselist=False)
     old_state = relationship("States", remote_side=[state_id])
+    metadata_id = Column(Integer, ForeignKey("states_meta.metadata_id"))
+    # Loaded with the state, to_native needs them for every row
+    state_attributes = relationship("StateAttributes", uselist=False, lazy="joined")
+    states_meta = relationship("StatesMeta", uselist=False, lazy="joined")
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
         # (get_states in history.py)
-        Index("ix_states_entity_id_last_updated", "entity_id", "last_updated"),
+        Index("ix_states_metadata_id_last_updated", "metadata_id", "last_updated"),
     )
 
     @staticmethod
@@ -140,13 +209,52 @@ class States(Base):  # type: ignore
 
         return dbstate
 
+    @staticmethod
+    def row_from_event(event):
+        """Create a plain row tuple ordered as STATE_ROW_COLUMNS.
+
+        The state is None when the entity was removed.
+        """
+        entity_id = event.data["entity_id"]
+        state = event.data.get("new_state")
+
+        # State got deleted
+        if state is None:
+            return (
+                entity_id,
+                split_entity_id(entity_id)[0],
+                None,
+                "{}",
+                event.time_fired,
+                event.time_fired,
+                event.time_fired,
+            )
+
+        return (
+            entity_id,
+            state.domain,
+            state.state,
+            json.dumps(dict(state.attributes), cls=JSONEncoder),
+            state.last_changed,
+            state.last_updated,
+            event.time_fired,
+        )
+
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
+        attributes = self.attributes
+        if attributes is None:
+            attributes = (
+                self.state_attributes.shared_attrs if self.state_attributes else "{}"
+            )
+        entity_id = self.entity_id
+        if entity_id is None and self.states_meta:
+            entity_id = self.states_meta.entity_id
         try:
             return State(
-                self.entity_id,
+                entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(attributes),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -160,6 +268,86 @@ class States(Base):  # type: ignore
             return None
 
 
+class EventTypes(Base):  # type: ignore
+    """Event types referenced by Events.event_type_id."""
+
+    __tablename__ = TABLE_EVENT_TYPES
+    event_type_id = Column(Integer, primary_key=True)
+    event_type = Column(String(64), unique=True)
+
+
+class StatesMeta(Base):  # type: ignore
+    """Entity ids referenced by States.metadata_id."""
+
+    __tablename__ = TABLE_STATES_META
+    metadata_id = Column(Integer, primary_key=True)
+    entity_id = Column(String(255), unique=True)
+    domain = Column(String(64))
+
+
+class StateAttributes(Base):  # type: ignore
+    """State attribute change history.
+
+    Identical attribute sets are stored once and shared
+    by every state row that references them.
+    """
+
+    __tablename__ = TABLE_STATE_ATTRIBUTES
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash used to look up a json encoded attributes set."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+
+# Rows written before the state_attributes table existed keep their
+# attributes inline, queries need to outer join StateAttributes on
+# States.attributes_id to use this column.
+STATE_ATTRIBUTES_COLUMN = func.coalesce(
+    States.attributes, StateAttributes.shared_attrs
+).label("attributes")
+
+
+class StatisticsBase:
+    """Aggregated numeric states of an entity over a period starting at start."""
+
+    id = Column(Integer, primary_key=True)
+    created = Column(DateTime(timezone=True), default=dt_util.utcnow)
+    start = Column(DateTime(timezone=True))
+    mean = Column(Float)
+    min = Column(Float)
+    max = Column(Float)
+
+    @declared_attr
+    def metadata_id(cls):  # pylint: disable=no-self-argument
+        """Entity the statistics were compiled for."""
+        return Column(Integer, ForeignKey("states_meta.metadata_id"))
+
+    @declared_attr
+    def __table_args__(cls):  # pylint: disable=no-self-argument
+        """Index used to fetch the statistics of entities over a period."""
+        return (
+            Index(f"ix_{cls.__tablename__}_metadata_id_start", "metadata_id", "start"),
+        )
+
+
+class Statistics(Base, StatisticsBase):  # type: ignore
+    """Hourly statistics, kept when old states are purged."""
+
+    __tablename__ = TABLE_STATISTICS
+    period = timedelta(hours=1)
+
+
+class StatisticsShortTerm(Base, StatisticsBase):  # type: ignore
+    """5 minute statistics, kept when old states are purged."""
+
+    __tablename__ = TABLE_STATISTICS_SHORT_TERM
+    period = timedelta(minutes=5)
+
+
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
 
@@ -182,8 +370,11 @@ class RecorderRuns(Base):  # type: ignore
 
         assert session is not None, "RecorderRuns need to be persisted"
 
-        query = session.query(distinct(States.entity_id)).filter(
-            States.last_updated >= self.start
+        query = (
+            session.query(distinct(StatesMeta.entity_id))
+            .select_from(States)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .filter(States.last_updated >= self.start)
         )
 
         if point_in_time is not None:
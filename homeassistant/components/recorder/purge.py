@@ -2,65 +2,144 @@
 from datetime import timedelta
 import logging
 import time
+from typing import Tuple
 
+from sqlalchemy import exists, func
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 import homeassistant.util.dt as dt_util
 
-from .models import Events, RecorderRuns, States
-from .util import execute, session_scope
+from .models import Events, RecorderRuns, StateAttributes, States, StatisticsShortTerm
+from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Number of states or events deleted per batch. The recorder processes
+# the pending events between two batches so a large purge does not
+# block recording.
+MAX_ROWS_TO_PURGE = 1000
+
+# Maximum number of bound parameters of a query on older SQLite versions
+SQLITE_MAX_BIND_VARS = 999
+
+# Number of free pages released per call on SQLite databases using
+# incremental auto vacuum
+SQLITE_INCREMENTAL_VACUUM_PAGES = 10000
+
+# Value of PRAGMA auto_vacuum for incremental auto vacuum
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+class PurgeProgress:
+    """Progress of the running or last completed purge."""
+
+    def __init__(self):
+        """Initialize the progress."""
+        self.running = False
+        self.purge_before = None
+        self.started = None
+        self.finished = None
+        self.states_to_purge = 0
+        self.events_to_purge = 0
+        self.states_purged = 0
+        self.events_purged = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+    def start(self, purge_before, states_to_purge, events_to_purge):
+        """Start tracking a new purge."""
+        self.running = True
+        self.purge_before = purge_before
+        self.started = dt_util.utcnow()
+        self.finished = None
+        self.states_to_purge = states_to_purge
+        self.events_to_purge = events_to_purge
+        self.states_purged = 0
+        self.events_purged = 0
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return the number of rows deleted per second of purging."""
+        if not self.elapsed:
+            return 0.0
+        return (self.states_purged + self.events_purged) / self.elapsed
+
+    def as_dict(self) -> dict:
+        """Return a dict representation of the progress."""
+        return {
+            "running": self.running,
+            "purge_before": self.purge_before,
+            "started": self.started,
+            "finished": self.finished,
+            "states_to_purge": self.states_to_purge,
+            "events_to_purge": self.events_to_purge,
+            "states_purged": self.states_purged,
+            "events_purged": self.events_purged,
+            "batches": self.batches,
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
 def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
-    """Purge events and states older than purge_days ago.
+    """Purge events, states and short term statistics older than purge_days ago.
 
-    Cleans up an timeframe of an hour, based on the oldest record.
+    Deletes at most MAX_ROWS_TO_PURGE states and events per call, based
+    on the lowest primary keys. Returns False while there is more to
+    purge so the recorder can process its queue before the next batch.
     """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
+    progress = instance.purge_progress
     _LOGGER.debug("Purging states and events before target %s", purge_before)
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            # Purge a max of 1 hour, based on the oldest states or events record
-            batch_purge_before = purge_before
-
-            query = session.query(States).order_by(States.last_updated.asc()).limit(1)
-            states = execute(query, to_native=True, validate_entity_ids=False)
-            if states:
-                batch_purge_before = min(
-                    batch_purge_before,
-                    states[0].last_updated + timedelta(hours=1),
-                )
-
-            query = session.query(Events).order_by(Events.time_fired.asc()).limit(1)
-            events = execute(query, to_native=True)
-            if events:
-                batch_purge_before = min(
-                    batch_purge_before,
-                    events[0].time_fired + timedelta(hours=1),
+            if not progress.running:
+                progress.start(
+                    purge_before,
+                    session.query(States.state_id)
+                    .filter(States.last_updated < purge_before)
+                    .count(),
+                    session.query(Events.event_id)
+                    .filter(Events.time_fired < purge_before)
+                    .count(),
                 )
 
-            _LOGGER.debug("Purging states and events before %s", batch_purge_before)
-
-            deleted_rows = (
-                session.query(States)
-                .filter(States.last_updated < batch_purge_before)
-                .delete(synchronize_session=False)
+            timer_start = time.perf_counter()
+            states_purged, attributes_purged = _purge_states_batch(
+                session, purge_before
             )
-            _LOGGER.debug("Deleted %s states", deleted_rows)
-
-            deleted_rows = (
-                session.query(Events)
-                .filter(Events.time_fired < batch_purge_before)
-                .delete(synchronize_session=False)
+            _LOGGER.debug(
+                "Deleted %s states and %s state attributes",
+                states_purged,
+                attributes_purged,
+            )
+            if attributes_purged:
+                # The recorder may have cached ids that no longer exist
+                instance.clear_state_attributes_cache()
+            events_purged = _purge_batch(
+                session, Events.event_id, Events.time_fired, purge_before
+            )
+            _LOGGER.debug("Deleted %s events", events_purged)
+            # Hourly statistics are kept, the 5 minute ones are purged
+            # together with the states they were compiled from
+            statistics_purged = _purge_batch(
+                session,
+                StatisticsShortTerm.id,
+                StatisticsShortTerm.start,
+                purge_before,
             )
-            _LOGGER.debug("Deleted %s events", deleted_rows)
+            _LOGGER.debug("Deleted %s short term statistics", statistics_purged)
 
-            # If states or events purging isn't processing the purge_before yet,
-            # return false, as we are not done yet.
-            if batch_purge_before != purge_before:
+            progress.states_purged += states_purged
+            progress.events_purged += events_purged
+            progress.batches += 1
+            progress.elapsed += time.perf_counter() - timer_start
+
+            # A full batch means there may be more rows to purge
+            if MAX_ROWS_TO_PURGE in (states_purged, events_purged, statistics_purged):
                 _LOGGER.debug("Purging hasn't fully completed yet")
                 return False
 
@@ -72,15 +151,30 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
             )
             _LOGGER.debug("Deleted %s recorder_runs", deleted_rows)
 
+        progress.running = False
+        progress.finished = dt_util.utcnow()
+        _LOGGER.debug(
+            "Purged %s states and %s events in %s batches (%.1f rows/s)",
+            progress.states_purged,
+            progress.events_purged,
+            progress.batches,
+            progress.rows_per_second,
+        )
+
         if repack:
-            # Execute sqlite or postgresql vacuum command to free up space on disk
-            if instance.engine.driver in ("pysqlite", "postgresql"):
+            if instance.engine.driver == "pysqlite":
+                _vacuum_sqlite(instance.engine)
+            # Execute postgresql vacuum command to free up space on disk
+            elif instance.engine.driver == "postgresql":
                 _LOGGER.debug("Vacuuming SQL DB to free space")
                 instance.engine.execute("VACUUM")
             # Optimize mysql / mariadb tables to free up space on disk
             elif instance.engine.driver in ("mysqldb", "pymysql"):
                 _LOGGER.debug("Optimizing SQL DB to free space")
-                instance.engine.execute("OPTIMIZE TABLE states, events, recorder_runs")
+                instance.engine.execute(
+                    "OPTIMIZE TABLE states, state_attributes, events, "
+                    "statistics_short_term, recorder_runs"
+                )
 
     except OperationalError as err:
         # Retry when one of the following MySQL errors occurred:
@@ -99,4 +193,103 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
         _LOGGER.warning("Error purging history: %s", err)
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s", err)
+    progress.running = False
     return True
+
+
+def _batch_filter(session, id_column, time_column, purge_before):
+    """Return the filter of the rows with the lowest ids older than purge_before.
+
+    The batch is selected by primary key range so the delete does not
+    have to scan the time index. Returns None when there is nothing
+    to purge.
+    """
+    batch = (
+        session.query(id_column)
+        .filter(time_column < purge_before)
+        .order_by(id_column)
+        .limit(MAX_ROWS_TO_PURGE)
+        .subquery()
+    )
+    max_id = session.query(func.max(batch.c[id_column.key])).scalar()
+    if max_id is None:
+        return None
+
+    return (id_column <= max_id) & (time_column < purge_before)
+
+
+def _purge_batch(session, id_column, time_column, purge_before) -> int:
+    """Delete the rows with the lowest ids older than purge_before."""
+    batch_filter = _batch_filter(session, id_column, time_column, purge_before)
+    if batch_filter is None:
+        return 0
+
+    return (
+        session.query(id_column.class_)
+        .filter(batch_filter)
+        .delete(synchronize_session=False)
+    )
+
+
+def _purge_states_batch(session, purge_before) -> Tuple[int, int]:
+    """Delete a batch of states and the attribute sets only they used.
+
+    Attribute sets are shared between states so only the sets of the
+    deleted states are candidates, and each is kept while any remaining
+    state references it.
+    """
+    batch_filter = _batch_filter(
+        session, States.state_id, States.last_updated, purge_before
+    )
+    if batch_filter is None:
+        return 0, 0
+
+    attributes_ids = [
+        attributes_id
+        for attributes_id, in session.query(States.attributes_id)
+        .filter(batch_filter & States.attributes_id.isnot(None))
+        .distinct()
+    ]
+    states_purged = (
+        session.query(States).filter(batch_filter).delete(synchronize_session=False)
+    )
+
+    attributes_purged = 0
+    for start in range(0, len(attributes_ids), SQLITE_MAX_BIND_VARS):
+        attributes_purged += (
+            session.query(StateAttributes)
+            .filter(
+                StateAttributes.attributes_id.in_(
+                    attributes_ids[start : start + SQLITE_MAX_BIND_VARS]
+                )
+                & ~exists().where(States.attributes_id == StateAttributes.attributes_id)
+            )
+            .delete(synchronize_session=False)
+        )
+
+    return states_purged, attributes_purged
+
+
+def _vacuum_sqlite(engine):
+    """Release the free pages of an SQLite database.
+
+    Databases created with incremental auto vacuum only release a bounded
+    number of free pages. Older databases get one full VACUUM, which also
+    switches them to incremental auto vacuum.
+    """
+    with engine.connect() as connection:
+        if (
+            connection.execute("PRAGMA auto_vacuum").scalar()
+            == SQLITE_AUTO_VACUUM_INCREMENTAL
+        ):
+            _LOGGER.debug("Incrementally vacuuming SQL DB to free space")
+            # The pragma releases a single page per step, executescript
+            # runs it to completion
+            connection.connection.executescript(
+                f"PRAGMA incremental_vacuum({SQLITE_INCREMENTAL_VACUUM_PAGES})"
+            )
+            return
+
+        _LOGGER.debug("Vacuuming SQL DB to free space")
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("VACUUM")
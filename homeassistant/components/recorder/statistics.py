@@ -0,0 +1,202 @@
+"""Compile statistics of numeric sensors."""
+from collections import defaultdict
+from datetime import timedelta
+import logging
+import math
+
+from sqlalchemy import and_, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from .models import (
+    States,
+    StatesMeta,
+    Statistics,
+    StatisticsShortTerm,
+    process_timestamp,
+)
+from .util import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTICS_DOMAINS = ("sensor",)
+
+
+def compile_statistics(instance, start) -> bool:
+    """Compile the statistics of the 5 minute period starting at start.
+
+    Periods missed since the last compiled one, for example while Home
+    Assistant was stopped, are compiled first as long as their states were
+    not purged yet. The hourly statistics are compiled when a period
+    completes an hour.
+    """
+    period = StatisticsShortTerm.period
+
+    try:
+        with session_scope(session=instance.get_session()) as session:
+            last_start = session.query(func.max(StatisticsShortTerm.start)).scalar()
+        if last_start is None:
+            period_start_ = start
+        else:
+            period_start_ = min(
+                max(
+                    process_timestamp(last_start) + period,
+                    start - timedelta(days=instance.keep_days),
+                ),
+                start,
+            )
+
+        while period_start_ <= start:
+            end = period_start_ + period
+            with session_scope(session=instance.get_session()) as session:
+                _compile_short_term(session, period_start_)
+            if end.minute == 0:
+                with session_scope(session=instance.get_session()) as session:
+                    _compile_hourly(session, end - Statistics.period)
+            period_start_ = end
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error compiling statistics: %s", err)
+    return True
+
+
+def _numeric(state):
+    """Return a state as a finite float, None if it is not numeric."""
+    try:
+        value = float(state)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return value
+
+
+def _compile_short_term(session, start):
+    """Compile the time weighted mean, min and max of numeric states.
+
+    Every value is weighted by how long it was held during the period,
+    starting with the state the entity had when the period started, so
+    entities whose state did not change get a row as well.
+    """
+    table = StatisticsShortTerm
+    if session.query(table.id).filter(table.start == start).first():
+        _LOGGER.debug("Statistics already compiled for %s", start)
+        return
+
+    end = start + table.period
+    sensors = (
+        session.query(States.metadata_id, States.last_updated, States.state)
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .filter(StatesMeta.domain.in_(STATISTICS_DOMAINS))
+    )
+
+    most_recent_before_start = (
+        session.query(
+            States.metadata_id.label("max_metadata_id"),
+            func.max(States.last_updated).label("max_last_updated"),
+        )
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .filter(StatesMeta.domain.in_(STATISTICS_DOMAINS))
+        .filter(States.last_updated < start)
+        .group_by(States.metadata_id)
+        .subquery()
+    )
+    initial_states = sensors.join(
+        most_recent_before_start,
+        and_(
+            States.metadata_id == most_recent_before_start.c.max_metadata_id,
+            States.last_updated == most_recent_before_start.c.max_last_updated,
+        ),
+    )
+    period_states = sensors.filter(
+        (States.last_updated >= start) & (States.last_updated < end)
+    ).order_by(States.last_updated, States.state_id)
+
+    changes = defaultdict(list)
+    for metadata_id, _, state in initial_states:
+        changes[metadata_id] = [(start, _numeric(state))]
+    for metadata_id, last_updated, state in period_states:
+        changes[metadata_id].append(
+            (max(process_timestamp(last_updated), start), _numeric(state))
+        )
+
+    rows = []
+    for metadata_id, entity_changes in changes.items():
+        weighted = duration = 0.0
+        held = []
+        for index, (changed, value) in enumerate(entity_changes):
+            if value is None:
+                continue
+            until = (
+                entity_changes[index + 1][0] if index + 1 < len(entity_changes) else end
+            )
+            seconds = (until - changed).total_seconds()
+            if seconds <= 0:
+                continue
+            weighted += value * seconds
+            duration += seconds
+            held.append(value)
+
+        if held:
+            rows.append(
+                {
+                    "metadata_id": metadata_id,
+                    "start": start,
+                    "mean": weighted / duration,
+                    "min": min(held),
+                    "max": max(held),
+                }
+            )
+
+    if rows:
+        session.execute(table.__table__.insert(), rows)
+    _LOGGER.debug(
+        "Compiled %s statistics for %d entities starting %s",
+        table.__tablename__,
+        len(rows),
+        start,
+    )
+
+
+def _compile_hourly(session, start):
+    """Compile the hourly statistics from the 5 minute statistics of the hour."""
+    table = Statistics
+    if session.query(table.id).filter(table.start == start).first():
+        _LOGGER.debug("Statistics already compiled for %s", start)
+        return
+
+    short_term = StatisticsShortTerm
+    query = (
+        session.query(
+            short_term.metadata_id,
+            func.avg(short_term.mean),
+            func.min(short_term.min),
+            func.max(short_term.max),
+        )
+        .filter((short_term.start >= start) & (short_term.start < start + table.period))
+        .group_by(short_term.metadata_id)
+    )
+
+    rows = [
+        {
+            "metadata_id": metadata_id,
+            "start": start,
+            "mean": mean,
+            "min": min_,
+            "max": max_,
+        }
+        for metadata_id, mean, min_, max_ in query
+    ]
+    if rows:
+        session.execute(table.__table__.insert(), rows)
+    _LOGGER.debug(
+        "Compiled %s statistics for %d entities starting %s",
+        table.__tablename__,
+        len(rows),
+        start,
+    )
+
+
+def period_start(now, period: timedelta):
+    """Return the start of the last complete period before now."""
+    seconds = int(period.total_seconds())
+    start = now.replace(second=0, microsecond=0) - period
+    return start - timedelta(minutes=start.minute % (seconds // 60))
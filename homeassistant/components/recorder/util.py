@@ -10,7 +10,7 @@ from sqlalchemy.exc import OperationalError, SQLAlchemyError
 import homeassistant.util.dt as dt_util
 
 from .const import CONF_DB_INTEGRITY_CHECK, DATA_INSTANCE, SQLITE_URL_PREFIX
-from .models import ALL_TABLES, process_timestamp
+from .models import ALL_TABLES, StatesMeta, process_timestamp
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -110,6 +110,16 @@ def execute(qry, to_native=False, validate_entity_ids=True):
             time.sleep(QUERY_RETRY_WAIT)
 
 
+def entity_ids_to_metadata_ids(session, entity_ids):
+    """Return the states_meta ids of the entity ids that have been recorded."""
+    return [
+        row.metadata_id
+        for row in session.query(StatesMeta.metadata_id).filter(
+            StatesMeta.entity_id.in_(entity_ids)
+        )
+    ]
+
+
 def validate_or_move_away_sqlite_database(dburl: str, db_integrity_check: bool) -> bool:
     """Ensure that the database is valid or move it away."""
     dbpath = dburl[len(SQLITE_URL_PREFIX) :]
@@ -14,20 +14,47 @@ from homeassistant.loader import bind_hass
 
 from .const import (
     ATTR_ENDPOINTS,
+    ATTR_SEGMENT_POOL,
+    ATTR_SETTINGS,
     ATTR_STREAMS,
     CONF_DURATION,
+    CONF_LL_HLS,
     CONF_LOOKBACK,
+    CONF_PART_DURATION,
+    CONF_SEGMENT_MEMORY,
     CONF_STREAM_SOURCE,
+    DEFAULT_PART_DURATION,
+    DEFAULT_SEGMENT_MEMORY,
     DOMAIN,
     MAX_SEGMENTS,
+    MIN_PART_DURATION,
+    MIN_SEGMENT_DURATION,
     SERVICE_RECORD,
 )
-from .core import PROVIDERS
+from .core import PROVIDERS, SegmentPool, StreamSettings
 from .hls import async_setup_hls
 
 _LOGGER = logging.getLogger(__name__)
 
-CONFIG_SCHEMA = vol.Schema({DOMAIN: vol.Schema({})}, extra=vol.ALLOW_EXTRA)
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(CONF_LL_HLS, default=False): cv.boolean,
+                vol.Optional(
+                    CONF_PART_DURATION, default=DEFAULT_PART_DURATION
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=MIN_PART_DURATION, max=MIN_SEGMENT_DURATION),
+                ),
+                vol.Optional(
+                    CONF_SEGMENT_MEMORY, default=DEFAULT_SEGMENT_MEMORY
+                ): cv.positive_int,
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
 STREAM_SERVICE_SCHEMA = vol.Schema({vol.Required(CONF_STREAM_SOURCE): cv.string})
 
@@ -41,8 +68,14 @@ SERVICE_RECORD_SCHEMA = STREAM_SERVICE_SCHEMA.extend(
 
 
 @bind_hass
-def request_stream(hass, stream_source, *, fmt="hls", keepalive=False, options=None):
-    """Set up stream with token."""
+def request_stream(
+    hass, stream_source, *, fmt="hls", keepalive=False, options=None, lookback=0
+):
+    """Set up stream with token.
+
+    With a lookback, the last lookback seconds of the stream are kept so
+    recordings can start with what preceded them.
+    """
     if DOMAIN not in hass.config.components:
         raise HomeAssistantError("Stream integration is not set up.")
 
@@ -69,6 +102,8 @@ def request_stream(hass, stream_source, *, fmt="hls", keepalive=False, options=N
 
         # Add provider
         stream.add_provider(fmt)
+        if lookback > 0:
+            stream.add_provider("lookback").duration = lookback
 
         if not stream.access_token:
             stream.access_token = secrets.token_hex()
@@ -88,9 +123,18 @@ async def async_setup(hass, config):
     # pylint: disable=import-outside-toplevel
     from .recorder import async_setup_recorder
 
+    conf = config.get(DOMAIN) or {}
+
     hass.data[DOMAIN] = {}
     hass.data[DOMAIN][ATTR_ENDPOINTS] = {}
     hass.data[DOMAIN][ATTR_STREAMS] = {}
+    hass.data[DOMAIN][ATTR_SETTINGS] = StreamSettings(
+        ll_hls=conf.get(CONF_LL_HLS, False),
+        part_target_duration=conf.get(CONF_PART_DURATION, DEFAULT_PART_DURATION),
+    )
+    hass.data[DOMAIN][ATTR_SEGMENT_POOL] = SegmentPool(
+        conf.get(CONF_SEGMENT_MEMORY, DEFAULT_SEGMENT_MEMORY) * 1024 * 1024
+    )
 
     # Setup HLS
     hls_endpoint = async_setup_hls(hass)
@@ -232,8 +276,13 @@ async def async_handle_record_service(hass, call):
     stream.start()
 
     # Take advantage of lookback
+    buffer = stream.outputs.get("lookback")
     hls = stream.outputs.get("hls")
-    if lookback > 0 and hls:
+    if lookback > 0 and buffer:
+        # Wait for latest segment, the recording starts with the next one
+        await buffer.recv()
+        recorder.prepend(buffer.get_lookback(lookback))
+    elif lookback > 0 and hls:
         num_segments = min(int(lookback // hls.target_duration), MAX_SEGMENTS)
         # Wait for latest segment, then add the lookback
         await hls.recv()
@@ -4,10 +4,15 @@ DOMAIN = "stream"
 CONF_STREAM_SOURCE = "stream_source"
 CONF_LOOKBACK = "lookback"
 CONF_DURATION = "duration"
+CONF_LL_HLS = "ll_hls"
+CONF_PART_DURATION = "part_duration"
+CONF_SEGMENT_MEMORY = "segment_memory"
 
 ATTR_ENDPOINTS = "endpoints"
 ATTR_STREAMS = "streams"
 ATTR_KEEPALIVE = "keepalive"
+ATTR_SETTINGS = "settings"
+ATTR_SEGMENT_POOL = "segment_pool"
 
 SERVICE_RECORD = "record"
 
@@ -17,6 +22,9 @@ FORMAT_CONTENT_TYPE = {"hls": "application/vnd.apple.mpegurl"}
 
 MAX_SEGMENTS = 3  # Max number of segments to keep around
 MIN_SEGMENT_DURATION = 1.5  # Each segment is at least this many seconds
+DEFAULT_PART_DURATION = 0.5  # Target duration of low latency HLS parts
+MIN_PART_DURATION = 0.2
+DEFAULT_SEGMENT_MEMORY = 256  # MiB of segments kept in memory by all streams
 
 PACKETS_TO_WAIT_FOR_AUDIO = 20  # Some streams have an audio stream with no audio
 MAX_TIMESTAMP_GAP = 10000  # seconds - anything from 10 to 50000 is probably reasonable
@@ -1,8 +1,8 @@
 """Provides core stream functionality."""
 import asyncio
-from collections import deque
+from collections import OrderedDict, deque
 import io
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from aiohttp import web
 import attr
@@ -12,11 +12,19 @@ from homeassistant.core import callback
 from homeassistant.helpers.event import async_call_later
 from homeassistant.util.decorator import Registry
 
-from .const import ATTR_STREAMS, DOMAIN, MAX_SEGMENTS
+from .const import ATTR_SEGMENT_POOL, ATTR_STREAMS, DOMAIN, MAX_SEGMENTS
 
 PROVIDERS = Registry()
 
 
+@attr.s(slots=True, frozen=True)
+class StreamSettings:
+    """Represent the settings of the stream integration."""
+
+    ll_hls: bool = attr.ib()
+    part_target_duration: float = attr.ib()
+
+
 @attr.s
 class StreamBuffer:
     """Represent a segment."""
@@ -25,15 +33,74 @@ class StreamBuffer:
     output = attr.ib()  # type=av.OutputContainer
     vstream = attr.ib()  # type=av.VideoStream
     astream = attr.ib(default=None)  # type=Optional[av.AudioStream]
+    # Offset in segment where the next part starts
+    part_start: int = attr.ib(default=0)
+    # Video pts where the next part starts
+    part_start_pts: Optional[int] = attr.ib(default=None)
+    parts: List["Part"] = attr.ib(factory=list)
+
+
+@attr.s(slots=True, frozen=True)
+class Part:
+    """Represent a part of a segment, a moof and mdat pair of fragments."""
+
+    duration: float = attr.ib()
+    independent: bool = attr.ib()
+    data: bytes = attr.ib()
 
 
 @attr.s
 class Segment:
-    """Represent a segment."""
+    """Represent a segment.
+
+    The muxed segment is an immutable buffer, the init section and the
+    fragments served to clients are slices of it and not copies.
+    """
 
     sequence: int = attr.ib()
-    segment: io.BytesIO = attr.ib()
+    segment: memoryview = attr.ib()
     duration: float = attr.ib()
+    parts: List[Part] = attr.ib(factory=list)
+    # Init section shared by all segments of a stream
+    init: bytes = attr.ib(default=b"")
+    # The moof and mdat boxes of the segment
+    fragment: memoryview = attr.ib(default=memoryview(b""))
+
+
+class SegmentPool:
+    """Account for the memory of the segments kept by all stream outputs.
+
+    When the segments take more than max_bytes, the oldest ones are evicted
+    from their outputs, keeping the newest segment of each output.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the pool."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._segments: Dict[int, Tuple["StreamOutput", Segment]] = OrderedDict()
+
+    @callback
+    def add(self, output: "StreamOutput", segment: Segment) -> None:
+        """Add a segment kept by an output."""
+        self._segments[id(segment)] = (output, segment)
+        self.size += len(segment.segment)
+        if self.size > self.max_bytes:
+            self._evict()
+
+    @callback
+    def remove(self, segment: Segment) -> None:
+        """Remove a segment no longer kept by its output."""
+        if self._segments.pop(id(segment), None) is not None:
+            self.size -= len(segment.segment)
+
+    def _evict(self) -> None:
+        """Evict the oldest segments until the pool fits its budget."""
+        for output, segment in list(self._segments.values()):
+            if self.size <= self.max_bytes:
+                break
+            if output.evict(segment):
+                self.remove(segment)
 
 
 class StreamOutput:
@@ -48,6 +115,10 @@ class StreamOutput:
         self._event = asyncio.Event()
         self._segments = deque(maxlen=MAX_SEGMENTS)
         self._unsub = None
+        # Parts of the segment being produced
+        self._part_sequence = None
+        self._parts: List[Part] = []
+        self._part_event = asyncio.Event()
 
     @property
     def name(self) -> str:
@@ -74,6 +145,16 @@ class StreamOutput:
         """Return Callable which takes a sequence number and returns container options."""
         return None
 
+    @property
+    def segment_pool(self) -> Optional[SegmentPool]:
+        """Return the pool accounting for the memory of the segments."""
+        return self._stream.hass.data[DOMAIN][ATTR_SEGMENT_POOL]
+
+    @property
+    def part_target_duration(self) -> Optional[float]:
+        """Return the target duration of parts, None if segments are not split."""
+        return None
+
     @property
     def segments(self) -> List[int]:
         """Return current sequence from segments."""
@@ -104,6 +185,47 @@ class StreamOutput:
                 return segment
         return None
 
+    @property
+    def pending_parts(self) -> List[Part]:
+        """Return the parts of the segment being produced."""
+        return self._parts
+
+    @property
+    def pending_sequence(self) -> Optional[int]:
+        """Return the sequence of the segment being produced."""
+        return self._part_sequence
+
+    def get_part(self, sequence: int, index: int) -> Optional[Part]:
+        """Retrieve a part of a segment."""
+        if sequence == self._part_sequence:
+            parts = self._parts
+        else:
+            segment = self.get_segment(sequence)
+            if segment is None:
+                return None
+            parts = segment.parts
+        return parts[index] if index < len(parts) else None
+
+    def has_part(self, sequence: int, index: Optional[int] = None) -> bool:
+        """Return if a segment, or a part of it when index is set, is available."""
+        if self._segments and sequence < self._segments[0].sequence:
+            return True
+        for segment in self._segments:
+            if segment.sequence != sequence:
+                continue
+            if index is None or index < len(segment.parts):
+                return True
+            # A part after the last one is the first part of the next segment
+            return self.has_part(sequence + 1, 0)
+        if index is None or sequence != self._part_sequence:
+            return False
+        return index < len(self._parts)
+
+    async def wait_for_part(self, sequence: int, index: Optional[int] = None) -> None:
+        """Wait until a segment, or a part of it when index is set, is available."""
+        while not self.has_part(sequence, index):
+            await self._part_event.wait()
+
     async def recv(self) -> Segment:
         """Wait for and retrieve the latest segment."""
         last_segment = max(self.segments, default=0)
@@ -134,9 +256,41 @@ class StreamOutput:
             self.cleanup()
             return
 
+        pool = self.segment_pool
+        if pool is not None and len(self._segments) == self._segments.maxlen:
+            # The oldest segment is dropped by the append
+            pool.remove(self._segments[0])
         self._segments.append(segment)
+        if pool is not None:
+            pool.add(self, segment)
+        if segment.sequence == self._part_sequence:
+            self._part_sequence = None
+            self._parts = []
         self._event.set()
         self._event.clear()
+        self._part_event.set()
+        self._part_event.clear()
+
+    @callback
+    def put_part(self, sequence: int, part: Part) -> None:
+        """Store a part of the segment being produced."""
+        if sequence != self._part_sequence:
+            self._part_sequence = sequence
+            self._parts = []
+        self._parts.append(part)
+        self._part_event.set()
+        self._part_event.clear()
+
+    @callback
+    def evict(self, segment: Segment) -> bool:
+        """Drop a segment to free memory, return if it was dropped.
+
+        The newest segment is kept so the output can still be played.
+        """
+        if segment is self._segments[-1]:
+            return False
+        self._segments.remove(segment)
+        return True
 
     @callback
     def _timeout(self, _now=None):
@@ -150,7 +304,13 @@ class StreamOutput:
 
     def cleanup(self):
         """Handle cleanup."""
+        pool = self.segment_pool
+        if pool is not None:
+            for segment in self._segments:
+                pool.remove(segment)
         self._segments = deque(maxlen=MAX_SEGMENTS)
+        self._part_sequence = None
+        self._parts = []
         self._stream.remove_provider(self)
 
 
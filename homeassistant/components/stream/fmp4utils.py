@@ -1,5 +1,8 @@
 """Utilities to help convert mp4s to fmp4s."""
 import io
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
 
 
 def find_box(segment: io.BytesIO, target_type: bytes, box_start: int = 0) -> int:
@@ -23,6 +26,35 @@ def find_box(segment: io.BytesIO, target_type: bytes, box_start: int = 0) -> int
         index += int.from_bytes(box_header[0:4], byteorder="big")
 
 
+def find_fragments(data: memoryview, start: int) -> Optional[Tuple[int, int]]:
+    """Find the complete moof and mdat fragments written after start.
+
+    The data is read without moving the position of the file being written.
+    Return the offsets where the first fragment starts and the last ends.
+    """
+    first = None
+    end = None
+    index = start
+    data_end = len(data)
+    while index + 8 <= data_end:
+        box_end = index + int.from_bytes(data[index : index + 4], byteorder="big")
+        if box_end > data_end or box_end <= index:  # Box not completely written
+            break
+        box_type = data[index + 4 : index + 8]
+        if box_type == b"moof":
+            if first is None:
+                first = index
+        elif box_type == b"mdat":
+            if first is not None:
+                end = box_end
+        elif first is not None:
+            break
+        index = box_end
+    if end is None:
+        return None
+    return first, end
+
+
 def get_init(segment: io.BytesIO) -> bytes:
     """Get init section from fragmented mp4."""
     moof_location = next(find_box(segment, b"moof"))
@@ -32,12 +64,16 @@ def get_init(segment: io.BytesIO) -> bytes:
 
 def get_m4s(segment: io.BytesIO, sequence: int) -> bytes:
     """Get m4s section from fragmented mp4."""
-    moof_location = next(find_box(segment, b"moof"))
-    mfra_location = next(find_box(segment, b"mfra"))
+    moof_location, mfra_location = get_fragment_range(segment)
     segment.seek(moof_location)
     return segment.read(mfra_location - moof_location)
 
 
+def get_fragment_range(segment: io.BytesIO) -> Tuple[int, int]:
+    """Get the offsets where the m4s section of a fragmented mp4 starts and ends."""
+    return next(find_box(segment, b"moof")), next(find_box(segment, b"mfra"))
+
+
 def get_codec_string(segment: io.BytesIO) -> str:
     """Get RFC 6381 codec string."""
     codecs = []
@@ -148,3 +184,189 @@ def get_codec_string(segment: io.BytesIO) -> str:
         codecs.append(codec)
 
     return ",".join(codecs)
+
+
+def _iter_boxes(
+    data: BytesLike, start: int, end: int
+) -> Iterator[Tuple[int, bytes, int]]:
+    """Yield the offset, type and end of the complete boxes between start and end."""
+    index = start
+    while index + 8 <= end:
+        box_end = index + int.from_bytes(data[index : index + 4], byteorder="big")
+        if box_end <= index or box_end > end:
+            break
+        yield index, bytes(data[index + 4 : index + 8]), box_end
+        index = box_end
+
+
+def _iter_decode_times(data: BytesLike) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield the moof offset, traf number, track id and tfdt box offset of each traf."""
+    for moof, box_type, moof_end in _iter_boxes(data, 0, len(data)):
+        if box_type != b"moof":
+            continue
+        traf_number = 0
+        for traf, box_type, traf_end in _iter_boxes(data, moof + 8, moof_end):
+            if box_type != b"traf":
+                continue
+            traf_number += 1
+            track_id = tfdt = None
+            for box, box_type, _ in _iter_boxes(data, traf + 8, traf_end):
+                if box_type == b"tfhd":
+                    track_id = int.from_bytes(
+                        data[box + 12 : box + 16], byteorder="big"
+                    )
+                elif box_type == b"tfdt":
+                    tfdt = box
+            if track_id is not None and tfdt is not None:
+                yield moof, traf_number, track_id, tfdt
+
+
+def _decode_time_range(data: BytesLike, tfdt: int) -> Tuple[int, int]:
+    """Return where the base media decode time of a tfdt box is stored."""
+    # Version 1 boxes store the decode time on 64 bits
+    size = 8 if data[tfdt + 8] == 1 else 4
+    return tfdt + 12, tfdt + 12 + size
+
+
+def get_decode_times(fragment: BytesLike) -> Dict[int, int]:
+    """Get the base media decode time of the first fragment of each track."""
+    decode_times: Dict[int, int] = {}
+    for _, _, track_id, tfdt in _iter_decode_times(fragment):
+        if track_id not in decode_times:
+            start, end = _decode_time_range(fragment, tfdt)
+            decode_times[track_id] = int.from_bytes(
+                fragment[start:end], byteorder="big"
+            )
+    return decode_times
+
+
+def rebase_decode_times(fragment: BytesLike, offsets: Dict[int, int]) -> bytearray:
+    """Copy fragments with the decode times of each track moved back by offsets."""
+    data = bytearray(fragment)
+    for _, _, track_id, tfdt in _iter_decode_times(data):
+        start, end = _decode_time_range(data, tfdt)
+        decode_time = int.from_bytes(data[start:end], byteorder="big")
+        decode_time = max(decode_time - offsets.get(track_id, 0), 0)
+        data[start:end] = decode_time.to_bytes(end - start, byteorder="big")
+    return data
+
+
+def get_random_access_points(fragment: BytesLike) -> List[Tuple[int, int, int]]:
+    """Get the track id, traf number and decode time of each track of the first moof.
+
+    Fragments start on a keyframe, so their first moof is where playback of
+    the tracks can start.
+    """
+    points = []
+    for moof, traf_number, track_id, tfdt in _iter_decode_times(fragment):
+        if moof != 0:
+            break
+        start, end = _decode_time_range(fragment, tfdt)
+        points.append(
+            (
+                track_id,
+                traf_number,
+                int.from_bytes(fragment[start:end], byteorder="big"),
+            )
+        )
+    return points
+
+
+def _find_child(data: BytesLike, box: int, box_type: bytes) -> Optional[int]:
+    """Return the offset of the first child of a box with the given type."""
+    box_end = box + int.from_bytes(data[box : box + 4], byteorder="big")
+    for child, child_type, _ in _iter_boxes(data, box + 8, box_end):
+        if child_type == box_type:
+            return child
+    return None
+
+
+def _find_moov(data: BytesLike) -> Optional[int]:
+    """Return the offset of the moov box of an init section."""
+    for box, box_type, _ in _iter_boxes(data, 0, len(data)):
+        if box_type == b"moov":
+            return box
+    return None
+
+
+def add_fragment_duration(init: BytesLike) -> bytearray:
+    """Copy an init section with a mehd box, holding the duration of the fragments.
+
+    The duration is left at zero until set_duration is called. Init sections
+    without mvex box, or which have a mehd box already, are copied as is.
+    """
+    data = bytearray(init)
+    moov = _find_moov(data)
+    mvex = None if moov is None else _find_child(data, moov, b"mvex")
+    if mvex is None or _find_child(data, mvex, b"mehd") is not None:
+        return data
+    mehd = (20).to_bytes(4, byteorder="big") + b"mehd" + b"\x01" + bytes(11)
+    # The mehd box comes first in the mvex box
+    data[mvex + 8 : mvex + 8] = mehd
+    for box in (moov, mvex):
+        size = int.from_bytes(data[box : box + 4], byteorder="big") + len(mehd)
+        data[box : box + 4] = size.to_bytes(4, byteorder="big")
+    return data
+
+
+def set_duration(init: bytearray, duration: float) -> None:
+    """Set the duration in seconds of the movie and its fragments in an init section."""
+    moov = _find_moov(init)
+    mvhd = None if moov is None else _find_child(init, moov, b"mvhd")
+    if mvhd is None:
+        return
+    # Version 1 boxes store the times and the duration on 64 bits
+    version = init[mvhd + 8]
+    timescale_start = mvhd + (28 if version == 1 else 20)
+    timescale = int.from_bytes(
+        init[timescale_start : timescale_start + 4], byteorder="big"
+    )
+    movie_duration = round(duration * timescale)
+
+    size = 8 if version == 1 else 4
+    _set_uint(init, timescale_start + 4, size, movie_duration)
+    mvex = _find_child(init, moov, b"mvex")
+    mehd = None if mvex is None else _find_child(init, mvex, b"mehd")
+    if mehd is not None:
+        size = 8 if init[mehd + 8] == 1 else 4
+        _set_uint(init, mehd + 12, size, movie_duration)
+
+
+def _set_uint(data: bytearray, start: int, size: int, value: int) -> None:
+    """Store an unsigned integer, capped to the largest value it can hold."""
+    value = min(value, (1 << (8 * size)) - 1)
+    data[start : start + size] = value.to_bytes(size, byteorder="big")
+
+
+def build_mfra(points: Dict[int, List[Tuple[int, int, int]]]) -> bytes:
+    """Build an mfra box indexing the fragments of each track.
+
+    The points map each track id to the decode time, moof offset and traf
+    number of its fragments, the first sample of which is a sync sample.
+    """
+    tfras = b""
+    for track_id, track_points in points.items():
+        entries = b"".join(
+            decode_time.to_bytes(8, byteorder="big")
+            + moof_offset.to_bytes(8, byteorder="big")
+            # Traf, trun and sample numbers stored on 1 byte
+            + bytes((traf_number, 1, 1))
+            for decode_time, moof_offset, traf_number in track_points
+        )
+        payload = (
+            b"\x01\x00\x00\x00"
+            + track_id.to_bytes(4, byteorder="big")
+            + bytes(4)
+            + len(track_points).to_bytes(4, byteorder="big")
+            + entries
+        )
+        tfras += (8 + len(payload)).to_bytes(4, byteorder="big") + b"tfra" + payload
+    size = 8 + len(tfras) + 16
+    mfro = (16).to_bytes(4, byteorder="big") + b"mfro" + bytes(4)
+    return (
+        size.to_bytes(4, byteorder="big")
+        + b"mfra"
+        + tfras
+        + mfro
+        + size.to_bytes(4, byteorder="big")
+    )
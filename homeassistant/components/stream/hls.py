@@ -1,14 +1,16 @@
 """Provide functionality to stream HLS."""
+import asyncio
 import io
-from typing import Callable
+from typing import Callable, Optional
 
 from aiohttp import web
+import async_timeout
 
 from homeassistant.core import callback
 
-from .const import FORMAT_CONTENT_TYPE
+from .const import ATTR_SETTINGS, DOMAIN, FORMAT_CONTENT_TYPE
 from .core import PROVIDERS, StreamOutput, StreamView
-from .fmp4utils import get_codec_string, get_init, get_m4s
+from .fmp4utils import get_codec_string
 
 
 @callback
@@ -16,6 +18,7 @@ def async_setup_hls(hass):
     """Set up api endpoints."""
     hass.http.register_view(HlsPlaylistView())
     hass.http.register_view(HlsSegmentView())
+    hass.http.register_view(HlsPartView())
     hass.http.register_view(HlsInitView())
     hass.http.register_view(HlsMasterPlaylistView())
     return "/api/hls/{}/master_playlist.m3u8"
@@ -35,10 +38,8 @@ class HlsMasterPlaylistView(StreamView):
         # Calculate file size / duration and use a small multiplier to account for variation
         # hls spec already allows for 25% variation
         segment = track.get_segment(track.segments[-1])
-        bandwidth = round(
-            segment.segment.seek(0, io.SEEK_END) * 8 / segment.duration * 1.2
-        )
-        codecs = get_codec_string(segment.segment)
+        bandwidth = round(len(segment.segment) * 8 / segment.duration * 1.2)
+        codecs = get_codec_string(io.BytesIO(segment.init))
         lines = [
             "#EXTM3U",
             f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},CODECS="{codecs}"',
@@ -67,14 +68,36 @@ class HlsPlaylistView(StreamView):
     @staticmethod
     def render_preamble(track):
         """Render preamble."""
-        return [
+        preamble = [
             "#EXT-X-VERSION:7",
             f"#EXT-X-TARGETDURATION:{track.target_duration}",
-            '#EXT-X-MAP:URI="init.mp4"',
         ]
+        part_target_duration = track.part_target_duration
+        if part_target_duration:
+            preamble.extend(
+                [
+                    "#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,"
+                    "PART-HOLD-BACK={:.03f}".format(3 * part_target_duration),
+                    "#EXT-X-PART-INF:PART-TARGET={:.03f}".format(part_target_duration),
+                ]
+            )
+        preamble.append('#EXT-X-MAP:URI="init.mp4"')
+        return preamble
 
     @staticmethod
-    def render_playlist(track):
+    def render_parts(sequence, parts):
+        """Render the parts of a segment."""
+        return [
+            '#EXT-X-PART:DURATION={:.03f},URI="./part/{}.{}.m4s"{}'.format(
+                part.duration,
+                sequence,
+                index,
+                ",INDEPENDENT=YES" if part.independent else "",
+            )
+            for index, part in enumerate(parts)
+        ]
+
+    def render_playlist(self, track):
         """Render playlist."""
         segments = track.segments
 
@@ -85,6 +108,7 @@ class HlsPlaylistView(StreamView):
 
         for sequence in segments:
             segment = track.get_segment(sequence)
+            playlist.extend(self.render_parts(sequence, segment.parts))
             playlist.extend(
                 [
                     "#EXTINF:{:.04f},".format(float(segment.duration)),
@@ -92,6 +116,11 @@ class HlsPlaylistView(StreamView):
                 ]
             )
 
+        if track.pending_parts:
+            playlist.extend(
+                self.render_parts(track.pending_sequence, track.pending_parts)
+            )
+
         return playlist
 
     def render(self, track):
@@ -106,9 +135,32 @@ class HlsPlaylistView(StreamView):
         # Wait for a segment to be ready
         if not track.segments:
             await track.recv()
+        if track.part_target_duration and "_HLS_msn" in request.query:
+            await self.wait_for_blocking_reload(request, track)
         headers = {"Content-Type": FORMAT_CONTENT_TYPE["hls"]}
         return web.Response(body=self.render(track).encode("utf-8"), headers=headers)
 
+    @staticmethod
+    async def wait_for_blocking_reload(request, track):
+        """Wait for the segment or part requested by a blocking playlist reload."""
+        try:
+            sequence = int(request.query["_HLS_msn"])
+            index: Optional[int] = None
+            if "_HLS_part" in request.query:
+                index = int(request.query["_HLS_part"])
+        except ValueError as err:
+            raise web.HTTPBadRequest() from err
+
+        # Requests more than two segments ahead are rejected
+        if sequence > max(track.segments, default=0) + 2:
+            raise web.HTTPBadRequest()
+
+        try:
+            async with async_timeout.timeout(3 * track.target_duration):
+                await track.wait_for_part(sequence, index)
+        except asyncio.TimeoutError as err:
+            raise web.HTTPServiceUnavailable() from err
+
 
 class HlsInitView(StreamView):
     """Stream view to serve HLS init.mp4."""
@@ -124,7 +176,7 @@ class HlsInitView(StreamView):
         if not segments:
             return web.HTTPNotFound()
         headers = {"Content-Type": "video/mp4"}
-        return web.Response(body=get_init(segments[0].segment), headers=headers)
+        return web.Response(body=segments[-1].init, headers=headers)
 
 
 class HlsSegmentView(StreamView):
@@ -141,10 +193,28 @@ class HlsSegmentView(StreamView):
         if not segment:
             return web.HTTPNotFound()
         headers = {"Content-Type": "video/iso.segment"}
-        return web.Response(
-            body=get_m4s(segment.segment, int(sequence)),
-            headers=headers,
-        )
+        return web.Response(body=segment.fragment, headers=headers)
+
+
+class HlsPartView(StreamView):
+    """Stream view to serve a low latency HLS part of a segment."""
+
+    url = r"/api/hls/{token:[a-f0-9]+}/part/{sequence:\d+}.{part_index:\d+}.m4s"
+    name = "api:stream:hls:part"
+    cors_allowed = True
+
+    async def get(self, request, token, sequence=None, part_index=None):
+        """Start a GET request, the part index is read in handle."""
+        return await super().get(request, token, sequence)
+
+    async def handle(self, request, stream, sequence):
+        """Return fmp4 part."""
+        track = stream.add_provider("hls")
+        part = track.get_part(int(sequence), int(request.match_info["part_index"]))
+        if not part:
+            return web.HTTPNotFound()
+        headers = {"Content-Type": "video/iso.segment"}
+        return web.Response(body=part.data, headers=headers)
 
 
 @PROVIDERS.register("hls")
@@ -171,12 +241,27 @@ class HlsStreamOutput(StreamOutput):
         """Return desired video codecs."""
         return {"hevc", "h264"}
 
+    @property
+    def part_target_duration(self) -> Optional[float]:
+        """Return the target duration of low latency HLS parts."""
+        settings = self._stream.hass.data[DOMAIN][ATTR_SETTINGS]
+        return settings.part_target_duration if settings.ll_hls else None
+
     @property
     def container_options(self) -> Callable[[int], dict]:
         """Return Callable which takes a sequence number and returns container options."""
+        part_options = {}
+        part_target_duration = self.part_target_duration
+        if part_target_duration:
+            # Write a fragment, and so a part, every part target duration
+            part_options = {
+                "frag_duration": str(int(part_target_duration * 1e6)),
+                "flush_packets": "1",
+            }
         return lambda sequence: {
             # Removed skip_sidx - see https://github.com/home-assistant/core/pull/39970
             "movflags": "frag_custom+empty_moov+default_base_moof+frag_discont",
             "avoid_negative_ts": "make_non_negative",
             "fragment_index": str(sequence),
+            **part_options,
         }
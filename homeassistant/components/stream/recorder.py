@@ -1,13 +1,24 @@
 """Provide functionality to record stream."""
+from collections import deque
+import logging
 import os
+import queue
 import threading
-from typing import List
-
-import av
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
 
 from homeassistant.core import callback
 
-from .core import PROVIDERS, Segment, StreamOutput
+from .core import PROVIDERS, Segment, SegmentPool, StreamOutput
+from .fmp4utils import (
+    add_fragment_duration,
+    build_mfra,
+    get_decode_times,
+    get_random_access_points,
+    rebase_decode_times,
+    set_duration,
+)
+
+_LOGGER = logging.getLogger(__name__)
 
 
 @callback
@@ -15,70 +26,51 @@ def async_setup_recorder(hass):
     """Only here so Provider Registry works."""
 
 
-def recorder_save_worker(file_out: str, segments: List[Segment], container_format: str):
-    """Handle saving stream."""
+def recorder_save_worker(file_out: str, segments: Iterable[Segment]):
+    """Write segments to a file as they are produced.
+
+    The fragments of the segments are already muxed, they are appended to
+    the init section with their decode times moved back so the recording
+    starts at zero, without demuxing or re-encoding them. The recording is
+    a fragmented mp4: once the segments end, the duration is set in the
+    init section and an mfra box indexing the fragments is appended so
+    players can show the duration and seek.
+    """
     if not os.path.exists(os.path.dirname(file_out)):
         os.makedirs(os.path.dirname(file_out), exist_ok=True)
 
-    first_pts = {"video": None, "audio": None}
-    output = av.open(file_out, "w", format=container_format)
-    output_v = None
-    output_a = None
-
-    # Get first_pts values from first segment
-    if len(segments) > 0:
-        segment = segments[0]
-        source = av.open(segment.segment, "r", format=container_format)
-        source_v = source.streams.video[0]
-        first_pts["video"] = source_v.start_time
-        if len(source.streams.audio) > 0:
-            source_a = source.streams.audio[0]
-            first_pts["audio"] = int(
-                source_v.start_time * source_v.time_base / source_a.time_base
-            )
-        source.close()
-
-    for segment in segments:
-        # Open segment
-        source = av.open(segment.segment, "r", format=container_format)
-        source_v = source.streams.video[0]
-        # Add output streams
-        if not output_v:
-            output_v = output.add_stream(template=source_v)
-            context = output_v.codec_context
-            context.flags |= "GLOBAL_HEADER"
-        if not output_a and len(source.streams.audio) > 0:
-            source_a = source.streams.audio[0]
-            output_a = output.add_stream(template=source_a)
-
-        # Remux video
-        for packet in source.demux():
-            if packet.dts is None:
-                continue
-            packet.pts -= first_pts[packet.stream.type]
-            packet.dts -= first_pts[packet.stream.type]
-            packet.stream = output_v if packet.stream.type == "video" else output_a
-            output.mux(packet)
-
-        source.close()
-
-    output.close()
-
-
-@PROVIDERS.register("recorder")
-class RecorderOutput(StreamOutput):
-    """Represents HLS Output formats."""
-
-    def __init__(self, stream, timeout: int = 30) -> None:
-        """Initialize recorder output."""
-        super().__init__(stream, timeout)
-        self.video_path = None
-        self._segments = []
-
-    @property
-    def name(self) -> str:
-        """Return provider name."""
-        return "recorder"
+    with open(file_out, "wb") as output:
+        init = None
+        decode_times: Dict[int, int] = {}
+        points: Dict[int, List[Tuple[int, int, int]]] = {}
+        duration = 0.0
+        for segment in segments:
+            if init is None:
+                init = add_fragment_duration(segment.init)
+                output.write(init)
+                decode_times = get_decode_times(segment.fragment)
+            fragment = rebase_decode_times(segment.fragment, decode_times)
+            moof_offset = output.tell()
+            for track_id, traf_number, decode_time in get_random_access_points(
+                fragment
+            ):
+                points.setdefault(track_id, []).append(
+                    (decode_time, moof_offset, traf_number)
+                )
+            output.write(fragment)
+            output.flush()
+            duration += segment.duration
+
+        if init is None:
+            return
+        output.write(build_mfra(points))
+        set_duration(init, duration)
+        output.seek(0)
+        output.write(init)
+
+
+class _RecordingMixin:
+    """Container format and codecs of the segments written to recordings."""
 
     @property
     def format(self) -> str:
@@ -95,11 +87,57 @@ class RecorderOutput(StreamOutput):
         """Return desired video codecs."""
         return {"hevc", "h264"}
 
+    @property
+    def segment_pool(self) -> Optional[SegmentPool]:
+        """Return None, the segments of recordings are not evicted."""
+        return None
+
+
+@PROVIDERS.register("recorder")
+class RecorderOutput(_RecordingMixin, StreamOutput):
+    """Represents HLS Output formats."""
+
+    def __init__(self, stream, timeout: int = 30) -> None:
+        """Initialize recorder output."""
+        super().__init__(stream, timeout)
+        self.video_path = None
+        self._lookback: List[Segment] = []
+        self._write_queue: Optional["queue.SimpleQueue[Optional[Segment]]"] = None
+
+    @property
+    def name(self) -> str:
+        """Return provider name."""
+        return "recorder"
+
     def prepend(self, segments: List[Segment]) -> None:
-        """Prepend segments to existing list."""
+        """Prepend segments to the recording, before its first segment."""
+        if self._write_queue is not None:
+            _LOGGER.warning("Recording to %s already started", self.video_path)
+            return
         own_segments = self.segments
-        segments = [s for s in segments if s.sequence not in own_segments]
-        self._segments = segments + self._segments
+        self._lookback = [s for s in segments if s.sequence not in own_segments]
+
+    def _write(self, segment: Optional[Segment]) -> None:
+        """Queue a segment to be written, None ends the recording."""
+        if self._write_queue is None:
+            self._write_queue = queue.SimpleQueue()
+            thread = threading.Thread(
+                name="recorder_save_worker",
+                target=recorder_save_worker,
+                args=(self.video_path, iter(self._write_queue.get, None)),
+            )
+            thread.start()
+            for lookback_segment in self._lookback:
+                self._write_queue.put(lookback_segment)
+            self._lookback = []
+        self._write_queue.put(segment)
+
+    @callback
+    def put(self, segment: Segment) -> None:
+        """Store output and write it to the recording."""
+        super().put(segment)
+        if segment is not None:
+            self._write(segment)
 
     @callback
     def _timeout(self, _now=None):
@@ -108,13 +146,66 @@ class RecorderOutput(StreamOutput):
         self.cleanup()
 
     def cleanup(self):
-        """Write recording and clean up."""
-        thread = threading.Thread(
-            name="recorder_save_worker",
-            target=recorder_save_worker,
-            args=(self.video_path, self._segments, self.format),
-        )
-        thread.start()
-
-        self._segments = []
+        """Finish writing recording and clean up."""
+        if self._write_queue is not None or self._lookback:
+            self._write(None)
+        self._write_queue = None
+        self._lookback = []
+        self._stream.remove_provider(self)
+
+
+@PROVIDERS.register("lookback")
+class LookbackOutput(_RecordingMixin, StreamOutput):
+    """Keep the latest segments of a stream to record what preceded an event.
+
+    Segments are kept while they are needed to cover ``duration`` seconds,
+    so a recording can start with them without re-encoding the stream.
+    """
+
+    def __init__(self, stream, timeout: int = 300) -> None:
+        """Initialize lookback output."""
+        super().__init__(stream, timeout)
+        self.duration = 0
+        self._segments: Deque[Segment] = deque()
+        self._buffered_duration = 0.0
+
+    @property
+    def name(self) -> str:
+        """Return provider name."""
+        return "lookback"
+
+    @callback
+    def put(self, segment: Segment) -> None:
+        """Store output, dropping the segments older than the duration."""
+        super().put(segment)
+        if segment is None:
+            return
+        self._buffered_duration += segment.duration
+        while (
+            len(self._segments) > 1
+            and self._buffered_duration - self._segments[0].duration >= self.duration
+        ):
+            self._buffered_duration -= self._segments.popleft().duration
+
+    def get_lookback(self, duration: float) -> List[Segment]:
+        """Return the latest segments covering a duration in seconds."""
+        segments: List[Segment] = []
+        for segment in reversed(self._segments):
+            if duration <= 0:
+                break
+            segments.insert(0, segment)
+            duration -= segment.duration
+        return segments
+
+    @callback
+    def _timeout(self, _now=None):
+        """Keep buffering while the stream runs, without keeping it busy."""
+        self._unsub = None
+        self.idle = True
+        self._stream.check_idle()
+
+    def cleanup(self):
+        """Handle cleanup."""
+        self._segments = deque()
+        self._buffered_duration = 0.0
         self._stream.remove_provider(self)
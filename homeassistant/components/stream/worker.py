@@ -15,7 +15,8 @@ from .const import (
     STREAM_RESTART_RESET_TIME,
     STREAM_TIMEOUT,
 )
-from .core import Segment, StreamBuffer
+from .core import Part, Segment, StreamBuffer
+from .fmp4utils import find_fragments, get_fragment_range, get_init
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -114,6 +115,8 @@ def _stream_worker_internal(hass, stream, quit_event):
     segment_start_pts = None
     # Because of problems 1 and 2 below, we need to store the first few packets and replay them
     initial_packets = deque()
+    # The init section of each output, the same for all segments of the stream
+    inits = {}
 
     # Have to work around two problems with RTSP feeds in ffmpeg
     # 1 - first frame has bad pts/dts https://trac.ffmpeg.org/ticket/5018
@@ -200,6 +203,7 @@ def _stream_worker_internal(hass, stream, quit_event):
             buffer = create_stream_buffer(
                 stream_output, video_stream, audio_stream, sequence
             )
+            buffer.part_start_pts = video_pts
             outputs[stream_output.name] = (
                 buffer,
                 {video_stream: buffer.vstream, audio_stream: buffer.astream},
@@ -220,6 +224,51 @@ def _stream_worker_internal(hass, stream, quit_event):
                 packet.stream = output_streams[audio_stream]
                 buffer.output.mux(packet)
 
+    def split_part(buffer, video_pts):
+        """Split the fragments muxed since the previous part into a part."""
+        with buffer.segment.getbuffer() as data:
+            fragments = find_fragments(data, buffer.part_start)
+            if fragments is None:
+                return None
+            part_start, part_end = fragments
+            part = Part(
+                duration=float(
+                    (video_pts - buffer.part_start_pts) * video_stream.time_base
+                ),
+                independent=not buffer.parts,
+                data=bytes(data[part_start:part_end]),
+            )
+        buffer.part_start = part_end
+        buffer.part_start_pts = video_pts
+        buffer.parts.append(part)
+        return part
+
+    def publish_parts(video_pts):
+        """Publish the parts muxed before a video packet to the outputs using them."""
+        for fmt, (buffer, _) in outputs.items():
+            stream_output = stream.outputs.get(fmt)
+            if not stream_output or not stream_output.part_target_duration:
+                continue
+            part = split_part(buffer, video_pts)
+            if part is not None:
+                hass.loop.call_soon_threadsafe(stream_output.put_part, sequence, part)
+
+    def create_segment(fmt, buffer, duration):
+        """Freeze a muxed segment into an immutable buffer."""
+        if fmt not in inits:
+            inits[fmt] = get_init(buffer.segment)
+        fragment_start, fragment_end = get_fragment_range(buffer.segment)
+        # The buffer of the BytesIO is shared, it can't be written anymore
+        data = buffer.segment.getbuffer().toreadonly()
+        return Segment(
+            sequence,
+            data,
+            duration,
+            buffer.parts,
+            inits[fmt],
+            data[fragment_start:fragment_end],
+        )
+
     def finalize_stream():
         if not stream.keepalive:
             # End of stream, clear listeners and stop thread
@@ -274,14 +323,14 @@ def _stream_worker_internal(hass, stream, quit_event):
                 # Save segment to outputs
                 for fmt, (buffer, _) in outputs.items():
                     buffer.output.close()
-                    if stream.outputs.get(fmt):
+                    stream_output = stream.outputs.get(fmt)
+                    if stream_output:
+                        if stream_output.part_target_duration:
+                            # The last part is in the segment only
+                            split_part(buffer, packet.pts)
                         hass.loop.call_soon_threadsafe(
-                            stream.outputs[fmt].put,
-                            Segment(
-                                sequence,
-                                buffer.segment,
-                                segment_duration,
-                            ),
+                            stream_output.put,
+                            create_segment(fmt, buffer, segment_duration),
                         )
 
                 # Reinitialize
@@ -291,7 +340,9 @@ def _stream_worker_internal(hass, stream, quit_event):
         last_dts[packet.stream] = packet.dts
         # mux packets
         if packet.stream == video_stream:
+            video_pts = packet.pts
             mux_video_packet(packet)  # mutates packet timestamps
+            publish_parts(video_pts)
         else:
             mux_audio_packet(packet)  # mutates packet timestamps
 
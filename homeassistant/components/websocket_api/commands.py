@@ -17,7 +17,12 @@ from homeassistant.helpers import config_validation as cv, entity
 from homeassistant.helpers.event import TrackTemplate, async_track_template_result
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers.template import Template
-from homeassistant.loader import IntegrationNotFound, async_get_integration
+from homeassistant.loader import (
+    DATA_IMPORT_TIME,
+    IntegrationNotFound,
+    async_get_integration,
+)
+from homeassistant.setup import DATA_SETUP_TIME
 
 from . import const, decorators, messages
 
@@ -37,6 +42,7 @@ def async_register_commands(hass, async_reg):
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_manifest_list)
     async_reg(hass, handle_manifest_get)
+    async_reg(hass, handle_integration_setup_info)
     async_reg(hass, handle_entity_source)
     async_reg(hass, handle_subscribe_trigger)
     async_reg(hass, handle_test_condition)
@@ -52,10 +58,16 @@ def pong_message(iden):
     {
         vol.Required("type"): "subscribe_events",
         vol.Optional("event_type", default=MATCH_ALL): str,
+        vol.Optional("batch", default=False): bool,
     }
 )
 def handle_subscribe_events(hass, connection, msg):
-    """Handle subscribe events command."""
+    """Handle subscribe events command.
+
+    Clients passing batch receive events fired together, like the state
+    changes of StateMachine.async_set_many, in one message with an
+    events list instead of one message per event.
+    """
     # Circular dep
     # pylint: disable=import-outside-toplevel
     from .permissions import SUBSCRIBE_WHITELIST
@@ -68,26 +80,41 @@ def handle_subscribe_events(hass, connection, msg):
     if event_type == EVENT_STATE_CHANGED:
 
         @callback
-        def forward_events(event):
+        def forward_events(events):
             """Forward state changed events to websocket."""
-            if not connection.user.permissions.check_entity(
-                event.data["entity_id"], POLICY_READ
-            ):
-                return
-
-            connection.send_message(messages.cached_event_message(msg["id"], event))
+            send_events(
+                [
+                    event
+                    for event in events
+                    if connection.user.permissions.check_entity(
+                        event.data["entity_id"], POLICY_READ
+                    )
+                ]
+            )
 
     else:
 
         @callback
-        def forward_events(event):
+        def forward_events(events):
             """Forward events to websocket."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
+            send_events(
+                [event for event in events if event.event_type != EVENT_TIME_CHANGED]
+            )
+
+    @callback
+    def send_events(events):
+        """Send the events in one message or one message per event."""
+        if msg["batch"] and len(events) > 1:
+            connection.send_message(
+                messages.cached_event_batch_message(msg["id"], events)
+            )
+            return
 
+        for event in events:
             connection.send_message(messages.cached_event_message(msg["id"], event))
 
-    connection.subscriptions[msg["id"]] = hass.bus.async_listen(
+    # Events fired together are forwarded in one job
+    connection.subscriptions[msg["id"]] = hass.bus.async_listen_batch(
         event_type, forward_events
     )
 
@@ -229,6 +256,30 @@ async def handle_manifest_get(hass, connection, msg):
         connection.send_error(msg["id"], const.ERR_NOT_FOUND, "Integration not found")
 
 
+@callback
+@decorators.websocket_command({vol.Required("type"): "integration/setup_info"})
+def handle_integration_setup_info(hass, connection, msg):
+    """Handle integration setup info command."""
+    setup_time = hass.data.get(DATA_SETUP_TIME, {})
+    # Modules are named after their integration, platforms as domain.platform
+    imports = {}
+    for module, seconds in hass.data.get(DATA_IMPORT_TIME, {}).items():
+        imports.setdefault(module.partition(".")[0], {})[module] = seconds
+
+    connection.send_result(
+        msg["id"],
+        [
+            {
+                "domain": domain,
+                "setup_seconds": setup_time.get(domain),
+                "import_seconds": sum(imports.get(domain, {}).values()),
+                "imports": imports.get(domain, {}),
+            }
+            for domain in sorted(setup_time.keys() | imports.keys())
+        ],
+    )
+
+
 @callback
 @decorators.websocket_command({vol.Required("type"): "ping"})
 def handle_ping(hass, connection, msg):
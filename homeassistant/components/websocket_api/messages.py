@@ -2,7 +2,7 @@
 
 from functools import lru_cache
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import voluptuous as vol
 
@@ -52,6 +52,11 @@ def event_message(iden: JSON_TYPE, event: Any) -> Dict:
     return {"id": iden, "type": "event", "event": event}
 
 
+def event_batch_message(iden: JSON_TYPE, events: List[Any]) -> Dict:
+    """Return a message with a batch of events."""
+    return {"id": iden, "type": "event", "events": events}
+
+
 def cached_event_message(iden: int, event: Event) -> str:
     """Return an event message.
 
@@ -74,6 +79,24 @@ def _cached_event_message(event: Event) -> str:
     return message_to_json(event_message(IDEN_TEMPLATE, event))
 
 
+def cached_event_batch_message(iden: int, events: List[Event]) -> str:
+    """Return a message with a batch of events.
+
+    Each event is serialized to json once, like in cached_event_message.
+    """
+    try:
+        events_json = ",".join(_cached_event_json(event) for event in events)
+    except (ValueError, TypeError):
+        return message_to_json(event_batch_message(iden, events))
+    return f'{{"id": {iden}, "type": "event", "events": [{events_json}]}}'
+
+
+@lru_cache(maxsize=128)
+def _cached_event_json(event: Event) -> str:
+    """Cache and serialize an event of a batch to json."""
+    return const.JSON_DUMP(event)
+
+
 def message_to_json(message: Any) -> str:
     """Serialize a websocket message to json."""
     try:
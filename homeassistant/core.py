@@ -29,6 +29,7 @@ from typing import (
     Mapping,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -41,6 +42,7 @@ import yarl
 from homeassistant import block_async_io, loader, util
 from homeassistant.const import (
     ATTR_DOMAIN,
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_NOW,
     ATTR_SECONDS,
@@ -651,6 +653,13 @@ class EventBus:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners: Dict[str, List[HassJob]] = {}
+        # event_type -> data key -> data value -> listeners
+        # The None data key indexes the domain of the entity_id
+        self._match_listeners: Dict[
+            str, Dict[Optional[str], Dict[Any, List[HassJob]]]
+        ] = {}
+        # Listeners called with lists of events, see async_fire_many
+        self._batch_listeners: Dict[str, List[HassJob]] = {}
         self._hass = hass
 
     @callback
@@ -659,7 +668,14 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(self._listeners[key]) for key in self._listeners}
+        listeners = {key: len(self._listeners[key]) for key in self._listeners}
+        for event_type, jobs in self._batch_listeners.items():
+            listeners[event_type] = listeners.get(event_type, 0) + len(jobs)
+        for event_type, index in self._match_listeners.items():
+            listeners[event_type] = listeners.get(event_type, 0) + sum(
+                len(jobs) for values in index.values() for jobs in values.values()
+            )
+        return listeners
 
     @property
     def listeners(self) -> Dict[str, int]:
@@ -691,6 +707,53 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        event = Event(event_type, event_data, origin, time_fired, context)
+
+        if event_type != EVENT_TIME_CHANGED:
+            _LOGGER.debug("Bus:Handling %s", event)
+
+        self._async_dispatch(event)
+
+        batch_listeners = self._async_batch_listeners(event_type)
+        if batch_listeners:
+            events = [event]
+            for job in batch_listeners:
+                self._hass.async_add_hass_job(job, events)
+
+    @callback
+    def async_fire_many(
+        self,
+        event_type: str,
+        events_data: Iterable[Optional[Dict]],
+        origin: EventOrigin = EventOrigin.local,
+        context: Optional[Context] = None,
+        time_fired: Optional[datetime.datetime] = None,
+    ) -> None:
+        """Fire many events of the same type at once.
+
+        Listeners registered with async_listen_batch are called once with
+        all the events.
+
+        This method must be run in the event loop.
+        """
+        events = [
+            Event(event_type, event_data, origin, time_fired, context)
+            for event_data in events_data
+        ]
+
+        if event_type != EVENT_TIME_CHANGED:
+            _LOGGER.debug("Bus:Handling %d %s events", len(events), event_type)
+
+        for event in events:
+            self._async_dispatch(event)
+
+        for job in self._async_batch_listeners(event_type):
+            self._hass.async_add_hass_job(job, events)
+
+    @callback
+    def _async_dispatch(self, event: Event) -> None:
+        """Run the listeners of a single event."""
+        event_type = event.event_type
         listeners = self._listeners.get(event_type, [])
 
         # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
@@ -698,10 +761,9 @@ class EventBus:
         if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
             listeners = match_all_listeners + listeners
 
-        event = Event(event_type, event_data, origin, time_fired, context)
-
-        if event_type != EVENT_TIME_CHANGED:
-            _LOGGER.debug("Bus:Handling %s", event)
+        match_index = self._match_listeners.get(event_type)
+        if match_index is not None and event.data:
+            listeners = listeners + self._matching_listeners(match_index, event.data)
 
         if not listeners:
             return
@@ -709,6 +771,15 @@ class EventBus:
         for job in listeners:
             self._hass.async_add_hass_job(job, event)
 
+    @callback
+    def _async_batch_listeners(self, event_type: str) -> List[HassJob]:
+        """Return the batch listeners of an event type."""
+        listeners = self._batch_listeners.get(event_type, [])
+        match_all_listeners = self._batch_listeners.get(MATCH_ALL)
+        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
+            listeners = match_all_listeners + listeners
+        return listeners
+
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
@@ -746,6 +817,108 @@ class EventBus:
 
         return remove_listener
 
+    @callback
+    def async_listen_batch(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+        """Listen for lists of events of a specific type.
+
+        The listener is called with all events fired together by
+        async_fire_many, and with a list of one event for the events
+        fired by async_fire. To listen to all events specify the constant
+        ``MATCH_ALL`` as event_type.
+
+        This method must be run in the event loop.
+        """
+        job = HassJob(listener)
+        self._batch_listeners.setdefault(event_type, []).append(job)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the listener."""
+            self._async_remove_listener(event_type, job, self._batch_listeners)
+
+        return remove_listener
+
+    @staticmethod
+    def _matching_listeners(
+        match_index: Dict[Optional[str], Dict[Any, List[HassJob]]], event_data: Dict
+    ) -> List[HassJob]:
+        """Return the listeners matching the data of an event."""
+        listeners: List[HassJob] = []
+        for key, values in match_index.items():
+            if key is None:
+                value = event_data.get(ATTR_ENTITY_ID)
+                if not isinstance(value, str):
+                    continue
+                value = value.partition(".")[0]
+            else:
+                value = event_data.get(key)
+            try:
+                jobs = values.get(value)
+            except TypeError:
+                # Unhashable values like lists of entity ids never match
+                continue
+            if jobs:
+                listeners.extend(jobs)
+        return listeners
+
+    @callback
+    def async_listen_data(
+        self, event_type: str, data_key: str, data_value: Any, listener: Callable
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a type with a specific value in their data.
+
+        The listeners are indexed by value, so firing an event only runs
+        the listeners that match. For example, to listen for the state
+        changes of one entity use ``ATTR_ENTITY_ID`` as data_key.
+
+        This method must be run in the event loop.
+        """
+        return self._async_listen_match(
+            event_type, data_key, data_value, HassJob(listener)
+        )
+
+    @callback
+    def async_listen_domain(
+        self, event_type: str, domain: str, listener: Callable
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a type about the entities of a domain.
+
+        The domain is taken from the ``entity_id`` in the event data.
+
+        This method must be run in the event loop.
+        """
+        return self._async_listen_match(event_type, None, domain, HassJob(listener))
+
+    @callback
+    def _async_listen_match(
+        self, event_type: str, data_key: Optional[str], data_value: Any, job: HassJob
+    ) -> CALLBACK_TYPE:
+        values = self._match_listeners.setdefault(event_type, {}).setdefault(
+            data_key, {}
+        )
+        values.setdefault(data_value, []).append(job)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the listener."""
+            try:
+                jobs = values[data_value]
+                jobs.remove(job)
+            except (KeyError, ValueError):
+                _LOGGER.exception("Unable to remove unknown job listener %s", job)
+                return
+
+            # delete the empty index levels
+            if not jobs:
+                del values[data_value]
+                index = self._match_listeners[event_type]
+                if not values:
+                    del index[data_key]
+                if not index:
+                    del self._match_listeners[event_type]
+
+        return remove_listener
+
     def listen_once(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen once for event of a specific type.
 
@@ -798,17 +971,24 @@ class EventBus:
         return self._async_listen_job(event_type, job)
 
     @callback
-    def _async_remove_listener(self, event_type: str, hassjob: HassJob) -> None:
+    def _async_remove_listener(
+        self,
+        event_type: str,
+        hassjob: HassJob,
+        listeners: Optional[Dict[str, List[HassJob]]] = None,
+    ) -> None:
         """Remove a listener of a specific event_type.
 
         This method must be run in the event loop.
         """
+        if listeners is None:
+            listeners = self._listeners
         try:
-            self._listeners[event_type].remove(hassjob)
+            listeners[event_type].remove(hassjob)
 
             # delete event_type list if empty
-            if not self._listeners[event_type]:
-                self._listeners.pop(event_type)
+            if not listeners[event_type]:
+                listeners.pop(event_type)
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
@@ -1154,9 +1334,79 @@ class StateMachine:
         This method must be run in the event loop.
         """
         entity_id = entity_id.lower()
+        old_state = self._states.get(entity_id)
+        now = dt_util.utcnow()
+        state = self._async_new_state(
+            entity_id, new_state, attributes, force_update, context, now, old_state
+        )
+        if state is None:
+            return
+
+        self._states[entity_id] = state
+        self._bus.async_fire(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
+            EventOrigin.local,
+            state.context,
+            time_fired=now,
+        )
+
+    @callback
+    def async_set_many(
+        self,
+        updates: Iterable[Tuple[str, str, Optional[Dict]]],
+        force_update: bool = False,
+        context: Optional[Context] = None,
+    ) -> None:
+        """Set the states of many entities at once.
+
+        updates are (entity_id, new_state, attributes) tuples. Either all
+        states are set or, when one of them is invalid, none. The
+        state_changed events are fired together after all states are set,
+        so listeners never see a partial update.
+
+        This method must be run in the event loop.
+        """
+        if context is None:
+            context = Context()
+        now = dt_util.utcnow()
+        new_states: Dict[str, State] = {}
+        events_data = []
+
+        for entity_id, new_state, attributes in updates:
+            entity_id = entity_id.lower()
+            old_state = new_states.get(entity_id) or self._states.get(entity_id)
+            state = self._async_new_state(
+                entity_id, new_state, attributes, force_update, context, now, old_state
+            )
+            if state is None:
+                continue
+            new_states[entity_id] = state
+            events_data.append(
+                {"entity_id": entity_id, "old_state": old_state, "new_state": state}
+            )
+
+        if not events_data:
+            return
+
+        self._states.update(new_states)
+        self._bus.async_fire_many(
+            EVENT_STATE_CHANGED, events_data, EventOrigin.local, context, now
+        )
+
+    @staticmethod
+    def _async_new_state(
+        entity_id: str,
+        new_state: str,
+        attributes: Optional[Dict],
+        force_update: bool,
+        context: Optional[Context],
+        now: datetime.datetime,
+        old_state: Optional[State],
+    ) -> Optional[State]:
+        """Return the new state of an entity or None if it did not change."""
         new_state = str(new_state)
         attributes = attributes or {}
-        old_state = self._states.get(entity_id)
         if old_state is None:
             same_state = False
             same_attr = False
@@ -1167,14 +1417,12 @@ class StateMachine:
             last_changed = old_state.last_changed if same_state else None
 
         if same_state and same_attr:
-            return
+            return None
 
         if context is None:
             context = Context()
 
-        now = dt_util.utcnow()
-
-        state = State(
+        return State(
             entity_id,
             new_state,
             attributes,
@@ -1183,14 +1431,6 @@ class StateMachine:
             context,
             old_state is None,
         )
-        self._states[entity_id] = state
-        self._bus.async_fire(
-            EVENT_STATE_CHANGED,
-            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
-            EventOrigin.local,
-            context,
-            time_fired=now,
-        )
 
 
 class Service:
@@ -1524,6 +1764,9 @@ class Config:
         # If Home Assistant is running in safe mode
         self.safe_mode: bool = False
 
+        # If True, platforms supporting it are imported when first used
+        self.lazy_platforms: bool = False
+
         # Use legacy template behavior
         self.legacy_templates: bool = False
 
@@ -125,6 +125,10 @@ class EntityRegistry:
         self.hass = hass
         self.entities: Dict[str, RegistryEntry]
         self._index: Dict[Tuple[str, str, str], str] = {}
+        # Entity ids by device, area and config entry, in insertion order
+        self._device_index: Dict[str, Dict[str, None]] = {}
+        self._area_index: Dict[str, Dict[str, None]] = {}
+        self._config_entry_index: Dict[str, Dict[str, None]] = {}
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
         self.hass.bus.async_listen(
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
@@ -486,19 +490,14 @@ class EntityRegistry:
     @callback
     def async_clear_config_entry(self, config_entry: str) -> None:
         """Clear config entry from registry entries."""
-        for entity_id in [
-            entity_id
-            for entity_id, entry in self.entities.items()
-            if config_entry == entry.config_entry_id
-        ]:
+        for entity_id in list(self._config_entry_index.get(config_entry, ())):
             self.async_remove(entity_id)
 
     @callback
     def async_clear_area_id(self, area_id: str) -> None:
         """Clear area id from registry entries."""
-        for entity_id, entry in self.entities.items():
-            if area_id == entry.area_id:
-                self._async_update_entity(entity_id, area_id=None)  # type: ignore
+        for entity_id in list(self._area_index.get(area_id, ())):
+            self._async_update_entity(entity_id, area_id=None)  # type: ignore
 
     def _register_entry(self, entry: RegistryEntry) -> None:
         self.entities[entry.entity_id] = entry
@@ -506,6 +505,13 @@ class EntityRegistry:
 
     def _add_index(self, entry: RegistryEntry) -> None:
         self._index[(entry.domain, entry.platform, entry.unique_id)] = entry.entity_id
+        for index, key in (
+            (self._device_index, entry.device_id),
+            (self._area_index, entry.area_id),
+            (self._config_entry_index, entry.config_entry_id),
+        ):
+            if key is not None:
+                index.setdefault(key, {})[entry.entity_id] = None
 
     def _unregister_entry(self, entry: RegistryEntry) -> None:
         self._remove_index(entry)
@@ -513,9 +519,23 @@ class EntityRegistry:
 
     def _remove_index(self, entry: RegistryEntry) -> None:
         del self._index[(entry.domain, entry.platform, entry.unique_id)]
+        for index, key in (
+            (self._device_index, entry.device_id),
+            (self._area_index, entry.area_id),
+            (self._config_entry_index, entry.config_entry_id),
+        ):
+            if key is None:
+                continue
+            entity_ids = index[key]
+            del entity_ids[entry.entity_id]
+            if not entity_ids:
+                del index[key]
 
     def _rebuild_index(self) -> None:
         self._index = {}
+        self._device_index = {}
+        self._area_index = {}
+        self._config_entry_index = {}
         for entry in self.entities.values():
             self._add_index(entry)
 
@@ -533,8 +553,10 @@ def async_entries_for_device(
     registry: EntityRegistry, device_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a device."""
+    # pylint: disable=protected-access
     return [
-        entry for entry in registry.entities.values() if entry.device_id == device_id
+        registry.entities[entity_id]
+        for entity_id in registry._device_index.get(device_id, ())
     ]
 
 
@@ -543,7 +565,11 @@ def async_entries_for_area(
     registry: EntityRegistry, area_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match an area."""
-    return [entry for entry in registry.entities.values() if entry.area_id == area_id]
+    # pylint: disable=protected-access
+    return [
+        registry.entities[entity_id]
+        for entity_id in registry._area_index.get(area_id, ())
+    ]
 
 
 @callback
@@ -551,10 +577,10 @@ def async_entries_for_config_entry(
     registry: EntityRegistry, config_entry_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a config entry."""
+    # pylint: disable=protected-access
     return [
-        entry
-        for entry in registry.entities.values()
-        if entry.config_entry_id == config_entry_id
+        registry.entities[entity_id]
+        for entity_id in registry._config_entry_index.get(config_entry_id, ())
     ]
 
 
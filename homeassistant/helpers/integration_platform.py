@@ -1,56 +1,124 @@
 """Helpers to help with integration platforms."""
 import asyncio
 import logging
-from typing import Any, Awaitable, Callable
+from typing import Any, Awaitable, Callable, Set
 
-from homeassistant.core import Event, HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.loader import async_get_integration, bind_hass
 from homeassistant.setup import ATTR_COMPONENT, EVENT_COMPONENT_LOADED
 
 _LOGGER = logging.getLogger(__name__)
 
+DATA_DEFERRED_PLATFORMS = "integration_platforms_deferred"
+
+# Any = platform.
+ProcessPlatformType = Callable[[HomeAssistant, str, Any], Awaitable[None]]
+
+
+class _DeferredPlatforms:
+    """Integrations whose platform is processed on first use."""
+
+    def __init__(self, process_platform: ProcessPlatformType, pending: Set[str]):
+        """Initialize the deferred platforms."""
+        self.process_platform = process_platform
+        self.pending = pending
+        self.lock = asyncio.Lock()
+
+
+async def _async_process_platform(
+    hass: HomeAssistant,
+    platform_name: str,
+    process_platform: ProcessPlatformType,
+    component_name: str,
+) -> None:
+    """Process the platform of a component."""
+    if "." in component_name:
+        return
+
+    integration = await async_get_integration(hass, component_name)
+
+    try:
+        platform = integration.get_platform(platform_name)
+    except ImportError as err:
+        if f"{component_name}.{platform_name}" not in str(err):
+            _LOGGER.exception(
+                "Unexpected error importing %s/%s.py",
+                component_name,
+                platform_name,
+            )
+        return
+
+    try:
+        await process_platform(hass, component_name, platform)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception(
+            "Error processing platform %s.%s", component_name, platform_name
+        )
+
 
 @bind_hass
 async def async_process_integration_platforms(
     hass: HomeAssistant,
     platform_name: str,
-    # Any = platform.
-    process_platform: Callable[[HomeAssistant, str, Any], Awaitable[None]],
+    process_platform: ProcessPlatformType,
+    *,
+    deferrable: bool = False,
 ) -> None:
-    """Process a specific platform for all current and future loaded integrations."""
+    """Process a specific platform for all current and future loaded integrations.
 
-    async def _process(component_name: str) -> None:
-        """Process the intents of a component."""
-        if "." in component_name:
-            return
+    When platforms are imported lazily, deferrable platforms are only
+    processed by async_ensure_integration_platforms, which their consumer
+    must call before using them.
+    """
+    if deferrable and hass.config.lazy_platforms:
+        deferred = _DeferredPlatforms(process_platform, set(hass.config.components))
+        hass.data.setdefault(DATA_DEFERRED_PLATFORMS, {})[platform_name] = deferred
 
-        integration = await async_get_integration(hass, component_name)
+        @callback
+        def async_component_deferred(event: Event) -> None:
+            """Defer processing the platform of a new component."""
+            deferred.pending.add(event.data[ATTR_COMPONENT])
 
-        try:
-            platform = integration.get_platform(platform_name)
-        except ImportError as err:
-            if f"{component_name}.{platform_name}" not in str(err):
-                _LOGGER.exception(
-                    "Unexpected error importing %s/%s.py",
-                    component_name,
-                    platform_name,
-                )
-            return
-
-        try:
-            await process_platform(hass, component_name, platform)
-        except Exception:  # pylint: disable=broad-except
-            _LOGGER.exception(
-                "Error processing platform %s.%s", component_name, platform_name
-            )
+        hass.bus.async_listen(EVENT_COMPONENT_LOADED, async_component_deferred)
+        return
 
     async def async_component_loaded(event: Event) -> None:
         """Handle a new component loaded."""
-        await _process(event.data[ATTR_COMPONENT])
+        await _async_process_platform(
+            hass, platform_name, process_platform, event.data[ATTR_COMPONENT]
+        )
 
     hass.bus.async_listen(EVENT_COMPONENT_LOADED, async_component_loaded)
 
-    tasks = [_process(comp) for comp in hass.config.components]
+    tasks = [
+        _async_process_platform(hass, platform_name, process_platform, comp)
+        for comp in hass.config.components
+    ]
 
     if tasks:
         await asyncio.gather(*tasks)
+
+
+@bind_hass
+async def async_ensure_integration_platforms(
+    hass: HomeAssistant, platform_name: str
+) -> None:
+    """Process the deferred platforms of the integrations loaded so far."""
+    deferred = hass.data.get(DATA_DEFERRED_PLATFORMS, {}).get(platform_name)
+    if deferred is None:
+        return
+
+    # Callers wait for the platforms processed by a concurrent caller
+    async with deferred.lock:
+        if not deferred.pending:
+            return
+        components = list(deferred.pending)
+        deferred.pending.clear()
+        await asyncio.gather(
+            *(
+                _async_process_platform(
+                    hass, platform_name, deferred.process_platform, comp
+                )
+                for comp in components
+            )
+        )
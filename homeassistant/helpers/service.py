@@ -8,6 +8,7 @@ from typing import (
     Awaitable,
     Callable,
     Dict,
+    FrozenSet,
     Iterable,
     List,
     Optional,
@@ -26,6 +27,7 @@ from homeassistant.const import (
     CONF_SERVICE_TEMPLATE,
     ENTITY_MATCH_ALL,
     ENTITY_MATCH_NONE,
+    EVENT_STATE_CHANGED,
 )
 import homeassistant.core as ha
 from homeassistant.exceptions import (
@@ -35,7 +37,10 @@ from homeassistant.exceptions import (
     UnknownUser,
 )
 from homeassistant.helpers import template
+from homeassistant.helpers.area_registry import EVENT_AREA_REGISTRY_UPDATED
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.helpers.template import Template
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType, TemplateVarsType
 from homeassistant.loader import (
@@ -60,6 +65,11 @@ CONF_SERVICE_DATA_TEMPLATE = "data_template"
 _LOGGER = logging.getLogger(__name__)
 
 SERVICE_DESCRIPTION_CACHE = "service_description_cache"
+SERVICE_TARGET_CACHE = "service_target_cache"
+# Resolved targets kept before the cache is reset
+SERVICE_TARGET_CACHE_SIZE = 1024
+
+GROUP_DOMAIN = "group"
 
 
 @bind_hass
@@ -222,6 +232,13 @@ async def async_extract_entity_ids(
     ):
         return extracted
 
+    cache = _async_get_target_cache(hass)
+    key = _target_cache_key(entity_ids, area_ids, expand_group)
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return set(cached)
+
     if entity_ids and entity_ids != ENTITY_MATCH_NONE:
         # Entity ID attr can be a list or a string
         if isinstance(entity_ids, str):
@@ -265,9 +282,70 @@ async def async_extract_entity_ids(
             if not entry.area_id
         )
 
+    # The cache is replaced when targets change while resolving them
+    if key is not None and hass.data[SERVICE_TARGET_CACHE] is cache:
+        if len(cache) >= SERVICE_TARGET_CACHE_SIZE:
+            cache = hass.data[SERVICE_TARGET_CACHE] = {}
+        cache[key] = frozenset(extracted)
+
     return extracted
 
 
+def _target_cache_key(
+    entity_ids: Any, area_ids: Any, expand_group: bool
+) -> Optional[Tuple[Any, ...]]:
+    """Return the key of targets in the cache, None if they can't be cached."""
+    key = tuple(
+        tuple(ids) if isinstance(ids, list) else ids for ids in (entity_ids, area_ids)
+    ) + (expand_group,)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@ha.callback
+def _async_get_target_cache(
+    hass: HomeAssistantType,
+) -> Dict[Tuple[Any, ...], FrozenSet[str]]:
+    """Return the resolved targets, reset when registries or groups change."""
+    cache: Optional[Dict[Tuple[Any, ...], FrozenSet[str]]] = hass.data.get(
+        SERVICE_TARGET_CACHE
+    )
+    if cache is not None:
+        return cache
+
+    @ha.callback
+    def reset_cache(event: ha.Event) -> None:
+        """Reset the cache when areas, devices or entities change."""
+        hass.data[SERVICE_TARGET_CACHE] = {}
+
+    @ha.callback
+    def group_changed(event: ha.Event) -> None:
+        """Reset the cache when the members of a group change."""
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if (
+            old_state is None
+            or new_state is None
+            or old_state.attributes.get(ATTR_ENTITY_ID)
+            != new_state.attributes.get(ATTR_ENTITY_ID)
+        ):
+            reset_cache(event)
+
+    for event_type in (
+        EVENT_AREA_REGISTRY_UPDATED,
+        EVENT_DEVICE_REGISTRY_UPDATED,
+        EVENT_ENTITY_REGISTRY_UPDATED,
+    ):
+        hass.bus.async_listen(event_type, reset_cache)
+    hass.bus.async_listen_domain(EVENT_STATE_CHANGED, GROUP_DOMAIN, group_changed)
+
+    cache = hass.data[SERVICE_TARGET_CACHE] = {}
+    return cache
+
+
 def _load_services_file(hass: HomeAssistantType, integration: Integration) -> JSON_TYPE:
     """Load services file for an integration."""
     try:
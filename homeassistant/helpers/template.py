@@ -2,6 +2,7 @@
 from ast import literal_eval
 import asyncio
 import base64
+from collections import OrderedDict
 import collections.abc
 from datetime import datetime, timedelta
 from functools import partial, wraps
@@ -11,9 +12,9 @@ import math
 from operator import attrgetter
 import random
 import re
-from typing import Any, Dict, Generator, Iterable, Optional, Type, Union
+import threading
+from typing import Any, Callable, Dict, Generator, Iterable, Optional, Type, Union
 from urllib.parse import urlencode as urllib_urlencode
-import weakref
 
 import jinja2
 from jinja2 import contextfilter, contextfunction
@@ -51,6 +52,12 @@ _ENVIRONMENT = "template.environment"
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{|\{#")
 # Match "simple" ints and floats. -1.0, 1, +5, 5.0
 _IS_NUMERIC = re.compile(r"^[+-]?\d*(?:\.\d*)?$")
+# Results starting with anything else than these characters or words
+# can only be strings, literal_eval is not needed to parse them
+_NUMBER_FIRST_CHARS = frozenset("+-.0123456789")
+_LITERAL_FIRST_CHARS = frozenset("([{'\"\\#")
+_RE_LITERAL_FIRST_WORD = re.compile(r"True|False|None|set\(|[bBfFrRuU]{1,2}['\"]")
+_CONSTANTS = {"True": True, "False": False, "None": None}
 
 _RESERVED_NAMES = {"contextfunction", "evalcontextfunction", "environmentfunction"}
 
@@ -67,6 +74,9 @@ _COLLECTABLE_STATE_ATTRIBUTES = {
     "name",
 }
 
+# Number of compiled templates shared between all Template instances
+COMPILE_CACHE_SIZE = 1024
+
 ALL_STATES_RATE_LIMIT = timedelta(minutes=1)
 DOMAIN_STATES_RATE_LIMIT = timedelta(seconds=1)
 
@@ -269,6 +279,94 @@ class RenderInfo:
             self.filter = _false
 
 
+def _parse_number(render_result: str) -> Any:
+    """Parse a result matching _IS_NUMERIC like literal_eval does."""
+    try:
+        if "." in render_result:
+            return float(render_result)
+        digits = render_result.lstrip("+-")
+        if digits[:1] == "0" and digits.strip("0"):
+            # Leading zeros are not valid in ints
+            return render_result
+        return int(render_result)
+    except ValueError:
+        return render_result
+
+
+def _literal_eval_result(render_result: str) -> Any:
+    """Parse a result with literal_eval."""
+    try:
+        result = literal_eval(render_result)
+
+        if type(result) in RESULT_WRAPPERS:
+            result = RESULT_WRAPPERS[type(result)](result, render_result=render_result)
+
+        # If the literal_eval result is a string, use the original
+        # render, by not returning right here. The evaluation of strings
+        # resulting in strings impacts quotes, to avoid unexpected
+        # output; use the original render instead of the evaluated one.
+        # Complex and scientific values are also unexpected. Filter them out.
+        if (
+            # Filter out string and complex numbers
+            not isinstance(result, (str, complex))
+            and (
+                # Pass if not numeric and not a boolean
+                not isinstance(result, (int, float))
+                # Or it's a boolean (inherit from int)
+                or isinstance(result, bool)
+                # Or if it's a digit
+                or _IS_NUMERIC.match(render_result) is not None
+            )
+        ):
+            return result
+    except (ValueError, TypeError, SyntaxError, MemoryError):
+        pass
+
+    return render_result
+
+
+class CompileCache:
+    """Bounded LRU of compiled template code shared by all environments.
+
+    Identical template sources are compiled once per kind of environment,
+    also when the templates are recreated on a reload.
+    """
+
+    def __init__(self, size: int = COMPILE_CACHE_SIZE):
+        """Initialize the cache."""
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._codes: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, compile_source: Callable[[], Any]) -> Any:
+        """Return the compiled code of key, compiling it on a miss."""
+        with self._lock:
+            code = self._codes.get(key)
+            if code is not None:
+                self._codes.move_to_end(key)
+                self.hits += 1
+                return code
+            self.misses += 1
+
+        code = compile_source()
+
+        with self._lock:
+            self._codes[key] = code
+            if len(self._codes) > self.size:
+                self._codes.popitem(last=False)
+        return code
+
+    def clear(self) -> None:
+        """Remove all compiled code from the cache."""
+        with self._lock:
+            self._codes.clear()
+
+
+_COMPILE_CACHE = CompileCache()
+
+
 class Template:
     """Class to hold a template and manage caching and rendering."""
 
@@ -362,37 +460,31 @@ class Template:
         return self._parse_result(render_result)
 
     def _parse_result(self, render_result: str) -> Any:  # pylint: disable=no-self-use
-        """Parse the result."""
-        try:
-            result = literal_eval(render_result)
+        """Parse the result.
 
-            if type(result) in RESULT_WRAPPERS:
-                result = RESULT_WRAPPERS[type(result)](
-                    result, render_result=render_result
-                )
+        Numbers, booleans, None and plain strings are recognized directly,
+        literal_eval is only used for results which may be collections.
+        """
+        if render_result in _CONSTANTS:
+            return _CONSTANTS[render_result]
+        if not render_result:
+            return render_result
 
-            # If the literal_eval result is a string, use the original
-            # render, by not returning right here. The evaluation of strings
-            # resulting in strings impacts quotes, to avoid unexpected
-            # output; use the original render instead of the evaluated one.
-            # Complex and scientific values are also unexpected. Filter them out.
-            if (
-                # Filter out string and complex numbers
-                not isinstance(result, (str, complex))
-                and (
-                    # Pass if not numeric and not a boolean
-                    not isinstance(result, (int, float))
-                    # Or it's a boolean (inherit from int)
-                    or isinstance(result, bool)
-                    # Or if it's a digit
-                    or _IS_NUMERIC.match(render_result) is not None
-                )
-            ):
-                return result
-        except (ValueError, TypeError, SyntaxError, MemoryError):
-            pass
+        first = render_result[0]
+        if first in _NUMBER_FIRST_CHARS:
+            if render_result.isascii() and _IS_NUMERIC.match(render_result):
+                return _parse_number(render_result)
+            if first != "." and "," not in render_result:
+                # Not a tuple, any number found by literal_eval
+                # would not be simple and not be used either
+                return render_result
+        elif (
+            first not in _LITERAL_FIRST_CHARS
+            and _RE_LITERAL_FIRST_WORD.match(render_result) is None
+        ):
+            return render_result
 
-        return render_result
+        return _literal_eval_result(render_result)
 
     async def async_render_will_timeout(
         self, timeout: float, variables: TemplateVarsType = None, **kwargs: Any
@@ -485,11 +577,12 @@ class Template:
 
     @callback
     def async_render_with_possible_json_value(
-        self, value, error_value=_SENTINEL, variables=None
+        self, value, error_value=_SENTINEL, variables=None, parse_json=json.loads
     ):
         """Render template with value exposed.
 
-        If valid JSON will expose value_json too.
+        If valid JSON will expose value_json too. A caller holding an already
+        parsed value can pass parse_json to reuse it.
 
         This method must be run in the event loop.
         """
@@ -503,7 +596,7 @@ class Template:
         variables["value"] = value
 
         try:
-            variables["value_json"] = json.loads(value)
+            variables["value_json"] = parse_json(value)
         except (ValueError, TypeError):
             pass
 
@@ -1296,7 +1389,6 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         """Initialise template environment."""
         super().__init__()
         self.hass = hass
-        self.template_cache = weakref.WeakValueDictionary()
         self.filters["round"] = forgiving_round
         self.filters["multiply"] = multiply
         self.filters["log"] = logarithm
@@ -1403,12 +1495,11 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
             # any instance of this.
             return super().compile(source, name, filename, raw, defer_init)
 
-        cached = self.template_cache.get(source)
-
-        if cached is None:
-            cached = self.template_cache[source] = super().compile(source)
-
-        return cached
+        # Environments without hass have less filters and tests, which
+        # are checked when compiling
+        return _COMPILE_CACHE.get(
+            (type(self), self.hass is None, source), partial(super().compile, source)
+        )
 
 
 _NO_HASS_ENV = TemplateEnvironment(None)
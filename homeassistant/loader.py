@@ -9,8 +9,10 @@ import functools as ft
 import importlib
 import json
 import logging
+import os
 import pathlib
 import sys
+from timeit import default_timer as timer
 from types import ModuleType
 from typing import (
     TYPE_CHECKING,
@@ -25,6 +27,8 @@ from typing import (
     cast,
 )
 
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.generated.manifests import MANIFESTS
 from homeassistant.generated.mqtt import MQTT
 from homeassistant.generated.ssdp import SSDP
 from homeassistant.generated.zeroconf import HOMEKIT, ZEROCONF
@@ -32,6 +36,7 @@ from homeassistant.generated.zeroconf import HOMEKIT, ZEROCONF
 # Typing imports that create a circular dependency
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.storage import Store
 
 CALLABLE_T = TypeVar("CALLABLE_T", bound=Callable)  # pylint: disable=invalid-name
 
@@ -40,6 +45,7 @@ _LOGGER = logging.getLogger(__name__)
 DATA_COMPONENTS = "components"
 DATA_INTEGRATIONS = "integrations"
 DATA_CUSTOM_COMPONENTS = "custom_components"
+DATA_IMPORT_TIME = "import_time"
 PACKAGE_CUSTOM_COMPONENTS = "custom_components"
 PACKAGE_BUILTIN = "homeassistant.components"
 CUSTOM_WARNING = (
@@ -52,6 +58,10 @@ _UNDEF = object()
 
 MAX_LOAD_CONCURRENTLY = 4
 
+STORAGE_KEY_CUSTOM_COMPONENTS = "core.custom_components"
+STORAGE_VERSION_CUSTOM_COMPONENTS = 1
+CUSTOM_COMPONENTS_SAVE_DELAY = 10
+
 
 def manifest_from_legacy_module(domain: str, module: ModuleType) -> Dict:
     """Generate a manifest from a legacy module."""
@@ -77,33 +87,119 @@ async def _async_get_custom_components(
     except ImportError:
         return {}
 
-    def get_sub_directories(paths: List[str]) -> List[pathlib.Path]:
-        """Return all sub directories in a set of paths."""
-        return [
-            entry
-            for path in paths
-            for entry in pathlib.Path(path).iterdir()
-            if entry.is_dir()
-        ]
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.storage import Store
 
-    dirs = await hass.async_add_executor_job(
-        get_sub_directories, custom_components.__path__
+    store = Store(
+        hass,
+        STORAGE_VERSION_CUSTOM_COMPONENTS,
+        STORAGE_KEY_CUSTOM_COMPONENTS,
+        private=True,
+    )
+    cache = await store.async_load() or {}
+    scan = await hass.async_add_executor_job(
+        _scan_custom_manifests, list(custom_components.__path__), cache
     )
+    if scan != cache:
+        _async_save_once_started(hass, store, scan)
 
-    integrations = await asyncio.gather(
-        *(
-            hass.async_add_executor_job(
-                Integration.resolve_from_root, hass, custom_components, comp.name
-            )
-            for comp in dirs
+    integrations: Dict[str, Integration] = {}
+    found: Set[str] = set()
+
+    for manifest_path, entry in scan["manifests"].items():
+        path = pathlib.Path(manifest_path).parent
+        # The first path providing a directory wins, like for imports
+        if path.name in found:
+            continue
+        found.add(path.name)
+        integration = Integration(
+            hass,
+            f"{custom_components.__name__}.{path.name}",
+            path,
+            dict(entry["manifest"]),
         )
-    )
+        integrations[integration.domain] = integration
 
-    return {
-        integration.domain: integration
-        for integration in integrations
-        if integration is not None
-    }
+    return integrations
+
+
+def _async_save_once_started(
+    hass: "HomeAssistant", store: "Store", data: Dict[str, Any]
+) -> None:
+    """Save data once Home Assistant started.
+
+    Instances that never start, like the one checking the configuration,
+    do not write to the configuration directory.
+    """
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.core import CoreState, Event, callback
+
+    @callback
+    def async_save(_: Optional[Event] = None) -> None:
+        """Schedule saving the data."""
+        store.async_delay_save(lambda: data, CUSTOM_COMPONENTS_SAVE_DELAY)
+
+    if hass.state == CoreState.running:
+        async_save()
+    else:
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, async_save)
+
+
+def _scan_custom_manifests(paths: List[str], cache: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the manifests of the custom integrations found in paths.
+
+    The directories of a path are only listed again when the modification
+    time of the path changed. Editing a manifest in place does not change
+    the modification time of its directory, so a manifest is only parsed
+    again when its own modification time changed.
+    """
+    cached_paths = cache.get("paths", {})
+    cached_manifests = cache.get("manifests", {})
+    scan: Dict[str, Any] = {"paths": {}, "manifests": {}}
+
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        cached = cached_paths.get(path)
+        if cached is not None and cached["mtime"] == mtime:
+            names = cached["names"]
+        else:
+            with os.scandir(path) as entries:
+                names = sorted(entry.name for entry in entries if entry.is_dir())
+        scan["paths"][path] = {"mtime": mtime, "names": names}
+
+        for name in names:
+            manifest_path = os.path.join(path, name, "manifest.json")
+            try:
+                manifest_mtime = os.stat(manifest_path).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = cached_manifests.get(manifest_path)
+            if cached is not None and cached["mtime"] == manifest_mtime:
+                manifest = cached["manifest"]
+            else:
+                manifest = _read_manifest(pathlib.Path(manifest_path))
+                if manifest is None:
+                    continue
+            scan["manifests"][manifest_path] = {
+                "mtime": manifest_mtime,
+                "manifest": manifest,
+            }
+
+    return scan
+
+
+def _read_manifest(manifest_path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """Read a manifest, return None if it is not valid JSON."""
+    try:
+        return cast(Dict[str, Any], json.loads(manifest_path.read_text()))
+    except ValueError as err:
+        _LOGGER.error("Error parsing manifest.json file at %s: %s", manifest_path, err)
+        return None
 
 
 async def async_get_custom_components(
@@ -234,12 +330,8 @@ class Integration:
             if not manifest_path.is_file():
                 continue
 
-            try:
-                manifest = json.loads(manifest_path.read_text())
-            except ValueError as err:
-                _LOGGER.error(
-                    "Error parsing manifest.json file at %s: %s", manifest_path, err
-                )
+            manifest = _read_manifest(manifest_path)
+            if manifest is None:
                 continue
 
             return cls(
@@ -248,6 +340,22 @@ class Integration:
 
         return None
 
+    @classmethod
+    def resolve_built_in(
+        cls, hass: "HomeAssistant", root_module: ModuleType, domain: str
+    ) -> "Optional[Integration]":
+        """Resolve a built-in integration from the generated manifest index."""
+        manifest = MANIFESTS.get(domain)
+        if manifest is None:
+            return None
+
+        return cls(
+            hass,
+            f"{root_module.__name__}.{domain}",
+            pathlib.Path(root_module.__path__[0]) / domain,  # type: ignore
+            dict(cast(Dict[str, Any], manifest)),
+        )
+
     @classmethod
     def resolve_legacy(
         cls, hass: "HomeAssistant", domain: str
@@ -413,7 +521,7 @@ class Integration:
         """Return the component."""
         cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
         if self.domain not in cache:
-            cache[self.domain] = importlib.import_module(self.pkg_path)
+            cache[self.domain] = self._import(self.domain, self.pkg_path)
         return cache[self.domain]  # type: ignore
 
     def get_platform(self, platform_name: str) -> ModuleType:
@@ -426,7 +534,16 @@ class Integration:
 
     def _import_platform(self, platform_name: str) -> ModuleType:
         """Import the platform."""
-        return importlib.import_module(f"{self.pkg_path}.{platform_name}")
+        return self._import(
+            f"{self.domain}.{platform_name}", f"{self.pkg_path}.{platform_name}"
+        )
+
+    def _import(self, name: str, module_path: str) -> ModuleType:
+        """Import a module of the integration, recording how long it took."""
+        start = timer()
+        module = importlib.import_module(module_path)
+        self.hass.data.setdefault(DATA_IMPORT_TIME, {})[name] = timer() - start
+        return module
 
     def __repr__(self) -> str:
         """Text representation of class."""
@@ -469,9 +586,12 @@ async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integrati
 
     from homeassistant import components  # pylint: disable=import-outside-toplevel
 
-    integration = await hass.async_add_executor_job(
-        Integration.resolve_from_root, hass, components, domain
-    )
+    integration = Integration.resolve_built_in(hass, components, domain)
+    if integration is None:
+        # Integrations added since the manifest index was generated
+        integration = await hass.async_add_executor_job(
+            Integration.resolve_from_root, hass, components, domain
+        )
 
     if integration is not None:
         cache[domain] = integration
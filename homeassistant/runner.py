@@ -30,6 +30,7 @@ class RuntimeConfig:
     config_dir: str
     skip_pip: bool = False
     safe_mode: bool = False
+    lazy_platforms: bool = False
 
     verbose: bool = False
 
@@ -197,7 +197,7 @@ def check(config_dir, secrets=False):
 
     if secrets:
         # Ensure !secrets point to the patched function
-        yaml_loader.yaml.SafeLoader.add_constructor("!secret", yaml_loader.secret_yaml)
+        yaml_loader.SafeLoader.add_constructor("!secret", yaml_loader.secret_yaml)
 
     try:
         res["components"] = asyncio.run(async_check_config(config_dir))
@@ -217,9 +217,7 @@ def check(config_dir, secrets=False):
             pat.stop()
         if secrets:
             # Ensure !secrets point to the original function
-            yaml_loader.yaml.SafeLoader.add_constructor(
-                "!secret", yaml_loader.secret_yaml
-            )
+            yaml_loader.SafeLoader.add_constructor("!secret", yaml_loader.secret_yaml)
         bootstrap.clear_secret_cache()
 
     return res
@@ -20,6 +20,7 @@ DATA_SETUP_DONE = "setup_done"
 DATA_SETUP_STARTED = "setup_started"
 DATA_SETUP = "setup_tasks"
 DATA_DEPS_REQS = "deps_reqs_processed"
+DATA_SETUP_TIME = "setup_time"
 
 SLOW_SETUP_WARNING = 10
 SLOW_SETUP_MAX_WAIT = 300
@@ -230,6 +231,7 @@ async def _async_setup_component(
         if warn_task:
             warn_task.cancel()
     _LOGGER.info("Setup of domain %s took %.1f seconds", domain, end - start)
+    hass.data.setdefault(DATA_SETUP_TIME, {})[domain] = end - start
 
     if result is False:
         log_error("Integration failed to initialize.")
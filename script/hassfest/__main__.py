@@ -11,6 +11,7 @@ from . import (
     dependencies,
     json,
     manifest,
+    manifests,
     mqtt,
     requirements,
     services,
@@ -26,6 +27,7 @@ INTEGRATION_PLUGINS = [
     config_flow,
     dependencies,
     manifest,
+    manifests,
     mqtt,
     services,
     ssdp,
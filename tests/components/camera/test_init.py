@@ -6,7 +6,11 @@ import io
 import pytest
 
 from homeassistant.components import camera
-from homeassistant.components.camera.const import DOMAIN, PREF_PRELOAD_STREAM
+from homeassistant.components.camera.const import (
+    DOMAIN,
+    PREF_FRAME_CACHE_TTL,
+    PREF_PRELOAD_STREAM,
+)
 from homeassistant.components.camera.prefs import CameraEntityPreferences
 from homeassistant.components.websocket_api.const import TYPE_RESULT
 from homeassistant.config import async_process_ha_core_config
@@ -362,3 +366,74 @@ async def test_record_service(hass, mock_camera, mock_stream):
         # So long as we call stream.record, the rest should be covered
         # by those tests.
         assert mock_record_service.called
+
+
+async def test_concurrent_image_requests_share_fetch(hass, image_mock_url):
+    """Test concurrent image requests fetch the image from the camera once."""
+    release = asyncio.Event()
+
+    async def camera_image():
+        await release.wait()
+        return b"Test"
+
+    with patch(
+        "homeassistant.components.demo.camera.DemoCamera.async_camera_image",
+        side_effect=camera_image,
+    ) as mock_camera_image:
+        requests = asyncio.gather(
+            *(camera.async_get_image(hass, "camera.demo_camera") for _ in range(3))
+        )
+        await asyncio.sleep(0)
+        release.set()
+        images = await requests
+
+    assert mock_camera_image.call_count == 1
+    assert [image.content for image in images] == [b"Test"] * 3
+
+
+async def test_image_cached_for_frame_cache_ttl(hass, image_mock_url):
+    """Test the last image is reused for the frame cache TTL."""
+    with patch(
+        "homeassistant.components.demo.camera.DemoCamera.async_camera_image",
+        return_value=b"Test",
+    ) as mock_camera_image:
+        await camera.async_get_image(hass, "camera.demo_camera")
+        await camera.async_get_image(hass, "camera.demo_camera")
+        assert mock_camera_image.call_count == 2
+
+        common.mock_camera_prefs(hass, "camera.demo_camera", {PREF_FRAME_CACHE_TTL: 60})
+        await camera.async_get_image(hass, "camera.demo_camera")
+        await camera.async_get_image(hass, "camera.demo_camera")
+        assert mock_camera_image.call_count == 2
+
+
+async def test_frame_stream_shared_between_subscribers(hass, image_mock_url):
+    """Test MJPEG subscribers share one stream and slow ones skip frames."""
+    demo_camera = hass.data[camera.DOMAIN].get_entity("camera.demo_camera")
+    broker = demo_camera.frame_broker
+    frames = iter([b"1", b"2", b"3", None])
+
+    async def camera_image():
+        return next(frames)
+
+    with patch(
+        "homeassistant.components.demo.camera.DemoCamera.async_camera_image",
+        side_effect=camera_image,
+    ) as mock_camera_image:
+        fast = broker.async_subscribe(0)
+        slow = broker.async_subscribe(0)
+
+        assert await fast.get() == b"1"
+        assert await fast.get() == b"2"
+        assert await fast.get() == b"3"
+        assert await fast.get() is None
+
+        # The slow subscriber skipped the frames it did not take in time
+        assert await slow.get() is None
+        assert slow.dropped == 3
+
+        broker.async_unsubscribe(0, fast)
+        broker.async_unsubscribe(0, slow)
+
+    assert mock_camera_image.call_count == 4
+    assert not broker._streams
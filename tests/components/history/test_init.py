@@ -1,12 +1,15 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
+from collections import namedtuple
 from copy import copy
+from functools import partial
 from datetime import timedelta
 import json
 import unittest
 
 from homeassistant.components import history, recorder
 from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.statistics import compile_statistics
 import homeassistant.core as ha
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component, setup_component
@@ -1008,3 +1011,137 @@ async def test_entity_ids_limit_via_api_with_skip_initial_state(hass, hass_clien
     assert len(response_json) == 2
     assert response_json[0][0]["entity_id"] == "light.kitchen"
     assert response_json[1][0]["entity_id"] == "light.cow"
+
+
+async def test_fetch_period_api_with_resolution(hass, hass_client):
+    """Test the fetch period view returns compiled statistics."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+    hass.states.async_set("sensor.temperature", "10")
+    hass.states.async_set("sensor.humidity", "50")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    now = dt_util.utcnow()
+    start = now.replace(minute=now.minute - now.minute % 5, second=0, microsecond=0)
+    await hass.async_add_executor_job(compile_statistics, instance, start)
+
+    client = await hass_client()
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}?resolution=5minute&filter_entity_id=sensor.temperature"
+    )
+    assert response.status == 200
+    response_json = await response.json()
+    assert len(response_json) == 1
+    assert response_json[0][0]["entity_id"] == "sensor.temperature"
+    assert response_json[0][0]["mean"] == 10
+    assert response_json[0][0]["start"] == start.isoformat()
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}?resolution=day"
+    )
+    assert response.status == 400
+
+
+async def test_fetch_period_api_streams_significant_states(hass, hass_client):
+    """Test the streamed response matches get_significant_states."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+    start = dt_util.utcnow() - timedelta(minutes=1)
+    for value in ("1", "2", "2", "3"):
+        hass.states.async_set("sensor.power", value, {"value": value})
+        hass.states.async_set("climate.living_room", value, {"value": value})
+    hass.states.async_set("light.kitchen", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    client = await hass_client()
+    for query in ("", "?minimal_response", "?significant_changes_only=0"):
+        response = await client.get(f"/api/history/period/{start.isoformat()}{query}")
+        assert response.status == 200
+        streamed = await response.json()
+        assert len(streamed) == 3
+
+        expected = await hass.async_add_executor_job(
+            partial(
+                history.get_significant_states,
+                hass,
+                start,
+                minimal_response=query == "?minimal_response",
+                significant_changes_only=query != "?significant_changes_only=0",
+            )
+        )
+        expected = json.loads(json.dumps(list(expected.values()), cls=JSONEncoder))
+        assert sorted(streamed, key=lambda states: states[0]["entity_id"]) == sorted(
+            expected, key=lambda states: states[0]["entity_id"]
+        )
+
+
+def test_downsample_states():
+    """Test numeric states are downsampled to the minimum and maximum per bucket."""
+    row = namedtuple("Row", ["entity_id", "state", "last_updated"])
+    start = dt_util.utcnow()
+    end = start + timedelta(minutes=4)
+    rows = [
+        row("sensor.power", value, start + timedelta(seconds=30 * index))
+        for index, value in enumerate(("5", "9", "1", "4", "7", "2", "unavailable"))
+    ] + [row("sensor.power", "6", start + timedelta(minutes=3, seconds=30))]
+    rows += [row("switch.fan", "on", start), row("switch.fan", "off", end)]
+
+    result = list(history._downsample_states(rows, start, end, 4))
+
+    # Bucket 1 keeps 9 and 1, bucket 2 keeps 7 and 2, the non numeric
+    # state and the last numeric state are always kept
+    assert [state.state for state in result if state.entity_id == "sensor.power"] == [
+        "9",
+        "1",
+        "7",
+        "2",
+        "unavailable",
+        "6",
+    ]
+    assert [state.state for state in result if state.entity_id == "switch.fan"] == [
+        "on",
+        "off",
+    ]
+
+
+async def test_fetch_period_api_with_max_points(hass, hass_client):
+    """Test the fetch period view downsamples numeric states."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+    start = dt_util.utcnow() - timedelta(minutes=1)
+    for value in range(100):
+        hass.states.async_set("sensor.power", str(value))
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    client = await hass_client()
+    end = dt_util.utcnow() + timedelta(minutes=1)
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={"end_time": end.isoformat(), "max_points": 10},
+    )
+    assert response.status == 200
+    response_json = await response.json()
+    states = [state["state"] for state in response_json[0]]
+    assert len(states) <= 10
+    assert "0" in states
+    assert states[-1] == "99"
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}", params={"max_points": "one"}
+    )
+    assert response.status == 400
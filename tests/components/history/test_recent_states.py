@@ -0,0 +1,111 @@
+"""The tests for the recent states of the History component."""
+# pylint: disable=protected-access
+from datetime import timedelta
+
+from homeassistant.components import history, recorder
+from homeassistant.components.history.recent_states import RecentStates
+from homeassistant.setup import async_setup_component
+import homeassistant.util.dt as dt_util
+
+from tests.common import init_recorder_component
+from tests.components.recorder.common import trigger_db_commit
+
+
+async def _async_setup_history(hass):
+    """Set up the recorder and history and return the recent states."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    return hass.data[history.DATA_RECENT_STATES]
+
+
+async def _async_wait_recording_done(hass):
+    """Wait for the recorder to commit the states."""
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+
+async def test_significant_states_from_memory(hass):
+    """Test recent significant states are the same as the recorded ones."""
+    recent_states = await _async_setup_history(hass)
+    hass.states.async_set("sensor.power", "1", {"unit": "W"})
+    await hass.async_block_till_done()
+    start = dt_util.utcnow()
+    for value in ("2", "2", "3"):
+        hass.states.async_set("sensor.power", value, {"value": value})
+        hass.states.async_set("climate.living_room", value, {"value": value})
+    await _async_wait_recording_done(hass)
+
+    for minimal_response in (False, True):
+        for significant_changes_only in (False, True):
+            kwargs = {
+                "entity_ids": ["sensor.power", "climate.living_room"],
+                "minimal_response": minimal_response,
+                "significant_changes_only": significant_changes_only,
+            }
+            from_memory = await hass.async_add_executor_job(
+                lambda: history.get_significant_states(hass, start, **kwargs)
+            )
+            hass.data.pop(history.DATA_RECENT_STATES)
+            from_database = await hass.async_add_executor_job(
+                lambda: history.get_significant_states(hass, start, **kwargs)
+            )
+            hass.data[history.DATA_RECENT_STATES] = recent_states
+
+            assert list(from_memory) == list(from_database)
+            for entity_id, states in from_memory.items():
+                assert [_as_dict(state) for state in states] == [
+                    _as_dict(state) for state in from_database[entity_id]
+                ]
+
+    assert recent_states.hits == 4
+    assert recent_states.misses == 0
+
+
+async def test_older_periods_miss(hass):
+    """Test periods before the states in memory are read from the database."""
+    recent_states = await _async_setup_history(hass)
+    hass.states.async_set("sensor.power", "1")
+    await _async_wait_recording_done(hass)
+
+    start = dt_util.utcnow() - timedelta(hours=1)
+    result = await hass.async_add_executor_job(
+        lambda: history.get_significant_states(hass, start, entity_ids=["sensor.power"])
+    )
+    assert [state.state for state in result["sensor.power"]] == ["1"]
+    assert recent_states.hits == 0
+    assert recent_states.misses == 1
+
+
+async def test_eviction(hass):
+    """Test states are evicted by size and age."""
+    recent_states = RecentStates(hass, lambda entity_id: True, size=3)
+    recent_states.async_start()
+    start = dt_util.utcnow()
+    for value in range(5):
+        hass.states.async_set("sensor.power", str(value))
+    await hass.async_block_till_done()
+
+    assert recent_states.states_during_period(start, ["sensor.power"]) is None
+    last_updated = hass.states.get("sensor.power").last_updated
+    result = recent_states.states_during_period(
+        last_updated - timedelta(microseconds=1), ["sensor.power"]
+    )
+    start_state, states = result["sensor.power"]
+    assert start_state.state == "3"
+    assert [state.state for state in states] == ["4"]
+
+    recent_states.max_age = timedelta(0)
+    hass.states.async_set("sensor.power", "5")
+    await hass.async_block_till_done()
+    entity_states = recent_states._entities["sensor.power"]
+    assert [state.state for state in entity_states.states] == ["5"]
+    assert entity_states.covered_since == hass.states.get("sensor.power").last_updated
+
+
+def _as_dict(state):
+    """Return the state as dict without the context."""
+    state_dict = state if isinstance(state, dict) else state.as_dict()
+    return {key: value for key, value in state_dict.items() if key != "context"}
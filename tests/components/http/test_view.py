@@ -1,4 +1,8 @@
 """Tests for Home Assistant View."""
+import asyncio
+import threading
+
+from aiohttp import web
 from aiohttp.web_exceptions import (
     HTTPBadRequest,
     HTTPInternalServerError,
@@ -69,3 +73,78 @@ async def test_not_running(mock_request_with_stopping):
         Mock(requires_auth=False), AsyncMock(side_effect=Unauthorized)
     )(mock_request_with_stopping)
     assert response.status == 503
+
+
+async def test_json_stream(hass, aiohttp_client):
+    """Test streaming a JSON document in chunks."""
+
+    async def handler(request):
+        """Stream a large list."""
+
+        def fragments():
+            yield "["
+            for index in range(10000):
+                yield f"{',' if index else ''}{{\"index\": {index}}}"
+            yield "]"
+
+        return await HomeAssistantView.json_stream(request, fragments)
+
+    app = web.Application()
+    app["hass"] = hass
+    app.router.add_get("/", handler)
+    client = await aiohttp_client(app)
+
+    response = await client.get("/")
+    assert response.status == 200
+    assert response.content_type == "application/json"
+    assert await response.json() == [{"index": index} for index in range(10000)]
+
+
+async def test_json_stream_error_before_first_chunk(hass, aiohttp_client):
+    """Test an error before any chunk is sent results in an error response."""
+
+    async def handler(request):
+        """Fail while producing the document."""
+
+        def fragments():
+            yield "["
+            raise ValueError("Database gone")
+
+        return await HomeAssistantView.json_stream(request, fragments)
+
+    app = web.Application()
+    app["hass"] = hass
+    app.router.add_get("/", handler)
+    client = await aiohttp_client(app)
+
+    response = await client.get("/")
+    assert response.status == 500
+    assert await response.text() != "["
+
+
+async def test_json_stream_cancelled_before_first_chunk(hass):
+    """Test the producer is stopped when the request is cancelled early."""
+    started = threading.Event()
+    release = threading.Event()
+    produced = []
+
+    def fragments():
+        started.set()
+        release.wait()
+        for index in range(100):
+            produced.append(index)
+            yield "x" * 65536
+
+    request = Mock(app={"hass": hass})
+    task = hass.async_create_task(HomeAssistantView.json_stream(request, fragments))
+    await hass.async_add_executor_job(started.wait)
+    task.cancel()
+    # Let the handler start draining before the first chunk is produced
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await hass.async_block_till_done()
+    # The producer was unblocked and stopped instead of filling the queue
+    assert len(produced) < 100
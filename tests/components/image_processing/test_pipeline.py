@@ -0,0 +1,66 @@
+"""The tests for the image processing pipeline."""
+import asyncio
+import threading
+
+from homeassistant.components.image_processing.pipeline import ImageProcessingPipeline
+
+from tests.async_mock import AsyncMock, MagicMock, patch
+
+
+async def test_frame_shared_by_processors(hass):
+    """Test processors of a camera polled within a tick share one frame."""
+    pipeline = ImageProcessingPipeline(hass)
+
+    with patch(
+        "homeassistant.components.camera.async_get_image",
+        AsyncMock(return_value="image"),
+    ) as mock_get_image:
+        frames = await asyncio.gather(
+            pipeline.async_get_frame("camera.front", 10),
+            pipeline.async_get_frame("camera.front", 10),
+            pipeline.async_get_frame("camera.back", 10),
+        )
+        assert frames == ["image", "image", "image"]
+        assert await pipeline.async_get_frame("camera.front", 10) == "image"
+
+    assert mock_get_image.call_count == 2
+    assert pipeline.stats.fetch.count == 2
+    assert pipeline.stats.shared_frames == 2
+
+
+async def test_detection_skipped_when_busy(hass):
+    """Test a processor skips frames while its detection is running."""
+    pipeline = ImageProcessingPipeline(hass, max_workers=2)
+    entities = [MagicMock(entity_id=f"image_processing.test_{i}") for i in range(3)]
+    release = asyncio.Event()
+
+    async def detect(image):
+        await release.wait()
+
+    detections = [
+        hass.async_create_task(pipeline.async_detect(entities[0], detect, "image")),
+        hass.async_create_task(pipeline.async_detect(entities[1], detect, "image")),
+    ]
+    await asyncio.sleep(0)
+
+    # The entity is busy, then all workers are
+    assert not await pipeline.async_detect(entities[0], detect, "image")
+    assert not await pipeline.async_detect(entities[2], detect, "image")
+
+    release.set()
+    assert await asyncio.gather(*detections) == [True, True]
+    assert await pipeline.async_detect(entities[2], detect, "image")
+    assert pipeline.stats.detect.count == 3
+    assert pipeline.stats.detect.skipped == 2
+
+
+async def test_detection_job_on_pipeline_executor(hass):
+    """Test blocking detections run on the executor of the pipeline."""
+    pipeline = ImageProcessingPipeline(hass)
+
+    def detect(image):
+        return image, threading.current_thread().name
+
+    image, thread_name = await pipeline.async_add_detection_job(detect, "image")
+    assert image == "image"
+    assert thread_name.startswith("ImageProcessing")
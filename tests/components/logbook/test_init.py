@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import json
 
 import pytest
+from sqlalchemy.exc import SQLAlchemyError
 import voluptuous as vol
 
 from homeassistant.components import logbook, recorder
@@ -315,6 +316,45 @@ async def test_logbook_view(hass, hass_client):
     assert response.status == 200
 
 
+async def test_logbook_view_streams_entries(hass, hass_client):
+    """Test the logbook view streams the entries in several chunks."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for index in range(20):
+        hass.states.async_set("switch.test", STATE_ON if index % 2 else STATE_OFF)
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    start = dt_util.utcnow() - timedelta(hours=1)
+    with patch("homeassistant.components.http.view.JSON_STREAM_CHUNK_SIZE", 100):
+        response = await client.get(f"/api/logbook/{start.isoformat()}")
+    assert response.status == 200
+    response_json = await response.json()
+    # The first state of an entity is not logged
+    assert [entry["state"] for entry in response_json] == [
+        STATE_ON if index % 2 else STATE_OFF for index in range(1, 20)
+    ]
+
+
+async def test_logbook_view_error(hass, hass_client):
+    """Test an error while fetching the entries results in an error response."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    with patch(
+        "homeassistant.components.logbook._iter_events",
+        side_effect=SQLAlchemyError("Database gone"),
+    ):
+        response = await client.get(f"/api/logbook/{dt_util.utcnow().isoformat()}")
+    assert response.status == 500
+
+
 async def test_logbook_view_period_entity(hass, hass_client):
     """Test the logbook view with period and entity."""
     await hass.async_add_executor_job(init_recorder_component, hass)
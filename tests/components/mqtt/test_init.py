@@ -898,6 +898,52 @@ async def test_message_callback_exception_gets_logged(hass, caplog, mqtt_mock):
     )
 
 
+async def test_messages_handed_to_loop_in_batches(
+    hass, hass_ws_client, mqtt_mock, calls, record_calls
+):
+    """Test messages received by the paho thread are handled in one batch."""
+    await mqtt.async_subscribe(hass, "test-topic/#", record_calls)
+    mqtt_component = mqtt_mock()
+
+    def receive_messages():
+        for index in range(3):
+            msg = mqtt.Message(f"test-topic/{index}", b"test", 0, False)
+            mqtt_component._mqtt_on_message(None, None, msg)
+
+    with patch.object(
+        hass.loop, "call_soon_threadsafe", wraps=hass.loop.call_soon_threadsafe
+    ) as mock_call_soon:
+        await hass.async_add_executor_job(receive_messages)
+        await hass.async_block_till_done()
+
+    drains = [
+        mock_call
+        for mock_call in mock_call_soon.mock_calls
+        if mock_call[1][0] == mqtt_component._async_drain_message_queue
+    ]
+    assert len(drains) == 1
+    assert [args[0].topic for args in calls] == [
+        "test-topic/0",
+        "test-topic/1",
+        "test-topic/2",
+    ]
+
+    stats = mqtt_component.message_queue_stats
+    assert stats.messages == 3
+    assert stats.batches == 1
+    assert stats.queue_depth == 3
+    assert stats.max_queue_depth == 3
+    assert 0 <= stats.latency <= stats.max_latency
+
+    hass.data["mqtt"] = mqtt_component
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 5, "type": "mqtt/message_queue/stats"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["messages"] == 3
+    assert response["result"]["max_queue_depth"] == 3
+
+
 async def test_mqtt_ws_subscription(hass, hass_ws_client, mqtt_mock):
     """Test MQTT websocket subscription."""
     client = await hass_ws_client(hass)
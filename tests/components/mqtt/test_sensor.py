@@ -202,6 +202,44 @@ async def test_setting_sensor_value_via_mqtt_json_message(hass, mqtt_mock):
     assert state.state == "100"
 
 
+async def test_sensors_share_parsed_json_payload(hass, mqtt_mock):
+    """Test sensors subscribed to the same topic decode its payload once."""
+    assert await async_setup_component(
+        hass,
+        sensor.DOMAIN,
+        {
+            sensor.DOMAIN: [
+                {
+                    "platform": "mqtt",
+                    "name": "temperature",
+                    "state_topic": "test-topic",
+                    "value_template": "{{ value_json.temperature }}",
+                    "json_attributes_topic": "test-topic",
+                },
+                {
+                    "platform": "mqtt",
+                    "name": "humidity",
+                    "state_topic": "test-topic",
+                    "value_template": "{{ value_json.humidity }}",
+                },
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    with patch(
+        "homeassistant.components.mqtt.models.json.loads", wraps=json.loads
+    ) as mock_loads:
+        async_fire_mqtt_message(
+            hass, "test-topic", '{ "temperature": "21", "humidity": "45" }'
+        )
+
+    assert mock_loads.call_count == 1
+    assert hass.states.get("sensor.temperature").state == "21"
+    assert hass.states.get("sensor.temperature").attributes["humidity"] == "45"
+    assert hass.states.get("sensor.humidity").state == "45"
+
+
 async def test_force_update_disabled(hass, mqtt_mock):
     """Test force update option."""
     assert await async_setup_component(
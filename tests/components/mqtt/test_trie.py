@@ -0,0 +1,73 @@
+"""The tests for the MQTT subscription prefix tree."""
+from paho.mqtt.matcher import MQTTMatcher
+import pytest
+
+from homeassistant.components.mqtt.trie import TopicTrie
+
+FILTERS = [
+    "#",
+    "+",
+    "a",
+    "a/#",
+    "a/+",
+    "a/b",
+    "a/+/c",
+    "a/b/#",
+    "+/b/c",
+    "+/+/+",
+    "$SYS/#",
+    "$SYS/+",
+    "a//c",
+    "a/+/",
+]
+
+
+@pytest.mark.parametrize(
+    "topic",
+    ["a", "a/b", "a/b/c", "a/x/c", "b", "x/b/c", "$SYS", "$SYS/a", "a//c", "a/b/"],
+)
+def test_match_like_paho(topic):
+    """Test the filters matching a topic are the same as those of paho."""
+    trie = TopicTrie()
+    for topic_filter in FILTERS:
+        trie.add(topic_filter, topic_filter)
+
+    matcher = MQTTMatcher()
+    for topic_filter in FILTERS:
+        matcher[topic_filter] = topic_filter
+
+    assert sorted(trie.match(topic)) == sorted(matcher.iter_match(topic))
+
+
+def test_match_in_subscription_order():
+    """Test matches are returned in the order the subscriptions were added."""
+    trie = TopicTrie()
+    trie.add("a/b", 1)
+    trie.add("#", 2)
+    trie.add("a/+", 3)
+    trie.add("a/b", 4)
+
+    assert trie.match("a/b") == [1, 2, 3, 4]
+    assert list(trie) == [1, 2, 3, 4]
+
+
+def test_remove():
+    """Test removing subscriptions prunes unused levels."""
+    trie = TopicTrie()
+    trie.add("a/b/c", 1)
+    trie.add("a/b/c", 2)
+    trie.add("a/+", 3)
+    assert len(trie) == 3
+
+    assert trie.remove("a/b/c", 1)
+    assert not trie.remove("a/b/c", 1)
+    assert not trie.remove("x/y", 1)
+    assert trie.has_topic("a/b/c")
+    assert trie.match("a/b/c") == [2]
+
+    assert trie.remove("a/b/c", 2)
+    assert not trie.has_topic("a/b/c")
+    assert not trie.has_topic("a/b")
+    assert "b" not in trie._root.children["a"].children
+    assert trie.match("a/b") == [3]
+    assert len(trie) == 1
@@ -2,6 +2,7 @@
 # pylint: disable=protected-access
 from datetime import datetime, timedelta
 
+import sqlalchemy
 from sqlalchemy.exc import OperationalError
 
 from homeassistant.components.recorder import (
@@ -13,12 +14,20 @@ from homeassistant.components.recorder import (
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    EventTypes,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import MATCH_ALL, STATE_LOCKED, STATE_UNLOCKED
 from homeassistant.core import Context, callback
 from homeassistant.setup import async_setup_component
 from homeassistant.util import dt as dt_util
+from homeassistant.util.async_ import run_callback_threadsafe
 
 from .common import wait_recording_done
 
@@ -47,6 +56,28 @@ def test_saving_state(hass, hass_recorder):
     assert state == _state_empty_context(hass, entity_id)
 
 
+def test_saving_many_states(hass, hass_recorder):
+    """Test saving states set together."""
+    hass = hass_recorder()
+
+    run_callback_threadsafe(
+        hass.loop,
+        hass.states.async_set_many,
+        [("test.one", "on", {"index": 1}), ("test.two", "off", {"index": 2})],
+    ).result()
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 2
+        states = [db_state.to_native() for db_state in db_states]
+
+    assert [(state.entity_id, state.state) for state in states] == [
+        ("test.one", "on"),
+        ("test.two", "off"),
+    ]
+
+
 def test_saving_state_with_exception(hass, hass_recorder, caplog):
     """Test saving and restoring a state."""
     hass = hass_recorder()
@@ -55,17 +86,14 @@ def test_saving_state_with_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise OperationalError(
-                    "insert the state", "fake params", "forced to fail"
-                )
+    def _throw_if_inserting_states(statement, *args, **kwargs):
+        if getattr(statement, "table", None) is States.__table__:
+            raise OperationalError("insert the state", "fake params", "forced to fail")
 
     with patch("time.sleep"), patch.object(
         hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+        "execute",
+        side_effect=_throw_if_inserting_states,
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
@@ -112,7 +140,11 @@ def test_saving_event(hass, hass_recorder):
     hass.data[DATA_INSTANCE].block_till_done()
 
     with session_scope(hass=hass) as session:
-        db_events = list(session.query(Events).filter_by(event_type=event_type))
+        db_events = list(
+            session.query(Events)
+            .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+            .filter(EventTypes.event_type == event_type)
+        )
         assert len(db_events) == 1
         db_event = db_events[0].to_native()
 
@@ -298,11 +330,11 @@ def test_saving_state_and_removing_entity(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         states = list(session.query(States))
         assert len(states) == 3
-        assert states[0].entity_id == entity_id
+        assert states[0].states_meta.entity_id == entity_id
         assert states[0].state == STATE_LOCKED
-        assert states[1].entity_id == entity_id
+        assert states[1].states_meta.entity_id == entity_id
         assert states[1].state == STATE_UNLOCKED
-        assert states[2].entity_id == entity_id
+        assert states[2].states_meta.entity_id == entity_id
         assert states[2].state is None
 
 
@@ -392,10 +424,10 @@ def test_saving_sets_old_state(hass_recorder):
         states = list(session.query(States))
         assert len(states) == 4
 
-        assert states[0].entity_id == "test.one"
-        assert states[1].entity_id == "test.two"
-        assert states[2].entity_id == "test.one"
-        assert states[3].entity_id == "test.two"
+        assert states[0].states_meta.entity_id == "test.one"
+        assert states[1].states_meta.entity_id == "test.two"
+        assert states[2].states_meta.entity_id == "test.one"
+        assert states[3].states_meta.entity_id == "test.two"
 
         assert states[0].old_state_id is None
         assert states[1].old_state_id is None
@@ -403,6 +435,111 @@ def test_saving_sets_old_state(hass_recorder):
         assert states[3].old_state_id == states[1].state_id
 
 
+def test_saving_state_shares_attributes(hass_recorder):
+    """Test identical attributes are only stored once."""
+    hass = hass_recorder()
+    attributes = {"unit_of_measurement": "W", "friendly_name": "Power"}
+
+    hass.states.set("sensor.power", "1", attributes)
+    hass.states.set("sensor.power", "2", attributes)
+    wait_recording_done(hass)
+    hass.states.set("sensor.power", "3", attributes)
+    hass.states.set("sensor.other", "3", {"friendly_name": "Other"})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States))
+        assert len(states) == 4
+        assert len({state.attributes_id for state in states[:3]}) == 1
+        assert states[3].attributes_id != states[0].attributes_id
+        assert all(state.attributes is None for state in states)
+        assert session.query(StateAttributes).count() == 2
+        assert states[2].to_native().attributes == attributes
+
+    # The database is used when the id is no longer cached
+    hass.data[DATA_INSTANCE].clear_state_attributes_cache()
+    hass.states.set("sensor.power", "4", attributes)
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 2
+
+
+def test_saving_states_resolves_attributes_in_one_query(hass_recorder):
+    """Test uncached attribute sets of a commit are looked up together."""
+    hass = hass_recorder()
+    updates = [
+        (f"sensor.power_{index}", "1", {"friendly_name": f"Power {index}"})
+        for index in range(5)
+    ]
+    run_callback_threadsafe(hass.loop, hass.states.async_set_many, updates).result()
+    wait_recording_done(hass)
+
+    instance = hass.data[DATA_INSTANCE]
+    instance.clear_state_attributes_cache()
+    statements = []
+
+    @sqlalchemy.event.listens_for(instance.engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    run_callback_threadsafe(
+        hass.loop,
+        hass.states.async_set_many,
+        [(entity_id, "2", attributes) for entity_id, _, attributes in updates],
+    ).result()
+    wait_recording_done(hass)
+    sqlalchemy.event.remove(instance.engine, "before_cursor_execute", _before_execute)
+
+    attribute_selects = [
+        statement
+        for statement in statements
+        if statement.startswith("SELECT") and "FROM state_attributes" in statement
+    ]
+    assert len(attribute_selects) == 1
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 5
+        assert session.query(States).count() == 10
+
+
+def test_saving_state_uses_lookup_tables(hass_recorder):
+    """Test event types and entity ids are stored once in lookup tables."""
+    hass = hass_recorder()
+
+    hass.states.set("test.one", "on", {})
+    hass.states.set("test.one", "off", {})
+    hass.states.set("test.two", "on", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States))
+        assert len(states) == 3
+        assert all(state.entity_id is None for state in states)
+        assert all(state.domain is None for state in states)
+        assert states[0].metadata_id == states[1].metadata_id
+        assert states[2].metadata_id != states[0].metadata_id
+        assert states[1].to_native().entity_id == "test.one"
+
+        metadata = {
+            row.entity_id: row.domain for row in session.query(StatesMeta).all()
+        }
+        assert metadata == {"test.one": "test", "test.two": "test"}
+
+        event_types = [
+            row.event_type
+            for row in session.query(EventTypes).filter(
+                EventTypes.event_type == "state_changed"
+            )
+        ]
+        assert event_types == ["state_changed"]
+        assert (
+            session.query(Events)
+            .filter(Events.event_type_id.isnot(None), Events.event_type.is_(None))
+            .count()
+            == session.query(Events).count()
+        )
+
+
 def test_saving_state_with_serializable_data(hass_recorder, caplog):
     """Test saving data that cannot be serialized does not crash."""
     hass = hass_recorder()
@@ -418,8 +555,8 @@ def test_saving_state_with_serializable_data(hass_recorder, caplog):
         states = list(session.query(States))
         assert len(states) == 2
 
-        assert states[0].entity_id == "test.two"
-        assert states[1].entity_id == "test.two"
+        assert states[0].states_meta.entity_id == "test.two"
+        assert states[1].states_meta.entity_id == "test.two"
         assert states[0].old_state_id is None
         assert states[1].old_state_id == states[0].state_id
 
@@ -11,6 +11,7 @@ from homeassistant.components.recorder.models import (
     Events,
     RecorderRuns,
     States,
+    StatesMeta,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
@@ -92,7 +93,7 @@ def test_entity_ids():
 
     session.add(
         States(
-            entity_id="sensor.temperature",
+            states_meta=StatesMeta(entity_id="sensor.temperature", domain="sensor"),
             state="20",
             last_changed=before_run,
             last_updated=before_run,
@@ -100,7 +101,7 @@ def test_entity_ids():
     )
     session.add(
         States(
-            entity_id="sensor.sound",
+            states_meta=StatesMeta(entity_id="sensor.sound", domain="sensor"),
             state="10",
             last_changed=after_run,
             last_updated=after_run,
@@ -109,7 +110,7 @@ def test_entity_ids():
 
     session.add(
         States(
-            entity_id="sensor.humidity",
+            states_meta=StatesMeta(entity_id="sensor.humidity", domain="sensor"),
             state="76",
             last_changed=in_run,
             last_updated=in_run,
@@ -117,7 +118,7 @@ def test_entity_ids():
     )
     session.add(
         States(
-            entity_id="sensor.lux",
+            states_meta=StatesMeta(entity_id="sensor.lux", domain="sensor"),
             state="5",
             last_changed=in_run3,
             last_updated=in_run3,
@@ -4,7 +4,13 @@ import json
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.util import dt as dt_util
@@ -12,8 +18,10 @@ from homeassistant.util import dt as dt_util
 from .common import wait_recording_done
 
 from tests.async_mock import patch
+from tests.common import init_recorder_component
 
 
+@patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2)
 def test_purge_old_states(hass, hass_recorder):
     """Test deleting old states."""
     hass = hass_recorder()
@@ -38,6 +46,63 @@ def test_purge_old_states(hass, hass_recorder):
         assert states.count() == 2
 
 
+def test_purge_old_state_attributes(hass, hass_recorder):
+    """Test attribute sets are deleted once no state references them."""
+    hass = hass_recorder()
+    hass.states.set("sensor.old", "on", {"old": True})
+    hass.states.set("sensor.new", "on", {"new": True})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        old_metadata_id = (
+            session.query(StatesMeta.metadata_id)
+            .filter(StatesMeta.entity_id == "sensor.old")
+            .scalar()
+        )
+        session.query(States).filter(States.metadata_id == old_metadata_id).update(
+            {"last_updated": dt_util.utcnow() - timedelta(days=11)}
+        )
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 2
+
+        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+        assert finished
+
+        attributes = session.query(StateAttributes).all()
+        assert len(attributes) == 1
+        assert json.loads(attributes[0].shared_attrs) == {"new": True}
+        assert not hass.data[DATA_INSTANCE]._state_attributes_ids
+
+
+@patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2)
+def test_purge_state_attributes_in_batches(hass, hass_recorder):
+    """Test attribute sets used across batches are kept while referenced."""
+    hass = hass_recorder()
+    for value in range(3):
+        hass.states.set("sensor.shared", str(value), {"shared": True})
+        hass.states.set("sensor.old", str(value), {"old": True})
+    wait_recording_done(hass)
+    with session_scope(hass=hass) as session:
+        session.query(States).update(
+            {"last_updated": dt_util.utcnow() - timedelta(days=11)}
+        )
+    hass.states.set("sensor.new", "on", {"shared": True})
+    wait_recording_done(hass)
+
+    batches = 1
+    while not purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False):
+        batches += 1
+    assert batches == 4
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 1
+        attributes = session.query(StateAttributes).all()
+        assert len(attributes) == 1
+        assert json.loads(attributes[0].shared_attrs) == {"shared": True}
+
+
+@patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2)
 def test_purge_old_events(hass, hass_recorder):
     """Test deleting old events."""
     hass = hass_recorder()
@@ -123,8 +188,8 @@ def test_purge_method(hass, hass_recorder):
             hass.data[DATA_INSTANCE].block_till_done()
             wait_recording_done(hass)
             assert (
-                mock_logger.debug.mock_calls[5][1][0]
-                == "Vacuuming SQL DB to free space"
+                mock_logger.debug.mock_calls[-1][1][0]
+                == "Incrementally vacuuming SQL DB to free space"
             )
 
 
@@ -225,3 +290,37 @@ def _add_test_recorder_runs(hass):
                     end=timestamp + timedelta(days=1),
                 )
             )
+
+
+@patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2)
+def test_purge_progress(hass, hass_recorder):
+    """Test the progress of a purge is tracked across batches."""
+    hass = hass_recorder()
+    _add_test_states(hass)
+    progress = hass.data[DATA_INSTANCE].purge_progress
+
+    assert not purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+    assert progress.running
+    assert progress.states_to_purge == 4
+    assert progress.states_purged == 2
+    assert progress.batches == 1
+
+    assert not purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+    assert purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+    assert not progress.running
+    assert progress.finished is not None
+    assert progress.states_purged == 4
+    assert progress.batches == 3
+    assert progress.as_dict()["rows_per_second"] > 0
+
+
+async def test_websocket_purge_progress(hass, hass_ws_client):
+    """Test the purge progress websocket command."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 5, "type": "recorder/purge_progress"})
+    msg = await client.receive_json()
+    assert msg["success"]
+    assert msg["result"]["running"] is False
+    assert msg["result"]["states_purged"] == 0
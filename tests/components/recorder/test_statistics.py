@@ -0,0 +1,166 @@
+"""Test compiling statistics."""
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import (
+    States,
+    StatesMeta,
+    Statistics,
+    StatisticsShortTerm,
+    process_timestamp,
+)
+from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.statistics import (
+    compile_statistics,
+    period_start,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.util import dt as dt_util
+
+from .common import wait_recording_done
+
+
+def _record_states(hass, changes):
+    """Record states and move them to the times they changed."""
+    for entity_id, state, _ in changes:
+        hass.states.set(entity_id, state, force_update=True)
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        for state, (_, _, changed) in zip(
+            session.query(States).order_by(States.state_id), changes
+        ):
+            state.last_updated = changed
+
+
+def _statistics(hass, table):
+    """Return the statistics of a table by entity id."""
+    with session_scope(hass=hass) as session:
+        return {
+            entity_id: (
+                process_timestamp(stats.start),
+                stats.mean,
+                stats.min,
+                stats.max,
+            )
+            for entity_id, stats in session.query(StatesMeta.entity_id, table).join(
+                StatesMeta, table.metadata_id == StatesMeta.metadata_id
+            )
+        }
+
+
+def test_compile_short_term_statistics(hass_recorder):
+    """Test the 5 minute statistics are weighted by how long values were held."""
+    hass = hass_recorder()
+    start = dt_util.utcnow().replace(minute=10, second=0, microsecond=0)
+    _record_states(
+        hass,
+        [
+            # Held from before the period until a minute before its end
+            ("sensor.temperature", "20", start - timedelta(hours=2)),
+            ("sensor.temperature", "30", start + timedelta(minutes=4)),
+            ("sensor.humidity", "50", start + timedelta(seconds=30)),
+            ("sensor.humidity", "unknown", start + timedelta(minutes=1)),
+            ("sensor.humidity", "40", start + timedelta(minutes=2, seconds=30)),
+            ("sensor.humidity", "90", start + timedelta(minutes=4, seconds=30)),
+            ("light.kitchen", "on", start + timedelta(minutes=1)),
+            # Recorded after the period
+            ("sensor.temperature", "100", start + timedelta(minutes=5)),
+        ],
+    )
+
+    compile_statistics(hass.data[DATA_INSTANCE], start)
+    # Compiling the same period again is a noop
+    compile_statistics(hass.data[DATA_INSTANCE], start)
+
+    assert _statistics(hass, StatisticsShortTerm) == {
+        "sensor.temperature": (start, 22, 20, 30),
+        # 50 for 30s, 40 for 120s and 90 for 30s while it was numeric
+        "sensor.humidity": (start, 50, 40, 90),
+    }
+    assert _statistics(hass, Statistics) == {}
+
+
+def test_compile_statistics_without_changes(hass_recorder):
+    """Test entities whose state did not change during a period get statistics."""
+    hass = hass_recorder()
+    start = dt_util.utcnow().replace(minute=10, second=0, microsecond=0)
+    _record_states(
+        hass,
+        [
+            ("sensor.temperature", "20", start - timedelta(days=1)),
+            ("sensor.humidity", "unavailable", start - timedelta(days=1)),
+        ],
+    )
+
+    compile_statistics(hass.data[DATA_INSTANCE], start)
+
+    assert _statistics(hass, StatisticsShortTerm) == {
+        "sensor.temperature": (start, 20, 20, 20)
+    }
+
+
+def test_compile_hourly_statistics(hass_recorder):
+    """Test missed periods are compiled and the hourly ones from 5 minute ones."""
+    hass = hass_recorder()
+    hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = hour - timedelta(hours=1)
+    _record_states(
+        hass,
+        [
+            ("sensor.temperature", "10", start - timedelta(minutes=1)),
+            ("sensor.temperature", "70", start + timedelta(minutes=30)),
+        ],
+    )
+
+    compile_statistics(hass.data[DATA_INSTANCE], start)
+    with session_scope(hass=hass) as session:
+        assert session.query(StatisticsShortTerm).count() == 1
+
+    compile_statistics(hass.data[DATA_INSTANCE], hour - timedelta(minutes=5))
+
+    with session_scope(hass=hass) as session:
+        short_term = [
+            (process_timestamp(stats.start), stats.mean)
+            for stats in session.query(StatisticsShortTerm).order_by(
+                StatisticsShortTerm.start
+            )
+        ]
+    assert short_term == [
+        (start + timedelta(minutes=minutes), 10 if minutes < 30 else 70)
+        for minutes in range(0, 60, 5)
+    ]
+    assert _statistics(hass, Statistics) == {"sensor.temperature": (start, 40, 10, 70)}
+
+
+def test_purge_short_term_statistics(hass_recorder):
+    """Test purging removes the 5 minute statistics and keeps the hourly ones."""
+    hass = hass_recorder()
+    start = (dt_util.utcnow() - timedelta(days=10)).replace(
+        minute=55, second=0, microsecond=0
+    )
+    _record_states(hass, [("sensor.temperature", "10", start)])
+    compile_statistics(hass.data[DATA_INSTANCE], start)
+    recent_start = dt_util.utcnow().replace(minute=10, second=0, microsecond=0)
+
+    with session_scope(hass=hass) as session:
+        session.add(StatisticsShortTerm(metadata_id=1, start=recent_start, mean=1))
+
+    while not purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False):
+        pass
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 0
+        assert session.query(Statistics).count() == 1
+        stats = session.query(StatisticsShortTerm).one()
+        assert process_timestamp(stats.start) == recent_start
+
+
+def test_period_start():
+    """Test the start of the last complete period."""
+    now = datetime(2021, 1, 1, 10, 5, 10, tzinfo=dt_util.UTC)
+    assert period_start(now, timedelta(minutes=5)) == now.replace(minute=0, second=0)
+    now = datetime(2021, 1, 1, 10, 3, 10, tzinfo=dt_util.UTC)
+    assert period_start(now, timedelta(minutes=5)) == now.replace(
+        hour=9, minute=55, second=0
+    )
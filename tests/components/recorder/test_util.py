@@ -4,9 +4,11 @@ import os
 import sqlite3
 
 import pytest
+import sqlalchemy
 
 from homeassistant.components.recorder import util
 from homeassistant.components.recorder.const import DATA_INSTANCE, SQLITE_URL_PREFIX
+from homeassistant.components.recorder.models import Events, States
 from homeassistant.util import dt as dt_util
 
 from .common import wait_recording_done
@@ -69,6 +71,32 @@ def test_recorder_bad_execute(hass_recorder):
     assert e_mock.call_count == 2
 
 
+def test_execute_to_native_single_query(hass_recorder):
+    """Test converting states and events does not query per row."""
+    hass = hass_recorder()
+    for value in ("1", "2", "3"):
+        hass.states.set("sensor.power", value, {"value": value})
+    wait_recording_done(hass)
+
+    instance = hass.data[DATA_INSTANCE]
+    statements = []
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(instance.engine, "before_cursor_execute", _before_execute)
+    with util.session_scope(hass=hass) as session:
+        states = util.execute(session.query(States), to_native=True)
+        events = util.execute(session.query(Events), to_native=True)
+    sqlalchemy.event.remove(instance.engine, "before_cursor_execute", _before_execute)
+
+    assert [state.state for state in states] == ["1", "2", "3"]
+    assert states[0].entity_id == "sensor.power"
+    assert states[0].attributes == {"value": "1"}
+    assert "state_changed" in {event.event_type for event in events}
+    assert len([stmt for stmt in statements if stmt.startswith("SELECT")]) == 2
+
+
 def test_validate_or_move_away_sqlite_database_with_integrity_check(
     hass, tmpdir, caplog
 ):
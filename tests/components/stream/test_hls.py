@@ -1,4 +1,5 @@
 """The tests for hls streams."""
+import asyncio
 from datetime import timedelta
 from urllib.parse import urlparse
 
@@ -6,6 +7,9 @@ import av
 import pytest
 
 from homeassistant.components.stream import request_stream
+from homeassistant.components.stream.const import ATTR_SEGMENT_POOL, DOMAIN
+from homeassistant.components.stream.core import Part, Segment
+from homeassistant.components.stream.fmp4utils import find_fragments
 from homeassistant.const import HTTP_NOT_FOUND
 from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
@@ -160,3 +164,136 @@ async def test_stream_keepalive(hass):
 
     # Stop stream, if it hasn't quit already
     stream.stop()
+
+
+def _box(box_type, payload=b""):
+    """Return an mp4 box."""
+    return (8 + len(payload)).to_bytes(4, byteorder="big") + box_type + payload
+
+
+def test_find_fragments():
+    """Test finding the complete fragments written to a segment."""
+    init = _box(b"ftyp") + _box(b"moov", b"init")
+    fragment = _box(b"moof", b"header") + _box(b"mdat", b"frames")
+    data = memoryview(init + fragment + fragment[:-2])
+
+    assert find_fragments(data, 0) == (len(init), len(init) + len(fragment))
+    assert find_fragments(data, len(init) + len(fragment)) is None
+    assert find_fragments(memoryview(init), 0) is None
+
+
+async def test_ll_hls_playlist_with_parts(hass, hass_client):
+    """Test the low latency playlist lists the parts of segments."""
+    await async_setup_component(
+        hass, "stream", {"stream": {"ll_hls": True, "part_duration": 0.5}}
+    )
+
+    stream = preload_stream(hass, "test_ll_hls_source")
+    stream.access_token = "abc123"
+    track = stream.add_provider("hls")
+    track.put(
+        Segment(
+            1,
+            memoryview(b""),
+            1.5,
+            [Part(0.5, True, b"part0"), Part(1.0, False, b"part1")],
+        )
+    )
+    track.put_part(2, Part(0.5, True, b"part2"))
+
+    http_client = await hass_client()
+    with patch.object(stream, "start"):
+        playlist_response = await http_client.get("/api/hls/abc123/playlist.m3u8")
+        assert playlist_response.status == 200
+        playlist = await playlist_response.text()
+
+        part_response = await http_client.get("/api/hls/abc123/part/2.0.m4s")
+        assert part_response.status == 200
+        assert await part_response.read() == b"part2"
+
+        fail_response = await http_client.get("/api/hls/abc123/part/2.1.m4s")
+        assert fail_response.status == HTTP_NOT_FOUND
+
+    assert playlist.splitlines() == [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        "#EXT-X-TARGETDURATION:2",
+        "#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,PART-HOLD-BACK=1.500",
+        "#EXT-X-PART-INF:PART-TARGET=0.500",
+        '#EXT-X-MAP:URI="init.mp4"',
+        "#EXT-X-MEDIA-SEQUENCE:1",
+        '#EXT-X-PART:DURATION=0.500,URI="./part/1.0.m4s",INDEPENDENT=YES',
+        '#EXT-X-PART:DURATION=1.000,URI="./part/1.1.m4s"',
+        "#EXTINF:1.5000,",
+        "./segment/1.m4s",
+        '#EXT-X-PART:DURATION=0.500,URI="./part/2.0.m4s",INDEPENDENT=YES',
+    ]
+
+
+async def test_ll_hls_blocking_playlist_reload(hass, hass_client):
+    """Test a blocking playlist reload waits for the requested part."""
+    await async_setup_component(hass, "stream", {"stream": {"ll_hls": True}})
+
+    stream = preload_stream(hass, "test_ll_hls_source")
+    stream.access_token = "abc123"
+    track = stream.add_provider("hls")
+    track.put(Segment(1, memoryview(b""), 1.5, [Part(1.5, True, b"part0")]))
+
+    http_client = await hass_client()
+    with patch.object(stream, "start"):
+        fail_response = await http_client.get(
+            "/api/hls/abc123/playlist.m3u8?_HLS_msn=4"
+        )
+        assert fail_response.status == 400
+
+        reload = hass.async_create_task(
+            http_client.get("/api/hls/abc123/playlist.m3u8?_HLS_msn=2&_HLS_part=0")
+        )
+        await asyncio.sleep(0.1)
+        assert not reload.done()
+
+        track.put_part(2, Part(0.5, True, b"part1"))
+        playlist_response = await reload
+        assert playlist_response.status == 200
+        playlist = await playlist_response.text()
+
+    assert playlist.splitlines()[-1] == (
+        '#EXT-X-PART:DURATION=0.500,URI="./part/2.0.m4s",INDEPENDENT=YES'
+    )
+
+
+async def test_segment_memory_budget(hass):
+    """Test the oldest segments of all streams are evicted over the budget."""
+    await async_setup_component(hass, "stream", {"stream": {"segment_memory": 1}})
+    pool = hass.data[DOMAIN][ATTR_SEGMENT_POOL]
+    pool.max_bytes = 10
+
+    track_1 = preload_stream(hass, "test_source_1").add_provider("hls")
+    track_2 = preload_stream(hass, "test_source_2").add_provider("hls")
+
+    track_1.put(Segment(1, memoryview(b"1111"), 1))
+    track_2.put(Segment(1, memoryview(b"2222"), 1))
+    assert pool.size == 8
+
+    # The oldest segment that is not the newest of its stream is evicted
+    track_2.put(Segment(2, memoryview(b"2222"), 1))
+    assert track_1.segments == [1]
+    assert track_2.segments == [2]
+    assert pool.size == 8
+
+    # The newest segment of each stream is kept even over the budget
+    track_1.put(Segment(2, memoryview(b"111111111111"), 1))
+    assert track_1.segments == [2]
+    assert track_2.segments == [2]
+    assert pool.size == 16
+
+    # Segments dropped from a full stream are released
+    pool.max_bytes = 100
+    for sequence in range(3, 7):
+        track_2.put(Segment(sequence, memoryview(b"2"), 1))
+    assert track_2.segments == [4, 5, 6]
+    assert pool.size == 15
+
+    # Segments of a stream cleaned up are released
+    track_1.cleanup()
+    assert pool.size == 3
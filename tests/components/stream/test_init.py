@@ -82,3 +82,32 @@ async def test_record_service_lookback(hass):
         assert stream_mock.called
         stream_mock.return_value.add_provider.assert_called_once_with("recorder")
         assert hls_mock.recv.called
+
+
+async def test_record_service_lookback_buffer(hass):
+    """Test record service call takes the lookback from the rolling buffer."""
+    await async_setup_component(hass, "stream", {"stream": {}})
+    data = {
+        CONF_STREAM_SOURCE: "rtsp://my.video",
+        CONF_FILENAME: "/my/invalid/path",
+        CONF_LOOKBACK: 30,
+    }
+
+    with patch("homeassistant.components.stream.Stream") as stream_mock, patch.object(
+        hass.config, "is_allowed_path", return_value=True
+    ):
+        # Setup stubs
+        hls_mock = MagicMock()
+        hls_mock.recv = AsyncMock(return_value=None)
+        buffer_mock = MagicMock()
+        buffer_mock.recv = AsyncMock(return_value=None)
+        buffer_mock.get_lookback.return_value = ["segment"]
+        stream_mock.return_value.outputs = {"hls": hls_mock, "lookback": buffer_mock}
+
+        # Call Service
+        await hass.services.async_call(DOMAIN, SERVICE_RECORD, data, blocking=True)
+
+        buffer_mock.get_lookback.assert_called_once_with(30)
+        recorder = stream_mock.return_value.add_provider.return_value
+        recorder.prepend.assert_called_once_with(["segment"])
+        assert not hls_mock.recv.called
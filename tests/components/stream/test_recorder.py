@@ -1,16 +1,18 @@
 """The tests for hls streams."""
 from datetime import timedelta
-from io import BytesIO
 
 import av
 import pytest
 
 from homeassistant.components.stream.core import Segment
-from homeassistant.components.stream.recorder import recorder_save_worker
+from homeassistant.components.stream.recorder import (
+    LookbackOutput,
+    recorder_save_worker,
+)
 from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
 
-from tests.async_mock import patch
+from tests.async_mock import MagicMock, patch
 from tests.common import async_fire_time_changed
 from tests.components.stream.common import generate_h264_video, preload_stream
 
@@ -67,19 +69,147 @@ async def test_recorder_timeout(hass, hass_client):
         assert mock_cleanup.called
 
 
-@pytest.mark.skip("Flaky in CI")
-async def test_recorder_save():
-    """Test recorder save."""
-    # Setup
-    source = generate_h264_video()
-    output = BytesIO()
-    output.name = "test.mp4"
-
-    # Run
-    recorder_save_worker(output, [Segment(1, source, 4)], "mp4")
-
-    # Assert
-    assert output.getvalue()
+def _box(box_type, payload):
+    """Build an mp4 box."""
+    return (8 + len(payload)).to_bytes(4, "big") + box_type + payload
+
+
+def _fragment(decode_times):
+    """Build a moof and mdat pair with a decode time for each track."""
+    trafs = b"".join(
+        _box(
+            b"traf",
+            _box(b"tfhd", b"\x00\x00\x00\x00" + track_id.to_bytes(4, "big"))
+            + _box(b"tfdt", b"\x01\x00\x00\x00" + decode_time.to_bytes(8, "big")),
+        )
+        for track_id, decode_time in decode_times.items()
+    )
+    return _box(b"moof", _box(b"mfhd", bytes(8)) + trafs) + _box(b"mdat", b"data")
+
+
+def test_recorder_save(tmp_path):
+    """Test recorder save writes fragments starting at zero without remuxing."""
+    init = _box(b"ftyp", b"iso5") + _box(b"moov", b"")
+    segments = [
+        Segment(
+            sequence,
+            memoryview(init + fragment),
+            2,
+            init=init,
+            fragment=memoryview(fragment),
+        )
+        for sequence, fragment in (
+            (1, _fragment({1: 9000, 2: 4800})),
+            (2, _fragment({1: 27000, 2: 14400})),
+        )
+    ]
+    file_out = tmp_path / "recordings" / "test.mp4"
+
+    recorder_save_worker(str(file_out), segments)
+
+    data = file_out.read_bytes()
+    fragments = _fragment({1: 0, 2: 0}) + _fragment({1: 18000, 2: 9600})
+    assert data[: len(init) + len(fragments)] == init + fragments
+    assert data[len(init) + len(fragments) + 4 :].startswith(b"mfra")
+
+
+def _children(data, start=0, end=None):
+    """Return the boxes between start and end by type."""
+    end = len(data) if end is None else end
+    boxes = {}
+    while start < end:
+        size = int.from_bytes(data[start : start + 4], "big")
+        boxes[data[start + 4 : start + 8]] = (start, start + size)
+        start += size
+    return boxes
+
+
+def test_recorder_save_duration(tmp_path):
+    """Test the recording has a duration and an index of its fragments."""
+    mvhd = _box(b"mvhd", bytes(12) + (1000).to_bytes(4, "big") + bytes(84))
+    trex = _box(b"trex", bytes(24))
+    init = _box(b"ftyp", b"iso5") + _box(
+        b"moov", mvhd + _box(b"trak", b"") + _box(b"mvex", trex)
+    )
+    segments = [
+        Segment(
+            sequence,
+            memoryview(init + fragment),
+            2.5,
+            init=init,
+            fragment=memoryview(fragment),
+        )
+        for sequence, fragment in (
+            (1, _fragment({1: 9000, 2: 4800})),
+            (2, _fragment({1: 31500, 2: 16800})),
+        )
+    ]
+    file_out = tmp_path / "recordings" / "test.mp4"
+
+    recorder_save_worker(str(file_out), segments)
+
+    data = file_out.read_bytes()
+    boxes = _children(data)
+    moov_start, moov_end = boxes[b"moov"]
+    moov = _children(data, moov_start + 8, moov_end)
+    mvhd_start = moov[b"mvhd"][0]
+    assert int.from_bytes(data[mvhd_start + 24 : mvhd_start + 28], "big") == 5000
+    mvex_start, mvex_end = moov[b"mvex"]
+    mvex = _children(data, mvex_start + 8, mvex_end)
+    assert list(mvex) == [b"mehd", b"trex"]
+    mehd_start = mvex[b"mehd"][0]
+    assert int.from_bytes(data[mehd_start + 12 : mehd_start + 20], "big") == 5000
+
+    # The fragments are indexed by the mfra box ending the file
+    mfra_size = int.from_bytes(data[-4:], "big")
+    mfra_start = len(data) - mfra_size
+    assert boxes[b"mfra"] == (mfra_start, len(data))
+    moofs = [
+        index
+        for index in range(boxes[b"moov"][1], mfra_start)
+        if data[index + 4 : index + 8] == b"moof"
+    ]
+    tfras = []
+    index = mfra_start + 8
+    while data[index + 4 : index + 8] == b"tfra":
+        size = int.from_bytes(data[index : index + 4], "big")
+        track_id = int.from_bytes(data[index + 12 : index + 16], "big")
+        entries = [
+            (
+                int.from_bytes(data[entry : entry + 8], "big"),
+                int.from_bytes(data[entry + 8 : entry + 16], "big"),
+                data[entry + 16],
+            )
+            for entry in range(index + 24, index + size, 19)
+        ]
+        tfras.append((track_id, entries))
+        index += size
+    assert tfras == [
+        (1, [(0, moofs[0], 1), (22500, moofs[1], 1)]),
+        (2, [(0, moofs[0], 2), (12000, moofs[1], 2)]),
+    ]
+    assert data[index + 4 : index + 8] == b"mfro"
+
+
+async def test_lookback_output(hass):
+    """Test the lookback output keeps the segments covering its duration."""
+    stream = MagicMock(hass=hass, keepalive=True)
+    lookback = LookbackOutput(stream)
+    lookback.duration = 5
+
+    for sequence in range(1, 6):
+        lookback.put(Segment(sequence, memoryview(b"segment"), 2))
+
+    # Dropping the segment 3 would leave 4 seconds in the buffer
+    assert lookback.segments == [3, 4, 5]
+    assert [s.sequence for s in lookback.get_lookback(3)] == [4, 5]
+    assert [s.sequence for s in lookback.get_lookback(60)] == [3, 4, 5]
+
+    # The lookback keeps buffering after the idle timeout
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=10))
+    await hass.async_block_till_done()
+    assert lookback.idle
+    assert not stream.remove_provider.called
 
 
 @pytest.mark.skip("Flaky in CI")
@@ -11,8 +11,8 @@ from homeassistant.components.websocket_api.const import URL
 from homeassistant.core import Context, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity
-from homeassistant.loader import async_get_integration
-from homeassistant.setup import async_setup_component
+from homeassistant.loader import DATA_IMPORT_TIME, async_get_integration
+from homeassistant.setup import DATA_SETUP_TIME, async_setup_component
 
 from tests.common import MockEntity, MockEntityPlatform, async_mock_service
 
@@ -394,6 +394,47 @@ async def test_subscribe_unsubscribe_events_state_changed(
     assert msg["event"]["data"]["entity_id"] == "light.permitted"
 
 
+async def test_subscribe_events_batch(hass, websocket_client):
+    """Test events fired together are sent in one message when asked."""
+    await websocket_client.send_json(
+        {"id": 7, "type": "subscribe_events", "event_type": "state_changed"}
+    )
+    await websocket_client.send_json(
+        {
+            "id": 8,
+            "type": "subscribe_events",
+            "event_type": "state_changed",
+            "batch": True,
+        }
+    )
+    for iden in (7, 8):
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == iden
+        assert msg["success"]
+
+    hass.states.async_set_many([("light.one", "on", None), ("light.two", "off", None)])
+
+    msgs = [await websocket_client.receive_json() for _ in range(3)]
+    unbatched = [msg for msg in msgs if msg["id"] == 7]
+    assert [msg["event"]["data"]["entity_id"] for msg in unbatched] == [
+        "light.one",
+        "light.two",
+    ]
+    batched = [msg for msg in msgs if msg["id"] == 8]
+    assert len(batched) == 1
+    assert batched[0]["type"] == "event"
+    assert [event["data"]["entity_id"] for event in batched[0]["events"]] == [
+        "light.one",
+        "light.two",
+    ]
+
+    hass.states.async_set("light.one", "off")
+    for iden in (7, 8):
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == iden
+        assert msg["event"]["data"]["new_state"]["state"] == "off"
+
+
 async def test_render_template_renders_template(hass, websocket_client):
     """Test simple template is rendered and updated."""
     hass.states.async_set("light.test", "on")
@@ -674,6 +715,43 @@ async def test_manifest_get(hass, websocket_client):
     assert msg["error"]["code"] == "not_found"
 
 
+async def test_integration_setup_info(hass, websocket_client):
+    """Test getting the setup and import times of integrations."""
+    hass.data[DATA_SETUP_TIME] = {"august": 1.5, "onewire": 0.25}
+    hass.data[DATA_IMPORT_TIME] = {
+        "august": 0.5,
+        "august.lock": 0.25,
+        "hue.light": 0.125,
+    }
+
+    await websocket_client.send_json({"id": 6, "type": "integration/setup_info"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 6
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+    assert msg["result"] == [
+        {
+            "domain": "august",
+            "setup_seconds": 1.5,
+            "import_seconds": 0.75,
+            "imports": {"august": 0.5, "august.lock": 0.25},
+        },
+        {
+            "domain": "hue",
+            "setup_seconds": None,
+            "import_seconds": 0.125,
+            "imports": {"hue.light": 0.125},
+        },
+        {
+            "domain": "onewire",
+            "setup_seconds": 0.25,
+            "import_seconds": 0,
+            "imports": {},
+        },
+    ]
+
+
 async def test_entity_source_admin(hass, websocket_client, hass_admin_user):
     """Check that we fetch sources correctly."""
     platform = MockEntityPlatform(hass)
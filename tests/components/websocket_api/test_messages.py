@@ -1,7 +1,9 @@
 """Test Websocket API messages module."""
+import json
 
 from homeassistant.components.websocket_api.messages import (
     _cached_event_message as lru_event_cache,
+    cached_event_batch_message,
     cached_event_message,
     message_to_json,
 )
@@ -78,6 +80,31 @@ async def test_cached_event_message_with_different_idens(hass):
     assert cache_info.currsize == 1
 
 
+async def test_cached_event_batch_message(hass):
+    """Test a batch of events is serialized into one message."""
+    events = []
+
+    @callback
+    def _event_listener(event):
+        events.append(event)
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _event_listener)
+
+    hass.states.async_set_many(
+        [("light.window", "on", None), ("light.door", "off", None)]
+    )
+    await hass.async_block_till_done()
+
+    msg = json.loads(cached_event_batch_message(2, events))
+    assert msg["id"] == 2
+    assert msg["type"] == "event"
+    assert [event["data"]["entity_id"] for event in msg["events"]] == [
+        "light.window",
+        "light.door",
+    ]
+    assert msg["events"][0] == json.loads(cached_event_message(3, events[0]))["event"]
+
+
 async def test_message_to_json(caplog):
     """Test we can serialize websocket messages."""
 
@@ -370,6 +370,36 @@ async def test_deleted_device_removing_area_id(registry):
     assert entry_w_area != entry_wo_area
 
 
+async def test_entries_lookups_follow_updates(registry):
+    """Test devices by area and config entry follow registry changes."""
+    entry = registry.async_get_or_create(
+        config_entry_id="1234",
+        connections={(device_registry.CONNECTION_NETWORK_MAC, "12:34:56:AB:CD:EF")},
+        identifiers={("bridgeid", "0123")},
+    )
+    assert device_registry.async_entries_for_config_entry(registry, "1234") == [entry]
+    assert device_registry.async_entries_for_area(registry, "kitchen") == []
+
+    entry = registry.async_get_or_create(
+        config_entry_id="5678", identifiers={("bridgeid", "0123")}
+    )
+    entry = registry.async_update_device(entry.id, area_id="kitchen")
+    assert device_registry.async_entries_for_area(registry, "kitchen") == [entry]
+    assert device_registry.async_entries_for_config_entry(registry, "5678") == [entry]
+
+    registry.async_clear_config_entry("1234")
+    entry = registry.async_get(entry.id)
+    assert device_registry.async_entries_for_config_entry(registry, "1234") == []
+    assert device_registry.async_entries_for_config_entry(registry, "5678") == [entry]
+
+    registry.async_clear_area_id("kitchen")
+    assert device_registry.async_entries_for_area(registry, "kitchen") == []
+
+    registry.async_remove_device(entry.id)
+    assert device_registry.async_entries_for_config_entry(registry, "5678") == []
+    assert registry._config_entry_index == {}
+
+
 async def test_specifying_via_device_create(registry):
     """Test specifying a via_device and updating."""
     via = registry.async_get_or_create(
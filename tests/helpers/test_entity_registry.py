@@ -502,6 +502,44 @@ async def test_update_entity(registry):
         entry = updated_entry
 
 
+async def test_entries_lookups_follow_updates(registry):
+    """Test entries by device, area and config entry follow registry changes."""
+    mock_config = MockConfigEntry(domain="light", entry_id="mock-id-1")
+    entry = registry.async_get_or_create(
+        "light", "hue", "5678", config_entry=mock_config, device_id="device-1"
+    )
+    registry.async_get_or_create("light", "hue", "1234", device_id="device-1")
+
+    assert [
+        e.unique_id
+        for e in entity_registry.async_entries_for_device(registry, "device-1")
+    ] == ["5678", "1234"]
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry
+    ]
+    assert entity_registry.async_entries_for_area(registry, "kitchen") == []
+
+    entry = registry.async_update_entity(
+        entry.entity_id, area_id="kitchen", new_entity_id="light.kitchen"
+    )
+    assert entity_registry.async_entries_for_area(registry, "kitchen") == [entry]
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry
+    ]
+    assert entry in entity_registry.async_entries_for_device(registry, "device-1")
+
+    registry.async_clear_area_id("kitchen")
+    assert entity_registry.async_entries_for_area(registry, "kitchen") == []
+
+    registry.async_remove(entry.entity_id)
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == []
+    assert [
+        e.unique_id
+        for e in entity_registry.async_entries_for_device(registry, "device-1")
+    ] == ["1234"]
+    assert "mock-id-1" not in registry._config_entry_index
+
+
 async def test_disabled_by(registry):
     """Test that we can disable an entry when we create it."""
     entry = registry.async_get_or_create("light", "hue", "5678", disabled_by="hass")
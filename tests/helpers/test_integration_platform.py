@@ -1,4 +1,6 @@
 """Test integration platform helpers."""
+import asyncio
+
 from homeassistant.setup import ATTR_COMPONENT, EVENT_COMPONENT_LOADED
 
 from tests.async_mock import Mock
@@ -34,3 +36,45 @@ async def test_process_integration_platforms(hass):
     assert len(processed) == 2
     assert processed[1][0] == "event"
     assert processed[1][1] == event_platform
+
+
+async def test_process_integration_platforms_deferred(hass):
+    """Test processing deferrable platforms on first use."""
+    hass.config.lazy_platforms = True
+    loaded_platform = Mock()
+    mock_platform(hass, "loaded.platform_to_check", loaded_platform)
+    hass.config.components.add("loaded")
+
+    event_platform = Mock()
+    mock_platform(hass, "event.platform_to_check", event_platform)
+
+    processed = []
+
+    async def _process_platform(hass, domain, platform):
+        """Process platform."""
+        processed.append((domain, platform))
+
+    await hass.helpers.integration_platform.async_process_integration_platforms(
+        "platform_to_check", _process_platform, deferrable=True
+    )
+    hass.bus.async_fire(EVENT_COMPONENT_LOADED, {ATTR_COMPONENT: "event"})
+    await hass.async_block_till_done()
+    assert processed == []
+
+    await asyncio.gather(
+        hass.helpers.integration_platform.async_ensure_integration_platforms(
+            "platform_to_check"
+        ),
+        hass.helpers.integration_platform.async_ensure_integration_platforms(
+            "platform_to_check"
+        ),
+    )
+    assert sorted(processed) == [
+        ("event", event_platform),
+        ("loaded", loaded_platform),
+    ]
+
+    await hass.helpers.integration_platform.async_ensure_integration_platforms(
+        "platform_to_check"
+    )
+    assert len(processed) == 2
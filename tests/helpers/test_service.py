@@ -350,6 +350,49 @@ async def test_extract_entity_ids_from_area(hass, area_mock):
     )
 
 
+async def test_extract_entity_ids_cached(hass, area_mock):
+    """Test resolved targets are cached until registries or groups change."""
+    call = ha.ServiceCall("light", "turn_on", {"area_id": "test-area"})
+    expected = {"light.in_area", "light.assigned_to_area"}
+
+    entity_ids = await service.async_extract_entity_ids(hass, call)
+    assert entity_ids == expected
+    # Callers may consume the result without changing the cache
+    entity_ids.clear()
+
+    with patch(
+        "homeassistant.helpers.entity_registry.async_entries_for_area"
+    ) as mock_entries_for_area:
+        assert await service.async_extract_entity_ids(hass, call) == expected
+    assert not mock_entries_for_area.called
+
+    registry = await hass.helpers.entity_registry.async_get_registry()
+    registry.async_update_entity("light.no_area", area_id="test-area")
+    await hass.async_block_till_done()
+    assert await service.async_extract_entity_ids(hass, call) == expected | {
+        "light.no_area"
+    }
+
+    hass.states.async_set("group.test", "on", {ATTR_ENTITY_ID: ["light.bowl"]})
+    await hass.async_block_till_done()
+    call = ha.ServiceCall("light", "turn_on", {ATTR_ENTITY_ID: "group.test"})
+    assert await service.async_extract_entity_ids(hass, call) == {"light.bowl"}
+
+    # The state of a group changing does not reset the cache, its members do
+    hass.states.async_set("group.test", "off", {ATTR_ENTITY_ID: ["light.bowl"]})
+    await hass.async_block_till_done()
+    assert hass.data[service.SERVICE_TARGET_CACHE]
+
+    hass.states.async_set(
+        "group.test", "off", {ATTR_ENTITY_ID: ["light.bowl", "light.kitchen"]}
+    )
+    await hass.async_block_till_done()
+    assert await service.async_extract_entity_ids(hass, call) == {
+        "light.bowl",
+        "light.kitchen",
+    }
+
+
 async def test_async_get_all_descriptions(hass):
     """Test async_get_all_descriptions."""
     group = hass.components.group
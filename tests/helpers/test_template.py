@@ -23,7 +23,7 @@ from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
 from homeassistant.util.unit_system import UnitSystem
 
-from tests.async_mock import patch
+from tests.async_mock import MagicMock, patch
 
 
 def _set_up_units(hass):
@@ -103,6 +103,28 @@ def test_invalid_template(hass):
         tmpl.async_render()
 
 
+def test_compile_cache(hass):
+    """Test identical templates share their compiled code."""
+    cache = template.CompileCache(size=2)
+    with patch.object(template, "_COMPILE_CACHE", cache):
+        tmpl = template.Template("{{ 1 + 1 }}", hass)
+        tmpl.ensure_valid()
+        tmpl_copy = template.Template("{{ 1 + 1 }}", hass)
+        tmpl_copy.ensure_valid()
+        assert tmpl_copy._compiled_code is tmpl._compiled_code
+        assert tmpl_copy.async_render() == 2
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        with pytest.raises(TemplateError):
+            template.Template("{{", hass).ensure_valid()
+        assert cache.misses == 2
+
+        for source in ("{{ 2 }}", "{{ 3 }}"):
+            template.Template(source, hass).ensure_valid()
+        template.Template("{{ 1 + 1 }}", hass).ensure_valid()
+        assert (cache.hits, cache.misses) == (1, 5)
+
+
 def test_referring_states_by_entity_id(hass):
     """Test referring states by entity id."""
     hass.states.async_set("test.object", "happy")
@@ -716,6 +738,17 @@ def test_render_with_possible_json_value_with_invalid_json(hass):
     assert tpl.async_render_with_possible_json_value("{ I AM NOT JSON }") == ""
 
 
+def test_render_with_possible_json_value_with_parse_json(hass):
+    """Render with possible JSON value parsed by the caller."""
+    tpl = template.Template("{{ value }} {{ value_json.hello }}", hass)
+    parse_json = MagicMock(return_value={"hello": "world"})
+    assert (
+        tpl.async_render_with_possible_json_value("payload", parse_json=parse_json)
+        == "payload world"
+    )
+    parse_json.assert_called_once_with("payload")
+
+
 def test_render_with_possible_json_value_with_template_error_value(hass):
     """Render with possible JSON value with template error value."""
     tpl = template.Template("{{ non_existing.variable }}", hass)
@@ -2056,35 +2089,38 @@ def test_urlencode(hass):
     assert tpl.async_render() == "the%20quick%20brown%20fox%20%3D%20true"
 
 
-async def test_cache_garbage_collection():
-    """Test caching a template."""
+async def test_compile_cache_outlives_templates():
+    """Test compiled code is kept when the templates are recreated."""
     template_string = (
         "{% set dict = {'foo': 'x&y', 'bar': 42} %} {{ dict | urlencode }}"
     )
-    tpl = template.Template(
-        (template_string),
-    )
-    tpl.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+    cache = template.CompileCache()
+    with patch.object(template, "_COMPILE_CACHE", cache):
+        tpl = template.Template(template_string)
+        tpl.ensure_valid()
+        compiled_code = tpl._compiled_code  # pylint: disable=protected-access
+        del tpl
+
+        tpl2 = template.Template(template_string)
+        tpl2.ensure_valid()
+        assert tpl2._compiled_code is compiled_code  # pylint: disable=protected-access
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.clear()
+        template.Template(template_string).ensure_valid()
+        assert cache.misses == 2
 
-    tpl2 = template.Template(
-        (template_string),
-    )
-    tpl2.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
 
-    del tpl
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
-    del tpl2
-    assert not template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+def test_compile_cache_per_environment(hass):
+    """Test compiled code is not shared between hass and no hass environments."""
+    template_string = "{{ ['a.b'] | expand | list }}"
+    cache = template.CompileCache()
+    with patch.object(template, "_COMPILE_CACHE", cache):
+        template.Template(template_string, hass).ensure_valid()
+
+        with pytest.raises(TemplateError):
+            template.Template(template_string).ensure_valid()
+        assert cache.misses == 2
 
 
 def test_is_template_string():
@@ -2427,5 +2463,36 @@ async def test_parse_result(hass):
         ("-1.0", -1.0),
         ("+1", 1),
         ("5.", 5.0),
+        ("00", 0),
+        ("007", "007"),
+        ("-012", "-012"),
+        (".", "."),
+        ("-", "-"),
+        ("1_000", "1_000"),
+        ("12:30", "12:30"),
+        ("21.5 °C", "21.5 °C"),
+        ("True", True),
+        ("False", False),
+        ("None", None),
+        ("(True)", True),
+        ("None # comment", None),
+        ("unavailable", "unavailable"),
+        ("'quoted'", "'quoted'"),
+        ("b'bytes'", b"bytes"),
+        ("1, 2", (1, 2)),
+        ("'a', 'b'", ("a", "b")),
+        ("set()", set()),
     ):
         assert template.Template(tpl, hass).async_render() == result
+
+
+@pytest.mark.parametrize(
+    "render_result",
+    ["21.5", "on", "True", "None", "007", "12:30", "unavailable", "1e5", "-1"],
+)
+def test_parse_result_without_literal_eval(hass, render_result):
+    """Test common results are parsed without literal_eval."""
+    tpl = template.Template("{{ 1 }}", hass)
+    with patch.object(template, "literal_eval") as mock_literal_eval:
+        tpl._parse_result(render_result)
+    assert not mock_literal_eval.called
@@ -30,6 +30,11 @@ async def apply_stop_hass(stop_hass):
     """Make sure all hass are stopped."""
 
 
+@pytest.fixture(autouse=True)
+def mock_hass_storage(hass_storage):
+    """Make sure checking the config does not write to the testing config."""
+
+
 def normalize_yaml_files(check_dict):
     """Remove configuration path from ['yaml_files']."""
     root = get_test_config_dir()
@@ -12,6 +12,7 @@ import pytz
 import voluptuous as vol
 
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_NOW,
     ATTR_SECONDS,
@@ -379,6 +380,64 @@ async def test_eventbus_unsubscribe_listener(hass):
     assert len(calls) == 1
 
 
+async def test_eventbus_listen_data(hass):
+    """Test listening for events with a specific data value."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    unsub = hass.bus.async_listen_data(
+        EVENT_STATE_CHANGED, ATTR_ENTITY_ID, "light.kitchen", listener
+    )
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == 1
+
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.bowl", "on")
+    hass.bus.async_fire(EVENT_STATE_CHANGED, {ATTR_ENTITY_ID: ["light.kitchen"]})
+    hass.bus.async_fire(EVENT_STATE_CHANGED)
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert calls[0].data["entity_id"] == "light.kitchen"
+
+    unsub()
+    assert EVENT_STATE_CHANGED not in hass.bus.async_listeners()
+
+    hass.states.async_set("light.kitchen", "off")
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+
+async def test_eventbus_listen_domain(hass):
+    """Test listening for events about the entities of a domain."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    unsub = hass.bus.async_listen_domain(EVENT_STATE_CHANGED, "light", listener)
+    unsub_all = hass.bus.async_listen(EVENT_STATE_CHANGED, listener)
+
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("switch.fan", "on")
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in calls] == [
+        "light.kitchen",
+        "light.kitchen",
+        "switch.fan",
+    ]
+
+    unsub()
+    unsub_all()
+    assert EVENT_STATE_CHANGED not in hass.bus.async_listeners()
+
+
 async def test_eventbus_listen_once_event_with_callback(hass):
     """Test listen_once_event method."""
     runs = []
@@ -637,6 +696,64 @@ async def test_statemachine_force_update(hass):
     assert len(events) == 1
 
 
+async def test_statemachine_set_many(hass):
+    """Test setting many states at once."""
+    hass.states.async_set("light.bowl", "on", {})
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    batches = []
+    hass.bus.async_listen_batch(EVENT_STATE_CHANGED, batches.append)
+
+    hass.states.async_set_many(
+        [
+            ("light.bowl", "on", None),
+            ("light.Kitchen", "on", {"brightness": 100}),
+            ("light.kitchen", "off", None),
+            ("switch.fan", "on", None),
+        ]
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("light.kitchen").state == "off"
+    assert hass.states.get("switch.fan").state == "on"
+    assert [event.data["entity_id"] for event in events] == [
+        "light.kitchen",
+        "light.kitchen",
+        "switch.fan",
+    ]
+    assert events[1].data["old_state"] is events[0].data["new_state"]
+    assert len({event.context for event in events}) == 1
+    assert len(batches) == 1
+    assert batches[0] == events
+
+
+async def test_statemachine_set_many_invalid(hass):
+    """Test no state is set when one of many states is invalid."""
+    with pytest.raises(InvalidEntityFormatError):
+        hass.states.async_set_many(
+            [("light.kitchen", "on", None), ("invalid_entity", "on", None)]
+        )
+
+    assert hass.states.get("light.kitchen") is None
+
+
+async def test_eventbus_listen_batch(hass):
+    """Test batch listeners get the events of async_fire and async_fire_many."""
+    batches = []
+    unsub = hass.bus.async_listen_batch(MATCH_ALL, batches.append)
+
+    hass.bus.async_fire("test_event", {"value": 1})
+    hass.bus.async_fire_many("test_event", [{"value": 2}, {"value": 3}])
+    await hass.async_block_till_done()
+
+    assert [[event.data["value"] for event in batch] for batch in batches] == [
+        [1],
+        [2, 3],
+    ]
+
+    unsub()
+    assert "*" not in hass.bus.async_listeners()
+
+
 def test_service_call_repr():
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")
@@ -1,12 +1,25 @@
 """Test to verify that we can load components."""
+from datetime import timedelta
+import json
+import os
+import pathlib
+
 import pytest
 
 from homeassistant.components import http, hue
 from homeassistant.components.hue import light as hue_light
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState
 import homeassistant.loader as loader
+import homeassistant.util.dt as dt_util
 
 from tests.async_mock import ANY, patch
-from tests.common import MockModule, async_mock_service, mock_integration
+from tests.common import (
+    MockModule,
+    async_fire_time_changed,
+    async_mock_service,
+    mock_integration,
+)
 
 
 async def test_component_dependencies(hass):
@@ -142,6 +155,47 @@ async def test_get_integration(hass):
     assert hue_light == integration.get_platform("light")
 
 
+async def test_get_integration_from_manifest_index(hass):
+    """Test built-in integrations are resolved without reading manifests."""
+    with patch.object(loader.Integration, "resolve_from_root") as mock_resolve:
+        integration = await loader.async_get_integration(hass, "hue")
+
+    assert not mock_resolve.called
+    assert hue == integration.get_component()
+    assert integration.file_path == pathlib.Path(hue.__file__).parent
+    manifest_path = integration.file_path / "manifest.json"
+    assert integration.manifest == {
+        **json.loads(manifest_path.read_text()),
+        "is_built_in": True,
+    }
+    assert "is_built_in" not in loader.MANIFESTS["hue"]
+
+
+async def test_get_integration_missing_from_manifest_index(hass):
+    """Test built-in integrations missing from the index are still found."""
+    with patch.dict(loader.MANIFESTS, clear=True):
+        integration = await loader.async_get_integration(hass, "hue")
+
+    assert hue == integration.get_component()
+    assert integration.is_built_in
+
+
+async def test_import_time_recorded(hass):
+    """Test the time taken to import modules of integrations is recorded."""
+    integration = await loader.async_get_integration(hass, "hue")
+    integration.get_component()
+    integration.get_platform("light")
+
+    import_time = hass.data[loader.DATA_IMPORT_TIME]
+    assert set(import_time) == {"hue", "hue.light"}
+    assert import_time["hue.light"] >= 0
+
+    # Modules already imported for this instance are not timed again
+    with patch.object(loader.importlib, "import_module") as mock_import:
+        integration.get_platform("light")
+    assert not mock_import.called
+
+
 async def test_get_integration_legacy(hass):
     """Test resolving integration."""
     integration = await loader.async_get_integration(hass, "test_embedded")
@@ -254,6 +308,85 @@ async def test_get_custom_components_internal(hass):
     assert integrations == {"test": ANY, "test_package": ANY}
 
 
+async def test_get_custom_components_stored(hass, hass_storage):
+    """Test the manifests of custom components are stored between runs."""
+    # pylint: disable=protected-access
+    await loader._async_get_custom_components(hass)
+    async_fire_time_changed(
+        hass,
+        dt_util.utcnow() + timedelta(seconds=loader.CUSTOM_COMPONENTS_SAVE_DELAY),
+    )
+    await hass.async_block_till_done()
+    assert loader.STORAGE_KEY_CUSTOM_COMPONENTS in hass_storage
+
+    with patch.object(loader, "_read_manifest") as mock_read, patch.object(
+        loader.os, "scandir"
+    ) as mock_scandir:
+        integrations = await loader._async_get_custom_components(hass)
+
+    assert integrations == {"test": ANY, "test_package": ANY}
+    assert integrations["test_package"].name == "Test Package"
+    assert not integrations["test_package"].is_built_in
+    assert not mock_read.called
+    assert not mock_scandir.called
+
+
+async def test_get_custom_components_stored_once_started(hass, hass_storage):
+    """Test the manifests are not stored by instances that did not start."""
+    # pylint: disable=protected-access
+    hass.state = CoreState.not_running
+    await loader._async_get_custom_components(hass)
+    save_time = dt_util.utcnow() + timedelta(
+        seconds=loader.CUSTOM_COMPONENTS_SAVE_DELAY
+    )
+    async_fire_time_changed(hass, save_time)
+    await hass.async_block_till_done()
+    assert loader.STORAGE_KEY_CUSTOM_COMPONENTS not in hass_storage
+
+    hass.state = CoreState.running
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, save_time + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert loader.STORAGE_KEY_CUSTOM_COMPONENTS in hass_storage
+
+
+def test_scan_custom_manifests(tmp_path):
+    """Test only changed directories and manifests are read again."""
+    # pylint: disable=protected-access
+    (tmp_path / "no_manifest").mkdir()
+    (tmp_path / "first").mkdir()
+    first_path = tmp_path / "first" / "manifest.json"
+    first_path.write_text('{"domain": "first", "name": "First"}')
+
+    scan = loader._scan_custom_manifests([str(tmp_path)], {})
+    assert scan["paths"][str(tmp_path)]["names"] == ["first", "no_manifest"]
+    assert scan["manifests"] == {
+        str(first_path): {
+            "mtime": first_path.stat().st_mtime_ns,
+            "manifest": {"domain": "first", "name": "First"},
+        }
+    }
+    assert loader._scan_custom_manifests([str(tmp_path)], scan) == scan
+
+    # Editing a manifest in place does not change the mtime of its directory
+    first_path.write_text('{"domain": "first", "name": "Changed"}')
+    mtime = first_path.stat().st_mtime_ns
+    os.utime(first_path, ns=(mtime, mtime + 1_000_000_000))
+    (tmp_path / "second").mkdir()
+    second_path = tmp_path / "second" / "manifest.json"
+    second_path.write_text("{invalid")
+
+    scan = loader._scan_custom_manifests([str(tmp_path)], scan)
+    assert scan["paths"][str(tmp_path)]["names"] == [
+        "first",
+        "no_manifest",
+        "second",
+    ]
+    assert list(scan["manifests"]) == [str(first_path)]
+    assert scan["manifests"][str(first_path)]["manifest"]["name"] == "Changed"
+
+
 def _get_test_integration(hass, name, config_flow):
     """Return a generated test integration."""
     return loader.Integration(
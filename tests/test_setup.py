@@ -28,6 +28,7 @@ from tests.common import (
     get_test_home_assistant,
     mock_entity_platform,
     mock_integration,
+    mock_storage,
 )
 
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
@@ -56,11 +57,15 @@ class TestSetup:
     # pylint: disable=invalid-name, no-self-use
     def setup_method(self, method):
         """Set up the test."""
+        # Do not write to the testing config when stopping
+        self.storage = mock_storage()
+        self.storage.__enter__()
         self.hass = get_test_home_assistant()
 
     def teardown_method(self, method):
         """Clean up."""
         self.hass.stop()
+        self.storage.__exit__(None, None, None)
 
     def test_validate_component_config(self):
         """Test validating component configuration."""
@@ -596,3 +601,17 @@ async def test_integration_disabled(hass, caplog):
     result = await setup.async_setup_component(hass, "test_component1", {})
     assert not result
     assert disabled_reason in caplog.text
+
+
+async def test_setup_time_recorded(hass):
+    """Test the setup time of integrations is recorded."""
+    mock_integration(hass, MockModule("test_component1"))
+    mock_integration(
+        hass, MockModule("test_component2", setup=Mock(return_value=False))
+    )
+    assert await setup.async_setup_component(hass, "test_component1", {})
+    assert not await setup.async_setup_component(hass, "test_component2", {})
+
+    setup_time = hass.data[setup.DATA_SETUP_TIME]
+    assert set(setup_time) == {"test_component1", "test_component2"}
+    assert setup_time["test_component1"] >= 0
@@ -478,3 +478,45 @@ def test_placeholder():
     """Test loading placeholders."""
     data = {"hello": yaml.Placeholder("test_name")}
     assert yaml.parse_yaml(yaml.dump(data)) == data
+
+
+def test_load_yaml_reuses_unchanged_documents(tmp_path):
+    """Test only the files that changed are parsed again."""
+    main_file = tmp_path / "main.yaml"
+    include_file = tmp_path / "include.yaml"
+    main_file.write_text("key: value\nincluded: !include include.yaml\n")
+    include_file.write_text("- one\n")
+
+    doc = yaml.load_yaml(str(main_file))
+    assert doc == {"key": "value", "included": ["one"]}
+    assert doc.__config_file__ == str(main_file)
+    assert doc["included"].__config_file__ == str(main_file)
+    assert doc["included"].__line__ == 1
+    main_node = yaml_loader.__NODE_CACHE[str(main_file)][1]
+
+    # Loaded documents can be changed without changing the cache
+    doc["key"] = "changed"
+    include_file.write_text("- one\n- two\n")
+
+    doc = yaml.load_yaml(str(main_file))
+    assert doc == {"key": "value", "included": ["one", "two"]}
+    assert yaml_loader.__NODE_CACHE[str(main_file)][1] is main_node
+
+    main_file.write_text("key: other\n")
+    assert yaml.load_yaml(str(main_file)) == {"key": "other"}
+    assert yaml_loader.__NODE_CACHE[str(main_file)][1] is not main_node
+
+
+def test_loader_keeps_stream_name():
+    """Test the fastest available loader keeps the name of its stream."""
+    stream = io.StringIO("key: value")
+    stream.name = "test.yaml"
+    loader = yaml_loader.SafeLoader(stream)
+    assert loader.name == "test.yaml"
+    assert yaml_loader.SafeLoader("key: value").name == "<unicode string>"
+    assert issubclass(
+        yaml_loader.SafeLoader,
+        yaml_loader.yaml.CSafeLoader
+        if yaml_loader.HAS_C_LOADER
+        else yaml_loader.yaml.SafeLoader,
+    )